@@ -1,34 +1,25 @@
+import asyncio
+import importlib
 import os
-import sys
 import uvicorn
 import logging
-from fastapi import FastAPI, Request
-from fastapi.middleware.cors import CORSMiddleware
-from fastapi.exceptions import RequestValidationError
-from fastapi.responses import JSONResponse
+from contextlib import asynccontextmanager
+import orjson
+from fastapi import FastAPI, Response
+from fastapi.responses import ORJSONResponse
 
-# Configuración del logger
-logging.basicConfig(level=logging.INFO)
-logger = logging.getLogger(__name__)
+from src.config.settings import settings
+from src.infrastructure.logging_config import setup_logging
 
-# Agregar el directorio src al path de Python
-sys.path.append(os.path.abspath('src'))
+# Configuración del logger (los registros se escriben desde el hilo del listener)
+log_listener = setup_logging()
+logger = logging.getLogger(__name__)
 
-from src.config.settings import settings
-from src.infrastructure.database import Base, engine, get_db
-from src.domain.shared.exceptions import global_exception_handler, APIError
-
-# Importar routers
-from src.features.aseguradoras.infrastructure.api.v1.aseguradoras_router import router as aseguradoras_router
-from src.features.clientes.infrastructure.api.v1.clientes_router import router as clientes_router
-from src.features.corredores.infrastructure.api.v1.corredores_router import router as corredores_router
-from src.features.sustituciones_corredores.infrastructure.api.v1.sustituciones_router import router as sustituciones_corredores_router
-from src.features.usuarios.infrastructure.api.v1.usuarios_router import router as usuarios_router
-from src.features.polizas.infrastructure.api.v1.polizas_router import router as polizas_router
-from src.features.tipos_seguros.infrastructure.api.v1.tipos_seguro_router import router as tipos_seguro_router
-from src.features.monedas.infrastructure.api.v1.monedas_router import router as monedas_router
-from src.features.tipos_documento.infrastructure.api.v1.tipos_documento_router import router as tipos_documento_router
-from src.features.corredores.infrastructure.api.v1.clientes_corredores_router import router as clientes_corredores_router
+from src.infrastructure.database import Base, SessionLocal, engine, warm_up_pool
+# Todos los modelos, con independencia de las features habilitadas: sus relaciones se
+# resuelven por nombre y fallarían si solo se importaran los de los routers activos
+import src.infrastructure.database.models  # noqa: F401
+from src.infrastructure.middleware import CORSExceptionMiddleware
 
 # Importar inicializadores de datos
 from src.features.tipos_documento.infrastructure.init_data import init_tipos_documento
@@ -36,104 +27,146 @@ from src.features.monedas.infrastructure.init_data import init_monedas
 from src.features.corredores.infrastructure.init_data import init_corredores
 from src.infrastructure.database.init_data.usuarios import init_usuarios
 
-# Crear tablas en la base de datos
-Base.metadata.create_all(bind=engine)
+# Routers de la API. Se importan al iniciar la aplicación (lifespan) y no al importar
+# este módulo, ya que cada uno arrastra modelos, esquemas y repositorios
+API_ROUTERS = [
+    "src.features.aseguradoras.infrastructure.api.v1.aseguradoras_router",
+    "src.features.clientes.infrastructure.api.v1.clientes_router",
+    "src.features.corredores.infrastructure.api.v1.corredores_router",
+    "src.features.sustituciones_corredores.infrastructure.api.v1.sustituciones_router",
+    "src.features.usuarios.infrastructure.api.v1.usuarios_router",
+    "src.features.polizas.infrastructure.api.v1.polizas_router",
+    "src.features.tipos_seguros.infrastructure.api.v1.tipos_seguro_router",
+    "src.features.monedas.infrastructure.api.v1.monedas_router",
+    "src.features.tipos_documento.infrastructure.api.v1.tipos_documento_router",
+    "src.features.corredores.infrastructure.api.v1.clientes_corredores_router",
+]
+
+
+def enabled_routers() -> list[str]:
+    """Devuelve los routers de las features habilitadas en ``settings.ENABLED_FEATURES``.
+
+    La feature es el paquete bajo ``src.features``; sin valor se habilitan todas.
+    """
+    features = {f.strip() for f in settings.ENABLED_FEATURES.split(",") if f.strip()}
+    if not features:
+        return API_ROUTERS
+
+    routers = [path for path in API_ROUTERS if path.split(".")[2] in features]
+    unknown = features - {path.split(".")[2] for path in API_ROUTERS}
+    if unknown:
+        logger.warning(f"Features desconocidas en ENABLED_FEATURES: {', '.join(sorted(unknown))}")
+    return routers
+
+
+def include_routers(app: FastAPI) -> None:
+    """Importa los routers de las features habilitadas y los incluye en la aplicación."""
+    for module_path in enabled_routers():
+        module = importlib.import_module(module_path)
+        app.include_router(module.router, prefix=settings.API_V1_STR)
+
+
+# Inicializadores de datos; cada uno se ejecuta en su propio hilo y sesión
+DATA_INITIALIZERS = [
+    ("Tipos de documento", init_tipos_documento),
+    ("Monedas", init_monedas),
+    ("Corredores", init_corredores),
+    ("Usuarios", init_usuarios),
+]
+
+
+def run_initializer(init_fn) -> None:
+    """Ejecuta un inicializador de datos con una sesión propia (las sesiones no son thread-safe)."""
+    with SessionLocal() as db:
+        init_fn(db)
+
+
+# Configuración del ciclo de vida de la aplicación (startup y shutdown)
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    log_listener.start()
+    logger.info("Iniciando aplicación...")
+    
+    # Incluir los routers de las features habilitadas
+    include_routers(app)
+    
+    # Verificar que el dialecto soporte la caché de sentencias compiladas
+    if engine.dialect.supports_statement_cache:
+        logger.info("Caché de sentencias SQL compiladas activa")
+    else:
+        logger.warning("El dialecto de la base de datos no soporta la caché de sentencias SQL")
+    
+    # Crear tablas solo si se solicita explícitamente; en producción el esquema lo gestiona Alembic
+    if settings.AUTO_CREATE_SCHEMA:
+        try:
+            logger.info("Creando tablas en la base de datos si no existen...")
+            Base.metadata.create_all(bind=engine)
+            logger.info("Tablas creadas correctamente")
+        except Exception:
+            logger.exception("Error al crear tablas")
+            # No lanzamos la excepción para permitir que la aplicación inicie
+    
+    # Inicializar datos en paralelo: el tiempo total es el del inicializador más lento
+    logger.info("Inicializando datos...")
+    results = await asyncio.gather(
+        *(asyncio.to_thread(run_initializer, init_fn) for _, init_fn in DATA_INITIALIZERS),
+        return_exceptions=True,
+    )
+    for (nombre, _), result in zip(DATA_INITIALIZERS, results):
+        # Capturamos las excepciones para que la aplicación pueda iniciar aún con errores
+        if isinstance(result, Exception):
+            logger.error(f"Error al inicializar {nombre.lower()}", exc_info=result)
+        else:
+            logger.info(f"{nombre}: datos inicializados correctamente")
+    
+    # Precalentar el pool de conexiones
+    try:
+        warm_up_pool(settings.POOL_WARM_SIZE)
+        logger.info(f"Pool de conexiones precalentado con {settings.POOL_WARM_SIZE} conexiones")
+    except Exception:
+        logger.exception("Error al precalentar el pool de conexiones")
+    
+    yield
+    
+    logger.info("Cerrando la aplicación...")
+    engine.dispose()
+    log_listener.stop()
+
 
 # Inicializar la aplicación FastAPI
 app = FastAPI(
     title=settings.PROJECT_NAME,
-    openapi_url=f"{settings.API_V1_STR}/openapi.json"
+    openapi_url=f"{settings.API_V1_STR}/openapi.json",
+    default_response_class=ORJSONResponse,
+    lifespan=lifespan,
 )
 
-# Middleware para manejar excepciones
-@app.middleware("http")
-async def catch_exceptions_middleware(request: Request, call_next):
-    try:
-        return await call_next(request)
-    except APIError as e:
-        return JSONResponse(status_code=e.status_code, content={"message": e.detail})
-    except RequestValidationError as e:
-        return JSONResponse(status_code=422, content={"message": "Error de validación", "errors": e.errors()})
-    except Exception as e:
-        return JSONResponse(status_code=500, content={"message": "Error interno del servidor"})
-
-# Configurar CORS
-if settings.BACKEND_CORS_ORIGINS:
-    app.add_middleware(
-        CORSMiddleware,
-        allow_origins=[str(origin) for origin in settings.BACKEND_CORS_ORIGINS],
-        allow_credentials=True,
-        allow_methods=["*"],
-        allow_headers=["*"],
-    )
-
-# Incluir routers
-app.include_router(aseguradoras_router, prefix=settings.API_V1_STR)
-app.include_router(clientes_router, prefix=settings.API_V1_STR)
-app.include_router(corredores_router, prefix=settings.API_V1_STR)
-app.include_router(sustituciones_corredores_router, prefix=settings.API_V1_STR)
-app.include_router(
-    usuarios_router,
-    prefix=settings.API_V1_STR
+# Middleware ASGI único para CORS y manejo de excepciones
+app.add_middleware(
+    CORSExceptionMiddleware,
+    allow_origins=settings.BACKEND_CORS_ORIGINS,
 )
-app.include_router(polizas_router, prefix=settings.API_V1_STR)
-app.include_router(tipos_seguro_router, prefix=settings.API_V1_STR)
-app.include_router(monedas_router, prefix=settings.API_V1_STR)
-app.include_router(tipos_documento_router, prefix=settings.API_V1_STR)
-app.include_router(clientes_corredores_router, prefix=settings.API_V1_STR)
-
-# Configuración del ciclo de vida de la aplicación (eventos startup y shutdown)
-@app.on_event("startup")
-async def startup_event():
-    logger.info("Iniciando aplicación...")
-    
-    # Crear tablas en la base de datos si no existen
-    try:
-        logger.info("Creando tablas en la base de datos si no existen...")
-        Base.metadata.create_all(bind=engine)
-        logger.info("Tablas creadas correctamente")
-    except Exception as e:
-        logger.error(f"Error al crear tablas: {str(e)}")
-        # No lanzamos la excepción para permitir que la aplicación inicie
-    
-    # Inicializar datos
-    db = next(get_db())
-    try:
-        logger.info("Inicializando datos...")
-        
-        # Inicializar tipos de documento
-        init_tipos_documento(db)
-        logger.info("Tipos de documento inicializados correctamente")
-        
-        # Inicializar monedas
-        init_monedas(db)
-        logger.info("Monedas inicializadas correctamente")
-        
-        # Inicializar corredores
-        init_corredores(db)
-        logger.info("Corredores inicializados correctamente")
-        
-        # Inicializar usuarios
-        init_usuarios(db)
-        logger.info("Usuarios inicializados correctamente")
-        
-        logger.info("Todos los datos inicializados correctamente")
-    except Exception as e:
-        logger.error(f"Error al inicializar datos: {str(e)}")
-        # Capturamos la excepción para que la aplicación pueda iniciar aún con errores
-    finally:
-        db.close()
-
-@app.on_event("shutdown")
-async def shutdown_event():
-    logger.info("Cerrando la aplicación...")
+
+
+# Respuesta constante de la raíz, serializada una sola vez
+_ROOT_BODY = orjson.dumps({"message": f"Bienvenido a {settings.PROJECT_NAME}"})
+_ROOT_HEADERS = {"Cache-Control": "public, max-age=3600"}
 
 
 @app.get("/")
 async def root():
-    return {"message": f"Bienvenido a {settings.PROJECT_NAME}"}
+    return Response(_ROOT_BODY, media_type="application/json", headers=_ROOT_HEADERS)
 
 
 # Para ejecutar la aplicación directamente con Python
 if __name__ == "__main__":
-    uvicorn.run("main:app", host="0.0.0.0", port=8000, reload=True)
+    # El recargador automático solo en desarrollo (DEV=1); no se combina con varios workers
+    uvicorn.run(
+        "main:app",
+        host=os.getenv("HOST", "0.0.0.0"),
+        port=int(os.getenv("PORT", "8000")),
+        loop="uvloop",
+        http="httptools",
+        reload=os.getenv("DEV") == "1",
+        workers=int(os.getenv("WEB_CONCURRENCY", "1")),
+    )
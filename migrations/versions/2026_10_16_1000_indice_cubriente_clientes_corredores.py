@@ -0,0 +1,37 @@
+"""Índice cubriente en clientes_corredores
+
+Revision ID: 2026_10_16_1000
+Revises: 2025_05_17_0554
+Create Date: 2026-10-16 10:00:00.000000
+
+"""
+from alembic import op
+
+# Identificador de revisión
+revision = '2026_10_16_1000'
+down_revision = '2025_05_17_0554'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # Las búsquedas por cliente proyectan corredor_numero y fecha_asignacion: con el INCLUDE
+    # se resuelven con un index-only scan sin visitar el heap
+    op.create_index(
+        'ix_cc_cli_cor',
+        'clientes_corredores',
+        ['cliente_id', 'corredor_numero'],
+        unique=False,
+        postgresql_include=['fecha_asignacion'],
+    )
+    
+    # El índice de una sola columna sobre cliente_id queda redundante
+    op.drop_index(op.f('ix_clientes_corredores_cliente_id'), table_name='clientes_corredores')
+
+
+def downgrade():
+    # Restaurar el índice de una sola columna
+    op.create_index(op.f('ix_clientes_corredores_cliente_id'), 'clientes_corredores', ['cliente_id'], unique=False)
+    
+    # Eliminar el índice cubriente
+    op.drop_index('ix_cc_cli_cor', table_name='clientes_corredores')
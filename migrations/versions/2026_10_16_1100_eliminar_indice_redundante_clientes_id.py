@@ -0,0 +1,25 @@
+"""Eliminar índice redundante sobre clientes.id
+
+Revision ID: 2026_10_16_1100
+Revises: 2026_10_16_1000
+Create Date: 2026-10-16 11:00:00.000000
+
+"""
+from alembic import op
+
+# Identificador de revisión
+revision = '2026_10_16_1100'
+down_revision = '2026_10_16_1000'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # La clave primaria ya indexa clientes.id; el índice adicional solo duplicaba
+    # el costo de escritura de cada INSERT. Los nuevos ids se generan como UUID v7
+    # (ordenados por tiempo) desde la aplicación.
+    op.execute("DROP INDEX IF EXISTS ix_clientes_id")
+
+
+def downgrade():
+    op.create_index('ix_clientes_id', 'clientes', ['id'], unique=False)
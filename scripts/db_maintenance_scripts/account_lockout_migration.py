@@ -8,45 +8,75 @@ import os
 import sys
 from sqlalchemy import create_engine, text
 
+# Índices parciales: la mayoría de los usuarios nunca falló ni está bloqueado, así que
+# solo se indexan las pocas filas relevantes. now() no puede ir en el predicado de un
+# índice: las consultas de cuentas bloqueadas deben filtrar
+# "bloqueado_hasta IS NOT NULL AND bloqueado_hasta > now()" para que el planificador lo use
+LOCKOUT_INDEXES = [
+    # Cuentas bloqueadas (o con bloqueo ya vencido pendiente de limpiar)
+    ("ix_usuarios_locked_active", "bloqueado_hasta", "bloqueado_hasta IS NOT NULL"),
+    # Barrido de intentos fallidos para reiniciar contadores
+    ("ix_usuarios_failed_attempts", "ultimo_intento_fallido", "intentos_fallidos > 0"),
+]
+
+# Índices de versiones anteriores de esta migración, reemplazados por los de arriba
+OBSOLETE_INDEXES = ["ix_usuarios_bloqueado_hasta", "ix_usuarios_ultimo_intento_fallido"]
+
+
 def run_migration():
     """Ejecuta la migración para agregar columnas de bloqueo de cuenta."""
     try:
-        import os
-        from sqlalchemy import create_engine, text
-        
         # Construir la URL de conexión desde las variables de entorno
         db_url = f"postgresql://{os.getenv('POSTGRES_USER')}:{os.getenv('POSTGRES_PASSWORD')}@{os.getenv('POSTGRES_SERVER')}:{os.getenv('POSTGRES_PORT')}/{os.getenv('POSTGRES_DB')}"
         
         # Crear conexión a la base de datos
         engine = create_engine(db_url)
         
-        # Ejecutar las migraciones
-        with engine.connect() as conn:
-            # Agregar columnas
+        # Columnas y comentarios en una sola transacción y un solo envío
+        with engine.begin() as conn:
             conn.execute(text("""
                 ALTER TABLE usuarios 
                 ADD COLUMN IF NOT EXISTS intentos_fallidos INTEGER NOT NULL DEFAULT 0,
                 ADD COLUMN IF NOT EXISTS bloqueado_hasta TIMESTAMP WITH TIME ZONE,
                 ADD COLUMN IF NOT EXISTS ultimo_intento_fallido TIMESTAMP WITH TIME ZONE;
-                """))
-            
-            # Agregar comentarios
-            conn.execute(text("""
+                
                 COMMENT ON COLUMN usuarios.intentos_fallidos IS 'Número de intentos fallidos de inicio de sesión';
                 COMMENT ON COLUMN usuarios.bloqueado_hasta IS 'Hasta cuándo está bloqueada la cuenta (None si no está bloqueada)';
                 COMMENT ON COLUMN usuarios.ultimo_intento_fallido IS 'Cuándo fue el último intento fallido de inicio de sesión';
                 """))
+
+            # Columnas creadas sin zona horaria por esquemas antiguos: se pasan a timestamptz
+            # interpretando los valores guardados como UTC, para que compararlas con now()
+            # no dependa de la zona horaria de la sesión
+            naive_columns = conn.execute(text("""
+                SELECT column_name FROM information_schema.columns
+                WHERE table_schema = current_schema() AND table_name = 'usuarios'
+                  AND column_name IN ('bloqueado_hasta', 'ultimo_intento_fallido')
+                  AND data_type = 'timestamp without time zone'
+                """)).scalars().all()
+            for column in naive_columns:
+                conn.execute(text(
+                    f"ALTER TABLE usuarios ALTER COLUMN {column} TYPE timestamptz "
+                    f"USING {column} AT TIME ZONE 'UTC'"
+                ))
+
+        # CREATE INDEX CONCURRENTLY no bloquea los inicios de sesión, pero no puede
+        # ejecutarse dentro de una transacción
+        with engine.connect().execution_options(isolation_level="AUTOCOMMIT") as conn:
+            for index_name in OBSOLETE_INDEXES:
+                conn.execute(text(f"DROP INDEX CONCURRENTLY IF EXISTS {index_name}"))
             
-            # Crear índices
-            conn.execute(text("""
-                CREATE INDEX IF NOT EXISTS ix_usuarios_bloqueado_hasta 
-                ON usuarios(bloqueado_hasta);
-                
-                CREATE INDEX IF NOT EXISTS ix_usuarios_ultimo_intento_fallido 
-                ON usuarios(ultimo_intento_fallido);
-                """))
-            
-            conn.commit()
+            for index_name, column, predicate in LOCKOUT_INDEXES:
+                # Un CONCURRENTLY interrumpido deja un índice inválido que IF NOT EXISTS no rehace
+                invalid = conn.execute(text("""
+                    SELECT 1 FROM pg_index WHERE indexrelid = to_regclass(:name) AND NOT indisvalid
+                    """), {"name": index_name}).scalar()
+                if invalid:
+                    conn.execute(text(f"DROP INDEX CONCURRENTLY IF EXISTS {index_name}"))
+                conn.execute(text(f"""
+                    CREATE INDEX CONCURRENTLY IF NOT EXISTS {index_name}
+                    ON usuarios({column}) WHERE {predicate}
+                    """))
         
         print("Migración completada exitosamente.")
         return True
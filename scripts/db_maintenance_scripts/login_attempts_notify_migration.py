@@ -0,0 +1,53 @@
+"""
+Script para que la tabla login_attempts avise de cada inserción con NOTIFY.
+
+scripts/security/monitor_logins.py escucha el canal y se actualiza en cuanto llega
+un intento nuevo, en vez de esperar al siguiente ciclo. Sin este trigger el monitor
+sigue funcionando, solo que por sondeo periódico.
+
+Este script debe ejecutarse manualmente con permisos de superusuario en la base de datos.
+"""
+
+import os
+
+from sqlalchemy import create_engine, text
+
+# Debe coincidir con NOTIFY_CHANNEL en scripts/security/monitor_logins.py
+NOTIFY_CHANNEL = "login_attempts"
+
+
+def run_migration():
+    """Ejecuta la migración para crear el trigger de notificación de login_attempts."""
+    try:
+        # Construir la URL de conexión desde las variables de entorno
+        db_url = f"postgresql://{os.getenv('POSTGRES_USER')}:{os.getenv('POSTGRES_PASSWORD')}@{os.getenv('POSTGRES_SERVER')}:{os.getenv('POSTGRES_PORT')}/{os.getenv('POSTGRES_DB')}"
+
+        # Crear conexión a la base de datos
+        engine = create_engine(db_url)
+
+        with engine.begin() as conn:
+            # Trigger por sentencia y sin payload: un INSERT de muchas filas produce una
+            # sola notificación, y PostgreSQL funde las repetidas de una misma transacción
+            conn.execute(text(f"""
+                CREATE OR REPLACE FUNCTION notify_login_attempt() RETURNS trigger
+                LANGUAGE plpgsql AS $$
+                BEGIN
+                    PERFORM pg_notify('{NOTIFY_CHANNEL}', '');
+                    RETURN NULL;
+                END;
+                $$;
+
+                DROP TRIGGER IF EXISTS login_attempts_notify ON login_attempts;
+                CREATE TRIGGER login_attempts_notify
+                AFTER INSERT ON login_attempts
+                FOR EACH STATEMENT EXECUTE FUNCTION notify_login_attempt();
+                """))
+
+        print("Migración completada exitosamente.")
+        return True
+    except Exception as e:
+        print(f"Error al ejecutar la migración: {e}")
+        return False
+
+if __name__ == "__main__":
+    run_migration()
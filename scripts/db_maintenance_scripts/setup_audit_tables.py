@@ -10,37 +10,39 @@ en las tablas de la base de datos, incluyendo:
 """
 import argparse
 import logging
-import psycopg2
-from psycopg2 import sql
-from psycopg2.extensions import ISOLATION_LEVEL_AUTOCOMMIT
+import os
+import sys
+from contextlib import contextmanager
+
+import psycopg
+from psycopg import sql
 
-# Configuración de logging
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s - %(levelname)s - %(message)s',
-    handlers=[
-        logging.StreamHandler(),
-        logging.FileHandler('audit_setup.log')
-    ]
-)
+# Importar el módulo no tiene efectos secundarios: los handlers de logging (incluido
+# el archivo audit_setup.log) y la lectura del entorno se hacen en main()/parse_args()
 logger = logging.getLogger(__name__)
 
-import os
-from pathlib import Path
-import sys
 
-# Añadir el directorio raíz al path para importaciones absolutas
-PROJECT_ROOT = Path(__file__).parent.parent.parent.absolute()
-sys.path.append(str(PROJECT_ROOT))
+def configure_logging():
+    """Configura el logging a consola y al archivo audit_setup.log."""
+    logging.basicConfig(
+        level=logging.INFO,
+        format='%(asctime)s - %(levelname)s - %(message)s',
+        handlers=[
+            logging.StreamHandler(),
+            logging.FileHandler('audit_setup.log')
+        ]
+    )
+
 
-# Configuración de la base de datos desde variables de entorno
-DEFAULT_DB_CONFIG = {
-    'dbname': os.getenv('POSTGRES_DB', 'seguros_db'),
-    'user': os.getenv('POSTGRES_USER', 'postgres'),
-    'password': 'postgres',
-    'host': 'localhost',
-    'port': '5432'
-}
+def default_db_config():
+    """Configuración de la base de datos desde variables de entorno."""
+    return {
+        'dbname': os.getenv('POSTGRES_DB', 'seguros_db'),
+        'user': os.getenv('POSTGRES_USER', 'postgres'),
+        'password': 'postgres',
+        'host': 'localhost',
+        'port': '5432'
+    }
 
 class AuditTableSetup:
     """Clase para configurar tablas y funciones de auditoría."""
@@ -49,12 +51,13 @@ class AuditTableSetup:
         """Inicializa la configuración de auditoría."""
         self.db_config = db_config
         self.conn = None
+        # Sentencias DDL acumuladas dentro de batched_ddl() (None = ejecución inmediata)
+        self._ddl_batch = None
     
     def connect(self):
         """Establece conexión a la base de datos."""
         try:
-            self.conn = psycopg2.connect(**self.db_config)
-            self.conn.set_isolation_level(ISOLATION_LEVEL_AUTOCOMMIT)
+            self.conn = psycopg.connect(**self.db_config, autocommit=True)
             logger.info("Conexión establecida con la base de datos")
             return True
         except Exception as e:
@@ -71,7 +74,9 @@ class AuditTableSetup:
         """Ejecuta una consulta SQL y devuelve el resultado."""
         try:
             with self.conn.cursor() as cur:
-                cur.execute(query, params or ())
+                # Sin params psycopg no interpreta los '%' del DDL (p. ej. en RAISE NOTICE) y
+                # admite varias sentencias en un mismo execute
+                cur.execute(query, params)
                 if cur.description:
                     return cur.fetchall()
                 return None
@@ -80,6 +85,42 @@ class AuditTableSetup:
             logger.debug(f"Consulta fallida: {query}")
             raise
     
+    def execute_ddl(self, query, message):
+        """Ejecuta una sentencia DDL, o la encola si se está dentro de ``batched_ddl()``.
+        
+        Args:
+            query: Sentencia SQL (texto o ``sql.Composable``)
+            message: Mensaje a registrar cuando la sentencia se haya aplicado
+        """
+        if self._ddl_batch is None:
+            self.execute_query(query)
+            logger.info(message)
+        else:
+            self._ddl_batch.append((query, message))
+    
+    @contextmanager
+    def batched_ddl(self):
+        """Acumula el DDL del bloque y lo envía en un solo execute dentro de una transacción.
+        
+        Convierte N idas y vueltas al servidor en una; si alguna sentencia falla no se
+        aplica ninguna. No se usa el modo pipeline de psycopg: en él cada execute admite
+        una sola sentencia, y el lote completo ya viaja en un único mensaje.
+        """
+        self._ddl_batch = []
+        try:
+            yield
+            batch = self._ddl_batch
+        finally:
+            self._ddl_batch = None
+        
+        if not batch:
+            return
+        statements = [sql.SQL(q) if isinstance(q, str) else q for q, _ in batch]
+        with self.conn.transaction():  # COMMIT al salir, ROLLBACK si hay excepción
+            self.execute_query(sql.SQL('\n').join(statements))
+        for _, message in batch:
+            logger.info(message)
+    
     def check_audit_schema(self):
         """Verifica si existe el esquema de auditoría y lo crea si es necesario."""
         query = """
@@ -94,14 +135,29 @@ class AuditTableSetup:
             END IF;
         END $$;
         """
-        self.execute_query(query)
-        logger.info("Verificando esquema de auditoría")
+        self.execute_ddl(query, "Esquema de auditoría verificado")
     
     def create_audit_log_table(self):
-        """Crea la tabla principal de logs de auditoría."""
+        """Crea la tabla principal de logs de auditoría, particionada por mes.
+        
+        La tabla se declara ``PARTITION BY RANGE (action_tstamp)`` desde su creación y
+        pg_partman crea las particiones futuras y aplica la retención eliminando
+        particiones completas (DROP TABLE) en lugar de DELETE + VACUUM.
+        """
         query = """
+        DO $$
+        BEGIN
+            -- Una tabla previa sin particionar no se puede convertir en el lugar
+            IF EXISTS (
+                SELECT 1 FROM pg_class c JOIN pg_namespace n ON n.oid = c.relnamespace
+                WHERE n.nspname = 'audit' AND c.relname = 'logged_actions' AND c.relkind <> 'p'
+            ) THEN
+                RAISE EXCEPTION 'audit.logged_actions existe y no está particionada; migre los datos antes de continuar';
+            END IF;
+        END $$;
+        
         CREATE TABLE IF NOT EXISTS audit.logged_actions (
-            event_id bigserial PRIMARY KEY,
+            event_id bigserial NOT NULL,
             schema_name text NOT NULL,
             table_name text NOT NULL,
             user_name text,
@@ -109,22 +165,14 @@ class AuditTableSetup:
             action TEXT NOT NULL CHECK (action IN ('I','D','U')),
             original_data jsonb,
             new_data jsonb,
-            query text,
+            query_hash bytea,
             transaction_id bigint,
             application_name text,
             client_addr inet,
             client_port integer,
-            client_query text,
             client_username text,
-            client_application_name text,
-            client_command_tag text,
-            client_session_id text,
-            client_backend_start timestamptz,
-            client_xid bigint,
-            client_xid_epoch bigint,
-            client_in_abort boolean,
-            client_in_error boolean
-        );
+            PRIMARY KEY (event_id, action_tstamp)
+        ) PARTITION BY RANGE (action_tstamp);
         
         COMMENT ON TABLE audit.logged_actions IS 'Registro de cambios realizados en tablas auditadas';
         COMMENT ON COLUMN audit.logged_actions.event_id IS 'Identificador único del evento de auditoría';
@@ -135,128 +183,139 @@ class AuditTableSetup:
         COMMENT ON COLUMN audit.logged_actions.action IS 'Tipo de acción: I=Insert, U=Update, D=Delete';
         COMMENT ON COLUMN audit.logged_actions.original_data IS 'Valores anteriores a la modificación (solo UPDATE/DELETE)';
         COMMENT ON COLUMN audit.logged_actions.new_data IS 'Nuevos valores (solo INSERT/UPDATE)';
-        COMMENT ON COLUMN audit.logged_actions.query IS 'Consulta SQL que originó el cambio';
+        COMMENT ON COLUMN audit.logged_actions.query_hash IS 'SHA-256 de la consulta SQL que originó el cambio (ver audit.queries)';
+        
+        -- Texto de las consultas, guardado una sola vez y referenciado por hash desde cada evento
+        CREATE TABLE IF NOT EXISTS audit.queries (
+            query_hash bytea PRIMARY KEY,
+            query text NOT NULL,
+            first_seen timestamptz NOT NULL DEFAULT CURRENT_TIMESTAMP
+        );
         
-        -- Índices para mejorar el rendimiento de las consultas
-        CREATE INDEX IF NOT EXISTS logged_actions_schema_table_idx 
-        ON audit.logged_actions(schema_name, table_name);
+        COMMENT ON TABLE audit.queries IS 'Consultas SQL que originaron cambios auditados, sin duplicados';
         
-        CREATE INDEX IF NOT EXISTS logged_actions_action_tstamp_idx 
-        ON audit.logged_actions(action_tstamp);
+        -- Tabla de ingreso UNLOGGED, sin índices ni particiones: los triggers creados con
+        -- --staging escriben aquí sin generar WAL y audit.flush_hot() mueve las filas a
+        -- audit.logged_actions. Tras una caída del servidor PostgreSQL la vacía, por lo que
+        -- se pueden perder los eventos de los últimos segundos aún no volcados
+        CREATE UNLOGGED TABLE IF NOT EXISTS audit.logged_actions_hot
+        (LIKE audit.logged_actions INCLUDING DEFAULTS);
         
-        CREATE INDEX IF NOT EXISTS logged_actions_action_idx 
-        ON audit.logged_actions(action);
+        COMMENT ON TABLE audit.logged_actions_hot IS 'Eventos de auditoría pendientes de volcar a audit.logged_actions';
         
-        -- Particionamiento por mes para manejar grandes volúmenes de datos
-        CREATE TABLE IF NOT EXISTS audit.logged_actions_default PARTITION OF audit.logged_actions 
-        DEFAULT;
+        CREATE OR REPLACE FUNCTION audit.flush_hot() 
+        RETURNS bigint AS $$
+            WITH moved AS (
+                DELETE FROM audit.logged_actions_hot RETURNING *
+            ), inserted AS (
+                INSERT INTO audit.logged_actions SELECT * FROM moved RETURNING 1
+            )
+            SELECT count(*) FROM inserted;
+        $$ LANGUAGE sql
+        SET search_path = pg_catalog, audit;
         
-        COMMENT ON TABLE audit.logged_actions_default IS 'Partición por defecto para la tabla de logs de auditoría';
+        COMMENT ON FUNCTION audit.flush_hot() IS 'Mueve los eventos de audit.logged_actions_hot a audit.logged_actions';
         
-        -- Función para crear particiones mensuales automáticamente
-        CREATE OR REPLACE FUNCTION audit.create_monthly_partition()
-        RETURNS trigger AS $$
-        DECLARE
-            partition_start DATE;
-            partition_end DATE;
-            partition_name TEXT;
-            partition_exists BOOLEAN;
+        -- Índices (se propagan a cada partición). Basta con uno compuesto: los filtros por
+        -- fecha se resuelven con la poda de particiones y "action" solo tiene 3 valores
+        DROP INDEX IF EXISTS audit.logged_actions_schema_table_idx;
+        DROP INDEX IF EXISTS audit.logged_actions_action_tstamp_idx;
+        DROP INDEX IF EXISTS audit.logged_actions_action_idx;
+        
+        CREATE INDEX IF NOT EXISTS logged_actions_schema_table_tstamp_idx 
+        ON audit.logged_actions(schema_name, table_name, action_tstamp DESC);
+        
+        -- BRIN para rangos de fechas dentro de cada partición (datos insertados en orden
+        -- temporal): ocupa unas pocas páginas y apenas encarece cada INSERT
+        CREATE INDEX IF NOT EXISTS logged_actions_action_tstamp_brin 
+        ON audit.logged_actions USING BRIN (action_tstamp) WITH (pages_per_range = 32);
+        
+        -- jsonb_path_ops: índice más pequeño que jsonb_ops y suficiente para consultas con @>
+        CREATE INDEX IF NOT EXISTS logged_actions_new_data_gin 
+        ON audit.logged_actions USING GIN (new_data jsonb_path_ops);
+        
+        -- Particiones mensuales y retención gestionadas por pg_partman
+        DO $$
         BEGIN
-            -- Calcular el primer día del mes actual
-            partition_start := DATE_TRUNC('month', CURRENT_DATE);
-            -- Calcular el primer día del mes siguiente
-            partition_end := partition_start + INTERVAL '1 month';
-            -- Nombre de la partición: logged_actions_YYYY_MM
-            partition_name := 'logged_actions_' || 
-                             TO_CHAR(partition_start, 'YYYY_MM');
-            
-            -- Verificar si la partición ya existe
-            SELECT EXISTS (
-                SELECT 1 
-                FROM pg_catalog.pg_class c
-                JOIN pg_catalog.pg_namespace n ON n.oid = c.relnamespace
-                WHERE n.nspname = 'audit' 
-                AND c.relname = partition_name
-                AND c.relkind = 'r'
-            ) INTO partition_exists;
-            
-            -- Crear la partición si no existe
-            IF NOT partition_exists THEN
-                EXECUTE format(
-                    'CREATE TABLE audit.%I PARTITION OF audit.logged_actions ' ||
-                    'FOR VALUES FROM (%L) TO (%L)',
-                    partition_name,
-                    partition_start,
-                    partition_end
-                );
+            IF EXISTS (SELECT 1 FROM pg_extension WHERE extname = 'pg_partman') THEN
+                IF NOT EXISTS (
+                    SELECT 1 FROM partman.part_config WHERE parent_table = 'audit.logged_actions'
+                ) THEN
+                    PERFORM partman.create_parent(
+                        p_parent_table := 'audit.logged_actions',
+                        p_control := 'action_tstamp',
+                        p_interval := '1 month',
+                        p_type := 'range',
+                        p_premake := 4
+                    );
+                END IF;
                 
-                -- Crear índices en la nueva partición
-                EXECUTE format(
-                    'CREATE INDEX %I ON audit.%I (action_tstamp)',
-                    partition_name || '_action_tstamp_idx',
-                    partition_name
-                );
+                UPDATE partman.part_config
+                SET retention = '12 months', retention_keep_table = false
+                WHERE parent_table = 'audit.logged_actions';
                 
-                EXECUTE format(
-                    'CREATE INDEX %I ON audit.%I (action)',
-                    partition_name || '_action_idx',
-                    partition_name
+                RAISE NOTICE 'Particiones de auditoría gestionadas por pg_partman';
+            ELSE
+                -- Sin pg_partman todo cae en la partición por defecto
+                CREATE TABLE IF NOT EXISTS audit.logged_actions_default
+                PARTITION OF audit.logged_actions DEFAULT;
+                RAISE NOTICE 'La extensión pg_partman no está instalada. Se usará solo la partición por defecto.';
+            END IF;
+        END $$;
+        
+        -- Programar el mantenimiento de pg_partman (crear particiones y aplicar retención)
+        DO $$
+        BEGIN
+            IF EXISTS (SELECT 1 FROM pg_extension WHERE extname = 'pg_cron')
+               AND EXISTS (SELECT 1 FROM pg_extension WHERE extname = 'pg_partman') THEN
+                -- Reemplaza la tarea de la antigua función audit.create_monthly_partition()
+                PERFORM cron.unschedule(jobid) FROM cron.job WHERE jobname = 'create_audit_partition';
+                PERFORM cron.schedule(
+                    'audit_partman_maintenance',
+                    '0 * * * *',  -- Cada hora, como recomienda pg_partman
+                    'CALL partman.run_maintenance_proc()'
                 );
-                
-                RAISE NOTICE 'Creada nueva partición de auditoría: %', partition_name;
+                RAISE NOTICE 'Tarea programada para el mantenimiento de particiones';
+            ELSE
+                RAISE NOTICE 'pg_cron o pg_partman no están instalados. Ejecute partman.run_maintenance_proc() periódicamente.';
             END IF;
-            
-            RETURN NULL;
-        END;
-        $$ LANGUAGE plpgsql;
+        END $$;
         
-        -- Programar la creación de particiones mensuales
+        -- Volcado periódico de la tabla de ingreso (pg_cron >= 1.5 admite intervalos en segundos)
         DO $$
         BEGIN
-            -- Verificar si el trigger ya existe para evitar duplicados
-            IF NOT EXISTS (
-                SELECT 1 
-                FROM pg_trigger 
-                WHERE tgname = 'trigger_create_monthly_partition'
-            ) THEN
-                -- Crear un evento que se ejecute el primer día de cada mes
-                PERFORM pg_catalog.pg_event_trigger_dropped();
-                
-                -- Usar pg_cron para programar la creación de particiones
-                -- Nota: Requiere la extensión pg_cron instalada
-                IF EXISTS (SELECT 1 FROM pg_extension WHERE extname = 'pg_cron') THEN
-                    PERFORM cron.schedule(
-                        'create_audit_partition',
-                        '0 0 1 * *',  -- El primer día de cada mes a medianoche
-                        'SELECT audit.create_monthly_partition()'
-                    );
-                    RAISE NOTICE 'Tarea programada para crear particiones mensuales';
-                ELSE
-                    RAISE NOTICE 'La extensión pg_cron no está instalada. No se pudo programar la creación de particiones.';
-                END IF;
+            IF EXISTS (SELECT 1 FROM pg_extension WHERE extname = 'pg_cron') THEN
+                PERFORM cron.schedule('audit_flush_hot', '30 seconds', 'SELECT audit.flush_hot()');
+                RAISE NOTICE 'Tarea programada para volcar audit.logged_actions_hot';
+            ELSE
+                RAISE NOTICE 'pg_cron no está instalado. Ejecute audit.flush_hot() periódicamente.';
             END IF;
         END $$;
         
-        -- Crear partición para el mes actual si no existe
-        SELECT audit.create_monthly_partition();
+        DROP FUNCTION IF EXISTS audit.create_monthly_partition();
         """
         
-        self.execute_query(query)
-        logger.info("Tabla de logs de auditoría configurada")
+        self.execute_ddl(query, "Tabla de logs de auditoría configurada")
     
     def create_audit_trigger_function(self):
-        """Crea la función que se ejecutará en los triggers de auditoría."""
+        """Crea la función genérica de auditoría por fila y la de volcado diferido.
+        
+        Los triggers por fila nuevos usan funciones especializadas por tabla (ver
+        ``_row_trigger_functions``); la genérica se mantiene para los triggers creados
+        con versiones anteriores de este script.
+        """
         query = """
         CREATE OR REPLACE FUNCTION audit.if_modified_func() 
         RETURNS TRIGGER AS $$
         DECLARE
-            audit_row audit.logged_actions;
-            include_values boolean;
-            log_diffs boolean;
+            -- Datos de la sesión, obtenidos una sola vez por invocación
+            v_query text := current_query();
+            v_app text := current_setting('application_name', true);
+            v_txid bigint := txid_current();
+            v_query_hash bytea;
             h_old jsonb;
             h_new jsonb;
             excluded_cols text[] = ARRAY[]::text[];
-            row_data jsonb;
             changed_fields jsonb;
         BEGIN
             -- Verificar si la auditoría está habilitada para esta tabla
@@ -267,162 +326,496 @@ class AuditTableSetup:
             -- Configuración específica de la tabla
             -- Se pueden excluir columnas sensibles de ser auditadas
             -- Ejemplo: excluded_cols = ARRAY['password', 'token'];
-            
-            audit_row = ROW(
-                nextval('audit.logged_actions_event_id_seq'), -- event_id
-                TG_TABLE_SCHEMA::text,                        -- schema_name
-                TG_TABLE_NAME::text,                          -- table_name
-                session_user::text,                           -- user_name
-                current_timestamp,                            -- action_tstamp
-                substring(TG_OP, 1, 1),                       -- action
-                NULL, NULL,                                   -- original_data, new_data
-                current_query(),                              -- query
-                txid_current(),                               -- transaction_id
-                current_setting('application_name', true),    -- application_name
-                inet_client_addr(),                           -- client_addr
-                inet_client_port(),                           -- client_port
-                NULL,                                         -- client_query
-                current_user,                                 -- client_username
-                current_setting('application_name', true),    -- client_application_name
-                NULL,                                         -- client_command_tag
-                NULL,                                         -- client_session_id
-                NULL,                                         -- client_backend_start
-                NULL,                                         -- client_xid
-                NULL,                                         -- client_xid_epoch
-                NULL,                                         -- client_in_abort
-                NULL                                          -- client_in_error
-            );
-            
-            -- Manejar diferentes tipos de operaciones
-            IF TG_ARGV[0]::boolean IS DISTINCT FROM FALSE THEN
-                audit_row.client_query = current_query();
-            END IF;
-            
             IF TG_ARGV[1] IS NOT NULL THEN
                 excluded_cols = TG_ARGV[1]::text[];
             END IF;
             
             IF (TG_OP = 'UPDATE' AND TG_LEVEL = 'ROW') THEN
-                -- Para actualizaciones, registrar solo los campos que cambiaron
-                h_old = to_jsonb(OLD);
-                h_new = to_jsonb(NEW);
-                
-                -- Filtrar columnas excluidas
-                IF array_length(excluded_cols, 1) > 0 THEN
-                    FOR i IN array_lower(excluded_cols, 1)..array_upper(excluded_cols, 1) LOOP
-                        h_old = h_old - excluded_cols[i];
-                        h_new = h_new - excluded_cols[i];
-                    END LOOP;
+                -- UPDATE que no cambió nada: se descarta con una comparación binaria de las
+                -- filas (*=) antes de construir ningún jsonb. A diferencia de
+                -- IS NOT DISTINCT FROM no exige operador de igualdad (json, point...)
+                IF OLD *= NEW THEN
+                    RETURN NULL;
                 END IF;
                 
-                -- Encontrar campos que realmente cambiaron
-                changed_fields = '{}'::jsonb;
+                -- Para actualizaciones, registrar solo los campos que cambiaron
+                -- El operador jsonb - text[] quita todas las columnas excluidas de una vez
+                h_old = to_jsonb(OLD) - excluded_cols;
+                h_new = to_jsonb(NEW) - excluded_cols;
                 
-                FOR key, value IN SELECT * FROM jsonb_each(h_new) LOOP
-                    IF (h_old->key)::text IS DISTINCT FROM (h_new->key)::text THEN
-                        changed_fields = jsonb_insert(
-                            changed_fields,
-                            ARRAY[key],
-                            h_new->key
-                        );
-                    END IF;
-                END LOOP;
+                -- Encontrar campos que realmente cambiaron en una sola pasada sobre el jsonb
+                -- (comparación jsonb directa, sin ::text que obliga a des-TOASTear)
+                SELECT jsonb_object_agg(e.key, e.value) INTO changed_fields
+                FROM jsonb_each(h_new) AS e(key, value)
+                WHERE h_old -> e.key IS DISTINCT FROM e.value;
                 
-                -- Si no hay cambios, no registrar nada
-                IF changed_fields = '{}'::jsonb THEN
+                -- Si no hay cambios, no registrar nada (jsonb_object_agg sin filas da NULL)
+                IF changed_fields IS NULL THEN
                     RETURN NULL;
                 END IF;
                 
-                audit_row.original_data = h_old;
-                audit_row.new_data = changed_fields;
+                h_new = changed_fields;
                 
             ELSIF (TG_OP = 'DELETE' AND TG_LEVEL = 'ROW') THEN
                 -- Para eliminaciones, registrar el registro completo
-                audit_row.original_data = to_jsonb(OLD);
-                
-                -- Filtrar columnas excluidas
-                IF array_length(excluded_cols, 1) > 0 THEN
-                    FOR i IN array_lower(excluded_cols, 1)..array_upper(excluded_cols, 1) LOOP
-                        audit_row.original_data = audit_row.original_data - excluded_cols[i];
-                    END LOOP;
-                END IF;
+                h_old = to_jsonb(OLD) - excluded_cols;
                 
             ELSIF (TG_OP = 'INSERT' AND TG_LEVEL = 'ROW') THEN
                 -- Para inserciones, registrar el nuevo registro
-                audit_row.new_data = to_jsonb(NEW);
-                
-                -- Filtrar columnas excluidas
-                IF array_length(excluded_cols, 1) > 0 THEN
-                    FOR i IN array_lower(excluded_cols, 1)..array_upper(excluded_cols, 1) LOOP
-                        audit_row.new_data = audit_row.new_data - excluded_cols[i];
-                    END LOOP;
-                END IF;
+                h_new = to_jsonb(NEW) - excluded_cols;
                 
             ELSE
                 RAISE EXCEPTION '[audit.if_modified_func] - Trigger funcionó como disparador para operación % inesperada', TG_OP;
                 RETURN NULL;
             END IF;
             
-            INSERT INTO audit.logged_actions VALUES (audit_row.*);
+            -- La consulta se guarda una sola vez en audit.queries y el evento la referencia
+            IF TG_ARGV[0]::boolean IS DISTINCT FROM FALSE THEN
+                v_query_hash = sha256(convert_to(v_query, 'UTF8'));
+                INSERT INTO audit.queries (query_hash, query)
+                VALUES (v_query_hash, v_query)
+                ON CONFLICT (query_hash) DO NOTHING;
+            END IF;
+            
+            -- Tablas con tabla de ingreso: directo a la UNLOGGED, que no tiene índices
+            IF TG_ARGV[2]::boolean IS TRUE THEN
+                INSERT INTO audit.logged_actions_hot (
+                    schema_name, table_name, user_name, action, original_data, new_data, query_hash,
+                    transaction_id, application_name, client_addr, client_port, client_username
+                ) VALUES (
+                    TG_TABLE_SCHEMA::text, TG_TABLE_NAME::text, session_user::text, substring(TG_OP, 1, 1),
+                    h_old, h_new, v_query_hash, v_txid, v_app, inet_client_addr(), inet_client_port(),
+                    current_user
+                );
+                RETURN NULL;
+            END IF;
+            
+            -- Resto de tablas: acumular en una tabla temporal de la sesión (sin índices); el
+            -- trigger diferido audit.flush_pending() la vuelca en un solo INSERT ... SELECT al
+            -- confirmar. event_id y action_tstamp toman los valores por defecto copiados con LIKE
+            IF to_regclass('pg_temp.audit_pending') IS NULL THEN
+                CREATE TEMP TABLE audit_pending (LIKE audit.logged_actions INCLUDING DEFAULTS)
+                ON COMMIT DELETE ROWS;
+            END IF;
+            INSERT INTO pg_temp.audit_pending (
+                schema_name, table_name, user_name, action, original_data, new_data, query_hash,
+                transaction_id, application_name, client_addr, client_port, client_username
+            ) VALUES (
+                TG_TABLE_SCHEMA::text, TG_TABLE_NAME::text, session_user::text, substring(TG_OP, 1, 1),
+                h_old, h_new, v_query_hash, v_txid, v_app, inet_client_addr(), inet_client_port(),
+                current_user
+            );
+            IF current_setting('audit.pending', true) IS DISTINCT FROM 'on' THEN
+                PERFORM set_config('audit.pending', 'on', true);
+            END IF;
+            RETURN NULL;
+        END;
+        $$ LANGUAGE plpgsql SECURITY DEFINER
+        -- search_path fijo: evita resolver nombres contra el search_path del usuario en cada
+        -- llamada y que un objeto homónimo suplante a los de pg_catalog/audit
+        SET search_path = pg_catalog, audit, pg_temp;
+        
+        -- Volcado de los eventos acumulados por audit.if_modified_func(). Se ejecuta como
+        -- constraint trigger diferido (una vez por fila), pero solo la primera invocación
+        -- con eventos pendientes hace el trabajo; el resto solo consulta la marca
+        CREATE OR REPLACE FUNCTION audit.flush_pending() 
+        RETURNS TRIGGER AS $$
+        BEGIN
+            IF current_setting('audit.pending', true) = 'on' THEN
+                INSERT INTO audit.logged_actions SELECT * FROM pg_temp.audit_pending;
+                TRUNCATE pg_temp.audit_pending;
+                PERFORM set_config('audit.pending', 'off', true);
+            END IF;
             RETURN NULL;
         END;
-        $$ LANGUAGE plpgsql SECURITY DEFINER;
+        $$ LANGUAGE plpgsql SECURITY DEFINER
+        SET search_path = pg_catalog, audit, pg_temp;
         
         -- Comentarios para documentación
         COMMENT ON FUNCTION audit.if_modified_func() IS 'Función para registrar cambios en tablas auditadas';
+        COMMENT ON FUNCTION audit.flush_pending() IS 'Vuelca en audit.logged_actions los eventos acumulados en la transacción';
         """
         
-        self.execute_query(query)
-        logger.info("Función de trigger de auditoría creada")
+        self.execute_ddl(query, "Función de trigger de auditoría creada")
     
-    def create_audit_trigger(self, schema_name, table_name, audit_query_text=False, excluded_columns=None):
-        """Crea un trigger de auditoría para una tabla específica.
+    def create_audit_statement_trigger_function(self):
+        """Crea la función de auditoría a nivel de sentencia basada en tablas de transición.
+        
+        Una sentencia que modifica N filas ejecuta la función una sola vez y registra
+        todas las filas con un único INSERT ... SELECT sobre ``old_tbl``/``new_tbl``.
+        En UPDATE las filas antiguas y nuevas se emparejan por la clave primaria.
+        """
+        query = """
+        CREATE OR REPLACE FUNCTION audit.if_modified_stmt_func() 
+        RETURNS TRIGGER AS $$
+        DECLARE
+            v_query_hash bytea;
+            excluded_cols text[] = ARRAY[]::text[];
+            pk_cols text;
+            v_cols text;
+            -- Tabla destino: la registrada en el WAL salvo que el trigger use la de ingreso
+            v_target text := CASE WHEN TG_ARGV[2]::boolean
+                THEN 'logged_actions_hot' ELSE 'logged_actions' END;
+            -- Datos de la sesión, obtenidos una sola vez por sentencia y no por fila
+            v_query text := current_query();
+            v_app text := current_setting('application_name', true);
+            v_txid bigint := txid_current();
+        BEGIN
+            IF TG_WHEN <> 'AFTER' OR TG_LEVEL <> 'STATEMENT' THEN
+                RAISE EXCEPTION 'audit.if_modified_stmt_func() solo puede ejecutarse con triggers AFTER ... FOR EACH STATEMENT';
+            END IF;
+            
+            -- La consulta se guarda una sola vez en audit.queries y los eventos la referencian
+            IF TG_ARGV[0]::boolean IS DISTINCT FROM FALSE THEN
+                v_query_hash = sha256(convert_to(v_query, 'UTF8'));
+                INSERT INTO audit.queries (query_hash, query)
+                VALUES (v_query_hash, v_query)
+                ON CONFLICT (query_hash) DO NOTHING;
+            END IF;
+            
+            IF TG_ARGV[1] IS NOT NULL THEN
+                excluded_cols = TG_ARGV[1]::text[];
+            END IF;
+            
+            -- Con columnas excluidas se leen de las tablas de transición solo las demás
+            -- (más la clave primaria, necesaria para emparejar en UPDATE): to_jsonb() sobre
+            -- la fila completa des-TOASTearía columnas voluminosas solo para descartarlas.
+            -- La lista se calcula una vez por sentencia, no por fila
+            IF cardinality(excluded_cols) > 0 THEN
+                SELECT string_agg(quote_ident(a.attname), ', ' ORDER BY a.attnum)
+                INTO v_cols
+                FROM pg_attribute a
+                WHERE a.attrelid = TG_RELID AND a.attnum > 0 AND NOT a.attisdropped
+                  AND (a.attname <> ALL (excluded_cols) OR EXISTS (
+                      SELECT 1 FROM pg_index i
+                      WHERE i.indrelid = TG_RELID AND i.indisprimary AND a.attnum = ANY (i.indkey)
+                  ));
+            ELSE
+                v_cols = '*';
+            END IF;
+            
+            IF TG_OP IN ('INSERT', 'DELETE') THEN
+                EXECUTE format($f$
+                    INSERT INTO audit.%I (
+                        schema_name, table_name, user_name, action, %I, query_hash, transaction_id,
+                        application_name, client_addr, client_port, client_username
+                    )
+                    SELECT
+                        $1, $2, session_user::text, $3, to_jsonb(r) - $4, $5, $6,
+                        $7, inet_client_addr(), inet_client_port(), current_user
+                    FROM (SELECT %s FROM %I) AS r
+                $f$,
+                    v_target,
+                    CASE TG_OP WHEN 'INSERT' THEN 'new_data' ELSE 'original_data' END,
+                    v_cols,
+                    CASE TG_OP WHEN 'INSERT' THEN 'new_tbl' ELSE 'old_tbl' END)
+                USING TG_TABLE_SCHEMA::text, TG_TABLE_NAME::text, substring(TG_OP, 1, 1), excluded_cols,
+                      v_query_hash, v_txid, v_app;
+                
+            ELSIF TG_OP = 'UPDATE' THEN
+                -- Columnas de la clave primaria para emparejar filas antiguas y nuevas
+                SELECT string_agg(quote_ident(a.attname), ', ' ORDER BY array_position(i.indkey, a.attnum))
+                INTO pk_cols
+                FROM pg_index i
+                JOIN pg_attribute a ON a.attrelid = i.indrelid AND a.attnum = ANY (i.indkey)
+                WHERE i.indrelid = TG_RELID AND i.indisprimary;
+                
+                IF pk_cols IS NULL THEN
+                    RAISE EXCEPTION '[audit.if_modified_stmt_func] - %.% no tiene clave primaria; use el trigger por fila', TG_TABLE_SCHEMA, TG_TABLE_NAME;
+                END IF;
+                
+                -- FULL JOIN: si cambió la clave primaria la fila aparece solo en un lado y
+                -- se registra completa; si no, solo se registran los campos modificados
+                EXECUTE format($f$
+                    INSERT INTO audit.%3$I (
+                        schema_name, table_name, user_name, action, original_data, new_data, query_hash,
+                        transaction_id, application_name, client_addr, client_port, client_username
+                    )
+                    SELECT
+                        $1, $2, session_user::text, 'U', r.h_old,
+                        CASE WHEN r.h_old IS NULL OR r.h_new IS NULL THEN r.h_new ELSE d.changed END,
+                        $3, $5, $6, inet_client_addr(), inet_client_port(), current_user
+                    FROM (
+                        SELECT to_jsonb(o) - $4 AS h_old, to_jsonb(n) - $4 AS h_new
+                        FROM (SELECT %2$s FROM old_tbl) AS o
+                        FULL JOIN (SELECT %2$s FROM new_tbl) AS n USING (%1$s)
+                        -- Filas idénticas fuera antes de convertirlas a jsonb
+                        WHERE o IS NULL OR n IS NULL OR NOT (o *= n)
+                    ) AS r
+                    CROSS JOIN LATERAL (
+                        SELECT jsonb_object_agg(e.key, e.value) AS changed
+                        FROM jsonb_each(r.h_new) AS e(key, value)
+                        WHERE r.h_old -> e.key IS DISTINCT FROM e.value
+                    ) AS d
+                    WHERE d.changed IS NOT NULL OR r.h_old IS NULL OR r.h_new IS NULL
+                $f$, pk_cols, v_cols, v_target)
+                USING TG_TABLE_SCHEMA::text, TG_TABLE_NAME::text, v_query_hash, excluded_cols,
+                      v_txid, v_app;
+                
+            ELSE
+                RAISE EXCEPTION '[audit.if_modified_stmt_func] - Trigger funcionó como disparador para operación % inesperada', TG_OP;
+            END IF;
+            
+            RETURN NULL;
+        END;
+        $$ LANGUAGE plpgsql SECURITY DEFINER
+        SET search_path = pg_catalog, audit, pg_temp;
+        
+        COMMENT ON FUNCTION audit.if_modified_stmt_func() IS 'Función para registrar por sentencia los cambios en tablas auditadas';
+        """
+        
+        self.execute_ddl(query, "Función de trigger de auditoría por sentencia creada")
+    
+    def _row_trigger_functions(self, schema_name, table_name, audit_query_text, excluded_array,
+                               staging):
+        """Genera las tres funciones de auditoría por fila especializadas para una tabla.
+        
+        Todo lo que ``audit.if_modified_func()`` decide en cada ejecución (operación,
+        argumentos del trigger, columnas excluidas, tabla destino) se conoce al crear el
+        trigger, así que se escribe como constante en una función por operación.
+        
+        Returns:
+            Diccionario operación ('ins', 'upd', 'del') -> (nombre, DDL de la función)
+        """
+        strip = sql.SQL('')
+        if excluded_array != '{}':
+            strip = sql.SQL(' - {}::text[]').format(sql.Literal(excluded_array))
+        
+        captures = {
+            'ins': ('I', sql.SQL("h_new = to_jsonb(NEW){strip};").format(strip=strip)),
+            'del': ('D', sql.SQL("h_old = to_jsonb(OLD){strip};").format(strip=strip)),
+            'upd': ('U', sql.SQL("""h_old = to_jsonb(OLD){strip};
+            -- Solo los campos que cambiaron; sin cambios no se registra nada
+            SELECT jsonb_object_agg(e.key, e.value) INTO h_new
+            FROM jsonb_each(to_jsonb(NEW){strip}) AS e(key, value)
+            WHERE h_old -> e.key IS DISTINCT FROM e.value;
+            IF h_new IS NULL THEN
+                RETURN NULL;
+            END IF;""").format(strip=strip)),
+        }
+        
+        record_query = sql.SQL('')
+        if audit_query_text:
+            record_query = sql.SQL("""
+            v_query_hash = sha256(convert_to(current_query(), 'UTF8'));
+            INSERT INTO audit.queries (query_hash, query)
+            VALUES (v_query_hash, current_query())
+            ON CONFLICT (query_hash) DO NOTHING;""")
+        
+        # Sin tabla de ingreso, por el búfer de la transacción (audit.flush_pending)
+        write = """
+            INSERT INTO {target} (
+                schema_name, table_name, user_name, action, original_data, new_data, query_hash,
+                transaction_id, application_name, client_addr, client_port, client_username
+            ) VALUES (
+                {schema}, {table}, session_user::text, {action}, h_old, h_new, v_query_hash,
+                txid_current(), current_setting('application_name', true), inet_client_addr(),
+                inet_client_port(), current_user
+            );"""
+        if not staging:
+            write = """
+            IF to_regclass('pg_temp.audit_pending') IS NULL THEN
+                CREATE TEMP TABLE audit_pending (LIKE audit.logged_actions INCLUDING DEFAULTS)
+                ON COMMIT DELETE ROWS;
+            END IF;""" + write + """
+            IF current_setting('audit.pending', true) IS DISTINCT FROM 'on' THEN
+                PERFORM set_config('audit.pending', 'on', true);
+            END IF;"""
+        
+        template = """
+        CREATE OR REPLACE FUNCTION {function_name}() 
+        RETURNS TRIGGER AS $$
+        DECLARE
+            h_old jsonb;
+            h_new jsonb;
+            v_query_hash bytea;
+        BEGIN
+            {capture}
+            {record_query}
+            """ + write + """
+            RETURN NULL;
+        END;
+        $$ LANGUAGE plpgsql SECURITY DEFINER
+        SET search_path = pg_catalog, audit, pg_temp;
+        """
+        
+        functions = {}
+        for operation, (action, capture) in captures.items():
+            function_name = sql.Identifier('audit', f'if_modified_{schema_name}_{table_name}_{operation}')
+            functions[operation] = (function_name, sql.SQL(template).format(
+                function_name=function_name,
+                capture=capture,
+                record_query=record_query,
+                target=sql.Identifier('audit', 'logged_actions_hot') if staging
+                else sql.Identifier('pg_temp', 'audit_pending'),
+                schema=sql.Literal(schema_name),
+                table=sql.Literal(table_name),
+                action=sql.Literal(action),
+            ))
+        return functions
+    
+    def create_audit_trigger(self, schema_name, table_name, audit_query_text=False, excluded_columns=None,
+                             row_level=False, staging=False):
+        """Crea los triggers de auditoría para una tabla específica.
+        
+        Por defecto se crean tres triggers por sentencia (INSERT, UPDATE y DELETE) con
+        tablas de transición, de modo que una operación masiva se audita con un solo
+        INSERT. Las tablas sin clave primaria necesitan ``row_level=True``.
+        
+        Los eventos se escriben en ``audit.logged_actions``, registrada en el WAL. Con
+        ``staging=True`` van a ``audit.logged_actions_hot`` (UNLOGGED) y llegan a
+        ``audit.logged_actions`` con el volcado periódico; solo debe usarse si hay una
+        tarea que lo ejecute (ver ``resolve_staging``).
         
         Args:
             schema_name: Nombre del esquema de la tabla
             table_name: Nombre de la tabla a auditar
-            audit_query_text: Si es True, registra la consulta completa que originó el cambio
+            audit_query_text: Si es True, registra la consulta que originó el cambio (en audit.queries, por hash)
             excluded_columns: Lista de columnas a excluir de la auditoría
+            row_level: Si es True, usa triggers por fila con funciones especializadas para la tabla
+            staging: Si es True, los eventos pasan por la tabla UNLOGGED de ingreso
         """
-        if excluded_columns is None:
-            excluded_columns = []
+        # Los argumentos de un trigger solo pueden ser literales de texto: las columnas
+        # excluidas viajan como literal de array ('{"a","b"}') que la función castea a text[]
+        excluded_array = '{' + ','.join(
+            '"' + col.replace('\\', '\\\\').replace('"', '\\"') + '"' for col in excluded_columns or []
+        ) + '}'
+        trigger_args = sql.SQL(', ').join([
+            sql.Literal('true' if audit_query_text else 'false'),
+            sql.Literal(excluded_array),
+            sql.Literal('true' if staging else 'false'),
+        ])
         
-        # Convertir la lista de columnas excluidas a una cadena para SQL
-        excluded_cols_str = "ARRAY['" + "','".join(excluded_columns) + "']" if excluded_columns else 'NULL'
+        functions = self._row_trigger_functions(
+            schema_name, table_name, audit_query_text, excluded_array, staging
+        )
         
-        query = sql.SQL("""
-        DO $$
-        BEGIN
-            -- Eliminar el trigger si ya existe
-            DROP TRIGGER IF EXISTS {trigger_name} ON {schema_table};
+        if row_level:
+            # Un trigger por operación, cada uno con su función especializada
+            create_triggers = """
+            {function_ins}
+            {function_upd}
+            {function_del}
             
-            -- Crear el trigger
-            CREATE TRIGGER {trigger_name}
+            CREATE TRIGGER {trigger_name_ins}
+            AFTER INSERT ON {schema_table}
+            FOR EACH ROW
+            EXECUTE FUNCTION {function_name_ins}();
+            
+            -- Los UPDATE sin cambios ni siquiera encolan el evento ni llaman a la función
+            CREATE TRIGGER {trigger_name_upd}
+            AFTER UPDATE ON {schema_table}
+            FOR EACH ROW
+            WHEN (NOT (OLD *= NEW))
+            EXECUTE FUNCTION {function_name_upd}();
+            
+            CREATE TRIGGER {trigger_name_del}
+            AFTER DELETE ON {schema_table}
+            FOR EACH ROW
+            EXECUTE FUNCTION {function_name_del}();
+            """
+            if not staging:
+                create_triggers += """
+            -- Vuelca los eventos acumulados al final de la transacción
+            CREATE CONSTRAINT TRIGGER {trigger_name_flush}
             AFTER INSERT OR UPDATE OR DELETE ON {schema_table}
+            DEFERRABLE INITIALLY DEFERRED
             FOR EACH ROW
-            EXECUTE FUNCTION audit.if_modified_func({audit_query_text}, {excluded_columns});
+            EXECUTE FUNCTION audit.flush_pending();
+            """
+        else:
+            # Las tablas de transición exigen un trigger por evento
+            create_triggers = """
+            CREATE TRIGGER {trigger_name_ins}
+            AFTER INSERT ON {schema_table}
+            REFERENCING NEW TABLE AS new_tbl
+            FOR EACH STATEMENT
+            EXECUTE FUNCTION audit.if_modified_stmt_func({trigger_args});
             
-            RAISE NOTICE 'Trigger de auditoría creado para %.%', '{schema_name}', '{table_name}';
-        END $$;
-        """).format(
+            CREATE TRIGGER {trigger_name_upd}
+            AFTER UPDATE ON {schema_table}
+            REFERENCING OLD TABLE AS old_tbl NEW TABLE AS new_tbl
+            FOR EACH STATEMENT
+            EXECUTE FUNCTION audit.if_modified_stmt_func({trigger_args});
+            
+            CREATE TRIGGER {trigger_name_del}
+            AFTER DELETE ON {schema_table}
+            REFERENCING OLD TABLE AS old_tbl
+            FOR EACH STATEMENT
+            EXECUTE FUNCTION audit.if_modified_stmt_func({trigger_args});
+            """
+        
+        # Sentencias DDL normales (sin bloque DO) para no compilar plpgsql en cada llamada
+        query = sql.SQL("""
+        -- Eliminar los triggers si ya existen (de cualquiera de las dos variantes)
+        DROP TRIGGER IF EXISTS {trigger_name} ON {schema_table};
+        DROP TRIGGER IF EXISTS {trigger_name_ins} ON {schema_table};
+        DROP TRIGGER IF EXISTS {trigger_name_upd} ON {schema_table};
+        DROP TRIGGER IF EXISTS {trigger_name_del} ON {schema_table};
+        DROP TRIGGER IF EXISTS {trigger_name_flush} ON {schema_table};
+        DROP FUNCTION IF EXISTS {function_name_ins}();
+        DROP FUNCTION IF EXISTS {function_name_upd}();
+        DROP FUNCTION IF EXISTS {function_name_del}();
+        """ + create_triggers).format(
             trigger_name=sql.Identifier(f'audit_trigger_{table_name}'),
+            trigger_name_ins=sql.Identifier(f'audit_trigger_{table_name}_ins'),
+            trigger_name_upd=sql.Identifier(f'audit_trigger_{table_name}_upd'),
+            trigger_name_del=sql.Identifier(f'audit_trigger_{table_name}_del'),
+            trigger_name_flush=sql.Identifier(f'audit_trigger_{table_name}_flush'),
             schema_table=sql.Identifier(schema_name, table_name),
-            schema_name=sql.SQL(schema_name),
-            table_name=sql.SQL(table_name),
-            audit_query_text=sql.SQL('true' if audit_query_text else 'false'),
-            excluded_columns=sql.SQL(excluded_cols_str)
+            trigger_args=trigger_args,
+            function_ins=functions['ins'][1],
+            function_upd=functions['upd'][1],
+            function_del=functions['del'][1],
+            function_name_ins=functions['ins'][0],
+            function_name_upd=functions['upd'][0],
+            function_name_del=functions['del'][0],
         )
         
         try:
-            self.execute_query(query)
-            logger.info(f"Trigger de auditoría creado para {schema_name}.{table_name}")
+            self.execute_ddl(query, f"Trigger de auditoría creado para {schema_name}.{table_name}")
             return True
         except Exception as e:
             logger.error(f"Error al crear trigger para {schema_name}.{table_name}: {e}")
             return False
     
-    def setup_default_audit_tables(self):
-        """Configura la auditoría para las tablas principales del sistema."""
+    def resolve_staging(self, requested, scheduling=False):
+        """Decide si los triggers escriben en la tabla de ingreso ``audit.logged_actions_hot``.
+        
+        Solo audit_flush_hot, la tarea de pg_cron, mueve esos eventos a
+        ``audit.logged_actions``; sin ella nunca llegarían allí y una caída los borraría.
+        Por eso la tabla de ingreso se usa solo si se pidió y la tarea existe.
+        
+        Args:
+            requested: Si se pidió la tabla de ingreso (--staging)
+            scheduling: True si el lote en curso programa la tarea (``setup``), en cuyo
+                caso basta con que pg_cron esté instalado
+        
+        Returns:
+            True si los triggers deben usar la tabla de ingreso
+        """
+        if not requested:
+            return False
+        
+        has_job = self.execute_query("SELECT to_regclass('cron.job') IS NOT NULL")[0][0]
+        if has_job and not scheduling:
+            has_job = self.execute_query(
+                "SELECT EXISTS (SELECT 1 FROM cron.job WHERE jobname = 'audit_flush_hot')"
+            )[0][0]
+        if not has_job:
+            logger.warning(
+                "Se pidió la tabla de ingreso audit.logged_actions_hot, pero no hay una tarea "
+                "de pg_cron 'audit_flush_hot' que la vuelque; los eventos se escribirán "
+                "directamente en audit.logged_actions"
+            )
+        return has_job
+    
+    def setup_default_audit_tables(self, staging=False):
+        """Configura la auditoría para las tablas principales del sistema.
+        
+        Args:
+            staging: Si es True, los triggers escriben en la tabla de ingreso UNLOGGED
+        """
         # Lista de tablas a auditar con sus columnas excluidas (si las hay)
         tables_to_audit = [
             # Formato: (esquema, tabla, [columnas_excluidas])
@@ -435,26 +828,53 @@ class AuditTableSetup:
             # Agregar más tablas según sea necesario
         ]
         
+        # Omitir las tablas que no existen: dentro de un lote su error abortaría todo el setup
+        existing = self.execute_query(
+            """
+            SELECT t.schema_name, t.table_name
+            FROM unnest(%s::text[], %s::text[]) AS t(schema_name, table_name)
+            WHERE to_regclass(format('%%I.%%I', t.schema_name, t.table_name)) IS NOT NULL
+            """,
+            ([schema for schema, _, _ in tables_to_audit], [table for _, table, _ in tables_to_audit]),
+        )
+        existing = set(existing or [])
+        
         # Crear triggers para cada tabla
         for schema, table, excluded_cols in tables_to_audit:
-            self.create_audit_trigger(schema, table, audit_query_text=True, excluded_columns=excluded_cols)
+            if (schema, table) not in existing:
+                logger.warning(f"La tabla {schema}.{table} no existe; se omite su auditoría")
+                continue
+            self.create_audit_trigger(
+                schema, table, audit_query_text=True, excluded_columns=excluded_cols,
+                staging=staging,
+            )
     
-    def setup_audit_system(self):
-        """Configura todo el sistema de auditoría."""
+    def setup_audit_system(self, staging=False):
+        """Configura todo el sistema de auditoría.
+        
+        Args:
+            staging: Si se pidió la tabla de ingreso UNLOGGED (ver ``resolve_staging``)
+        """
         try:
             logger.info("Iniciando configuración del sistema de auditoría...")
             
-            # Verificar y crear el esquema de auditoría
-            self.check_audit_schema()
+            # La tarea de volcado se programa en este mismo lote si pg_cron está instalado
+            staging = self.resolve_staging(staging, scheduling=True)
             
-            # Crear la tabla de logs
-            self.create_audit_log_table()
-            
-            # Crear la función del trigger
-            self.create_audit_trigger_function()
-            
-            # Configurar auditoría para tablas por defecto
-            self.setup_default_audit_tables()
+            # Todo el DDL viaja en un único execute y una única transacción
+            with self.batched_ddl():
+                # Verificar y crear el esquema de auditoría
+                self.check_audit_schema()
+                
+                # Crear la tabla de logs
+                self.create_audit_log_table()
+                
+                # Crear las funciones del trigger (por fila y por sentencia)
+                self.create_audit_trigger_function()
+                self.create_audit_statement_trigger_function()
+                
+                # Configurar auditoría para tablas por defecto
+                self.setup_default_audit_tables(staging)
             
             logger.info("Configuración de auditoría completada con éxito")
             return True
@@ -466,18 +886,22 @@ class AuditTableSetup:
 def parse_args():
     """Parsea los argumentos de línea de comandos."""
     parser = argparse.ArgumentParser(description='Configuración del sistema de auditoría de base de datos')
+    defaults = default_db_config()
     
     # Argumentos de conexión a la base de datos
-    parser.add_argument('--dbname', default=DEFAULT_DB_CONFIG['dbname'],
+    parser.add_argument('--dbname', default=defaults['dbname'],
                        help='Nombre de la base de datos')
-    parser.add_argument('--user', default=DEFAULT_DB_CONFIG['user'],
+    parser.add_argument('--user', default=defaults['user'],
                        help='Usuario de la base de datos')
-    parser.add_argument('--password', default=DEFAULT_DB_CONFIG['password'],
+    parser.add_argument('--password', default=defaults['password'],
                        help='Contraseña de la base de datos')
-    parser.add_argument('--host', default=DEFAULT_DB_CONFIG['host'],
+    parser.add_argument('--host', default=defaults['host'],
                        help='Servidor de la base de datos')
-    parser.add_argument('--port', default=DEFAULT_DB_CONFIG['port'],
+    parser.add_argument('--port', default=defaults['port'],
                        help='Puerto de la base de datos')
+    parser.add_argument('--staging', action='store_true',
+                       help='Escribir los eventos en la tabla UNLOGGED audit.logged_actions_hot '
+                            '(requiere pg_cron para volcarlos a audit.logged_actions)')
     
     # Comandos
     subparsers = parser.add_subparsers(dest='command', help='Comando a ejecutar')
@@ -492,12 +916,15 @@ def parse_args():
     trigger_parser.add_argument('--exclude', nargs='+', default=[], 
                               help='Columnas a excluir de la auditoría')
     trigger_parser.add_argument('--query-text', action='store_true',
-                              help='Incluir la consulta SQL completa en el registro de auditoría')
+                              help='Registrar la consulta SQL que originó cada cambio (en audit.queries)')
+    trigger_parser.add_argument('--row-level', action='store_true',
+                              help='Usar un trigger por fila (necesario en tablas sin clave primaria)')
     
     return parser.parse_args()
 
 def main():
     """Función principal."""
+    configure_logging()
     args = parse_args()
     
     # Configuración de la base de datos
@@ -520,7 +947,7 @@ def main():
         
         # Ejecutar el comando solicitado
         if args.command == 'setup':
-            success = audit_setup.setup_audit_system()
+            success = audit_setup.setup_audit_system(staging=args.staging)
             if not success:
                 return 1
                 
@@ -529,7 +956,9 @@ def main():
                 args.schema,
                 args.table,
                 audit_query_text=args.query_text,
-                excluded_columns=args.exclude
+                excluded_columns=args.exclude,
+                row_level=args.row_level,
+                staging=audit_setup.resolve_staging(args.staging)
             )
             if not success:
                 return 1
@@ -548,5 +977,4 @@ def main():
         audit_setup.close()
 
 if __name__ == "__main__":
-    import sys
     sys.exit(main())
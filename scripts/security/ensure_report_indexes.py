@@ -0,0 +1,104 @@
+#!/usr/bin/env python3
+"""
+Script para crear los índices que usa el informe de seguridad sobre login_attempts.
+
+Es idempotente: solo crea los índices que faltan (o que quedaron inválidos). Debe
+ejecutarse una vez, con un rol que pueda crear índices en login_attempts, antes de
+usar generate_security_report.py; monitor_logins.py también lo intenta al arrancar.
+
+Uso:
+    python ensure_report_indexes.py
+"""
+import os
+import sys
+
+import psycopg2
+
+# (nombre, definición). Con CREATE INDEX CONCURRENTLY los inicios de sesión pueden
+# seguir registrándose mientras se construye el índice
+REPORT_INDEXES = [
+    # Intentos fallidos por rango de fechas: index-only scan para los agregados por
+    # día, hora e IP (la mayoría de los intentos son exitosos y quedan fuera)
+    ("idx_login_attempts_failed_time",
+     "ON login_attempts (created_at) INCLUDE (ip_address, username) WHERE success = false"),
+    # Último intento de cada usuario (LATERAL ... ORDER BY created_at DESC LIMIT 1)
+    ("idx_login_attempts_username_time",
+     "ON login_attempts (username, created_at DESC) INCLUDE (ip_address)"),
+]
+
+
+def ensure_report_indexes(conn):
+    """Crea los índices del informe que no existan.
+
+    Args:
+        conn: Conexión psycopg2; se usa en modo autocommit porque CREATE INDEX
+            CONCURRENTLY no puede ejecutarse dentro de una transacción
+
+    Returns:
+        Lista con los nombres de los índices creados
+    """
+    previous_autocommit = conn.autocommit
+    conn.autocommit = True
+    created = []
+    try:
+        with conn.cursor() as cur:
+            # Una sola consulta al catálogo: en la ejecución habitual no hay nada que crear
+            cur.execute(
+                """
+                SELECT name
+                FROM unnest(%s::text[]) AS name
+                LEFT JOIN pg_index i ON i.indexrelid = to_regclass(name)
+                WHERE i.indisvalid IS NOT TRUE
+                """,
+                ([name for name, _ in REPORT_INDEXES],),
+            )
+            missing = {row[0] for row in cur.fetchall()}
+
+            if missing:
+                # La construcción puede superar el statement_timeout de la conexión;
+                # RESET vuelve después al valor con el que se abrió
+                cur.execute("SET statement_timeout = 0")
+            try:
+                for name, definition in REPORT_INDEXES:
+                    if name not in missing:
+                        continue
+                    # Un CONCURRENTLY interrumpido deja un índice inválido que IF NOT EXISTS no rehace
+                    cur.execute(f"DROP INDEX CONCURRENTLY IF EXISTS {name}")
+                    cur.execute(f"CREATE INDEX CONCURRENTLY {name} {definition}")
+                    created.append(name)
+            finally:
+                if missing:
+                    cur.execute("RESET statement_timeout")
+    finally:
+        conn.autocommit = previous_autocommit
+    return created
+
+
+def main():
+    """Función principal."""
+    try:
+        conn = psycopg2.connect(
+            dbname=os.getenv('POSTGRES_DB', 'seguros_db'),
+            user=os.getenv('POSTGRES_USER', 'postgres'),
+            password=os.getenv('POSTGRES_PASSWORD', 'postgres'),
+            host=os.getenv('POSTGRES_SERVER', 'localhost'),
+            port=os.getenv('POSTGRES_PORT', '5432'),
+        )
+    except psycopg2.Error as e:
+        print(f"Error al conectar a la base de datos: {e}", file=sys.stderr)
+        return 1
+
+    try:
+        created = ensure_report_indexes(conn)
+    finally:
+        conn.close()
+
+    if created:
+        print(f"Índices creados: {', '.join(created)}")
+    else:
+        print("Los índices del informe ya existen.")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -12,18 +12,23 @@ Argumentos:
     --start FECHA_INICIO  Fecha de inicio en formato YYYY-MM-DD (por defecto: hace 7 días)
     --end FECHA_FIN      Fecha de fin en formato YYYY-MM-DD (por defecto: hoy)
     --output FORMATO     Formato de salida: 'text', 'csv' o 'json' (por defecto: 'text')
+
+Las consultas esperan los índices sobre login_attempts que crea ensure_report_indexes.py;
+el informe no los crea, para poder ejecutarse con un rol de solo lectura.
 """
 import argparse
-import json
+import csv
+import os
 import sys
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
 from datetime import datetime, timedelta
+from pathlib import Path
 
+import orjson
 import psycopg2
-from psycopg2.extras import RealDictCursor
-
-import os
-from pathlib import Path
-import sys
+from psycopg2.extras import register_default_json
+from psycopg2.pool import ThreadedConnectionPool
 
 # Añadir el directorio raíz al path para importaciones absolutas
 PROJECT_ROOT = Path(__file__).parent.parent.parent.absolute()
@@ -35,9 +40,15 @@ DB_CONFIG = {
     'user': os.getenv('POSTGRES_USER', 'postgres'),
     'password': os.getenv('POSTGRES_PASSWORD', 'postgres'),
     'host': os.getenv('POSTGRES_SERVER', 'localhost'),
-    'port': os.getenv('POSTGRES_PORT', '5432')
+    'port': os.getenv('POSTGRES_PORT', '5432'),
+    # Una consulta descontrolada se corta al minuto y las conexiones del informe se
+    # distinguen en pg_stat_activity
+    'options': '-c statement_timeout=60000 -c application_name=security_reporter'
 }
 
+# Barra más larga del histograma por hora; cada barra es un slice de esta cadena
+MAX_BAR = '■' * 50
+
 class SecurityReporter:
     def __init__(self, db_config):
         """Inicializa el generador de informes.
@@ -46,45 +57,95 @@ class SecurityReporter:
             db_config: Configuración de la base de datos
         """
         self.db_config = db_config
-    
-    def get_db_connection(self):
-        """Establece una conexión a la base de datos."""
+        # Las filas del informe llegan como arrays JSON: se decodifican con orjson
+        register_default_json(globally=True, loads=orjson.loads)
+        # Las consultas del informe reutilizan las conexiones en lugar de abrir una cada vez
         try:
-            conn = psycopg2.connect(**self.db_config)
-            return conn
-        except Exception as e:
+            self.pool = ThreadedConnectionPool(1, 4, **db_config)
+        except psycopg2.Error as e:
             print(f"Error al conectar a la base de datos: {e}", file=sys.stderr)
             sys.exit(1)
     
-    def get_failed_login_stats(self, start_date, end_date):
-        """Obtiene estadísticas de inicios de sesión fallidos por día.
+    @contextmanager
+    def _cursor(self):
+        """Presta una conexión del pool y devuelve un cursor sobre ella."""
+        conn = self.pool.getconn()
+        try:
+            with conn.cursor() as cur:
+                yield cur
+        finally:
+            # putconn() deshace la transacción abierta antes de guardar la conexión
+            self.pool.putconn(conn)
+    
+    def close(self):
+        """Cierra todas las conexiones del pool."""
+        self.pool.closeall()
+    
+    def get_failed_login_stats(self, start_date, end_date, threshold=5):
+        """Obtiene en una sola consulta las estadísticas de inicios de sesión fallidos.
+        
+        Los intentos fallidos del rango se leen una vez (CTE ``fallidos``) y de ellos se
+        derivan los agregados por día, por hora e IP, cada uno como un array JSON ya
+        ordenado: una ida y vuelta al servidor y un único recorrido de login_attempts.
+        
+        Los tipos se fijan en SQL (hora ``int``, minutos ``float8``) y las columnas llevan
+        ya los nombres del informe, de modo que las listas se usan tal cual llegan, sin
+        convertir valores ni copiar cada fila a otro diccionario.
         
         Args:
             start_date: Fecha de inicio
             end_date: Fecha de fin
+            threshold: Umbral de intentos para considerar sospechosa una IP
             
         Returns:
-            Lista de diccionarios con las estadísticas por día
+            Tupla (estadísticas por día, IPs sospechosas, estadísticas por hora), cada
+            una como lista de diccionarios
         """
-        conn = self.get_db_connection()
-        try:
-            with conn.cursor(cursor_factory=RealDictCursor) as cur:
-                query = """
+        with self._cursor() as cur:
+            query = """
+                WITH fallidos AS (
+                    SELECT created_at, ip_address, username
+                    FROM login_attempts
+                    WHERE success = false
+                    AND created_at BETWEEN %(start)s AND %(end)s
+                ),
+                -- Día y hora se calculan una vez por fila en una subconsulta y se agrupa por
+                -- la columna ya calculada
+                por_dia AS (
                     SELECT 
-                        DATE(created_at) as fecha,
+                        fecha,
                         COUNT(*) as intentos,
                         COUNT(DISTINCT ip_address) as ips_unicas,
                         COUNT(DISTINCT username) as usuarios_unicos
-                    FROM login_attempts
-                    WHERE success = false
-                    AND created_at BETWEEN %s AND %s
-                    GROUP BY DATE(created_at)
-                    ORDER BY fecha
-                """
-                cur.execute(query, (start_date, end_date))
-                return cur.fetchall()
-        finally:
-            conn.close()
+                    FROM (SELECT DATE(created_at) as fecha, ip_address, username FROM fallidos) f
+                    GROUP BY fecha
+                ),
+                por_hora AS (
+                    SELECT 
+                        hora,
+                        COUNT(*) as intentos
+                    FROM (SELECT EXTRACT(HOUR FROM created_at)::int as hora FROM fallidos) f
+                    GROUP BY hora
+                ),
+                ips AS (
+                    SELECT 
+                        ip_address as ip,
+                        COUNT(*) as intentos,
+                        COUNT(DISTINCT username) as usuarios_unicos,
+                        MIN(created_at) as primer_intento,
+                        MAX(created_at) as ultimo_intento,
+                        (EXTRACT(EPOCH FROM (MAX(created_at) - MIN(created_at))) / 60)::float8 as minutos_entre_intentos
+                    FROM fallidos
+                    GROUP BY ip_address
+                    HAVING COUNT(*) >= %(threshold)s
+                )
+                SELECT
+                    (SELECT COALESCE(json_agg(d ORDER BY d.fecha), '[]') FROM por_dia d) as por_dia,
+                    (SELECT COALESCE(json_agg(i ORDER BY i.intentos DESC), '[]') FROM ips i) as ips,
+                    (SELECT COALESCE(json_agg(h ORDER BY h.hora), '[]') FROM por_hora h) as por_hora
+            """
+            cur.execute(query, {'start': start_date, 'end': end_date, 'threshold': threshold})
+            return cur.fetchone()
     
     def get_locked_accounts(self, start_date, end_date):
         """Obtiene información sobre cuentas bloqueadas.
@@ -94,19 +155,18 @@ class SecurityReporter:
             end_date: Fecha de fin
             
         Returns:
-            Lista de diccionarios con información de cuentas bloqueadas
+            Lista de diccionarios con información de cuentas bloqueadas, con los
+            nombres de campo del informe y las fechas en formato ISO 8601
         """
-        conn = self.get_db_connection()
-        try:
-            with conn.cursor(cursor_factory=RealDictCursor) as cur:
-                query = """
+        with self._cursor() as cur:
+            query = """
+                WITH bloqueadas AS (
                     SELECT 
-                        u.id,
-                        u.username,
+                        u.username as usuario,
                         u.email,
                         u.bloqueado_hasta,
                         u.intentos_fallidos,
-                        u.ultimo_intento_fallido,
+                        u.ultimo_intento_fallido as ultimo_intento,
                         la.ip_address as ultima_ip
                     FROM usuarios u
                     LEFT JOIN LATERAL (
@@ -118,308 +178,209 @@ class SecurityReporter:
                     ) la ON true
                     WHERE u.bloqueado_hasta IS NOT NULL
                     AND u.bloqueado_hasta BETWEEN %s AND %s
-                    ORDER BY u.bloqueado_hasta DESC
-                """
-                cur.execute(query, (start_date, end_date))
-                return cur.fetchall()
-        finally:
-            conn.close()
+                )
+                SELECT COALESCE(json_agg(b ORDER BY b.bloqueado_hasta DESC), '[]') as cuentas
+                FROM bloqueadas b
+            """
+            cur.execute(query, (start_date, end_date))
+            return cur.fetchone()[0]
     
-    def get_suspicious_ips(self, start_date, end_date, threshold=5):
-        """Identifica IPs con actividad sospechosa.
+    def generate_report(self, start_date, end_date, output_format='text', out=None):
+        """Genera un informe de seguridad y lo escribe en ``out``.
         
-        Args:
-            start_date: Fecha de inicio
-            end_date: Fecha de fin
-            threshold: Umbral de intentos para considerar sospechoso
-            
-        Returns:
-            Lista de diccionarios con información de IPs sospechosas
-        """
-        conn = self.get_db_connection()
-        try:
-            with conn.cursor(cursor_factory=RealDictCursor) as cur:
-                query = """
-                    WITH ip_stats AS (
-                        SELECT 
-                            ip_address,
-                            COUNT(*) as intentos,
-                            COUNT(DISTINCT username) as usuarios_unicos,
-                            MIN(created_at) as primer_intento,
-                            MAX(created_at) as ultimo_intento
-                        FROM login_attempts
-                        WHERE success = false
-                        AND created_at BETWEEN %s AND %s
-                        GROUP BY ip_address
-                        HAVING COUNT(*) >= %s
-                    )
-                    SELECT 
-                        ip_address,
-                        intentos,
-                        usuarios_unicos,
-                        primer_intento,
-                        ultimo_intento,
-                        EXTRACT(EPOCH FROM (ultimo_intento - primer_intento)) / 60 as minutos_entre_intentos
-                    FROM ip_stats
-                    ORDER BY intentos DESC
-                """
-                cur.execute(query, (start_date, end_date, threshold))
-                return cur.fetchall()
-        finally:
-            conn.close()
-    
-    def get_failed_logins_by_hour(self, start_date, end_date):
-        """Obtiene estadísticas de inicios de sesión fallidos por hora del día.
-        
-        Args:
-            start_date: Fecha de inicio
-            end_date: Fecha de fin
-            
-        Returns:
-            Lista de diccionarios con las estadísticas por hora
-        """
-        conn = self.get_db_connection()
-        try:
-            with conn.cursor(cursor_factory=RealDictCursor) as cur:
-                query = """
-                    SELECT 
-                        EXTRACT(HOUR FROM created_at) as hora,
-                        COUNT(*) as intentos
-                    FROM login_attempts
-                    WHERE success = false
-                    AND created_at BETWEEN %s AND %s
-                    GROUP BY EXTRACT(HOUR FROM created_at)
-                    ORDER BY hora
-                """
-                cur.execute(query, (start_date, end_date))
-                return cur.fetchall()
-        finally:
-            conn.close()
-    
-    def generate_report(self, start_date, end_date, output_format='text'):
-        """Genera un informe de seguridad.
+        El informe se escribe por partes a medida que se genera, sin armar antes una
+        cadena con el informe completo.
         
         Args:
             start_date: Fecha de inicio
             end_date: Fecha de fin
             output_format: Formato de salida ('text', 'csv' o 'json')
-            
-        Returns:
-            El informe en el formato solicitado
+            out: Archivo de texto de destino (por defecto: sys.stdout)
         """
+        if out is None:
+            out = sys.stdout
         print(f"Generando informe de seguridad del {start_date} al {end_date}...", file=sys.stderr)
         
-        # Obtener datos
-        failed_stats = self.get_failed_login_stats(start_date, end_date)
-        locked_accounts = self.get_locked_accounts(start_date, end_date)
-        suspicious_ips = self.get_suspicious_ips(start_date, end_date)
-        hourly_stats = self.get_failed_logins_by_hour(start_date, end_date)
+        report_data = self._collect(start_date, end_date)
+        # Cada formato tiene su propio emisor, que solo lee lo que necesita de report_data
+        emit = {'json': self._emit_json, 'csv': self._emit_csv}.get(output_format, self._emit_text)
+        emit(report_data, start_date, end_date, out)
+        out.write("\n")
+    
+    def _collect(self, start_date, end_date):
+        """Consulta la base de datos y arma los datos comunes a todos los formatos."""
+        # Las dos consultas son independientes: cada una toma su conexión del pool y
+        # psycopg2 libera el GIL mientras espera al servidor
+        with ThreadPoolExecutor(max_workers=2) as executor:
+            failed_future = executor.submit(self.get_failed_login_stats, start_date, end_date)
+            locked_future = executor.submit(self.get_locked_accounts, start_date, end_date)
+            failed_stats, suspicious_ips, hourly_stats = failed_future.result()
+            locked_accounts = locked_future.result()
         
         # Calcular totales
         total_attempts = sum(day['intentos'] for day in failed_stats)
         total_locked = len(locked_accounts)
         total_suspicious = len(suspicious_ips)
+        # main() pasa el fin como datetime (último instante del día) y el inicio como date
+        end_day = end_date.date() if isinstance(end_date, datetime) else end_date
+        days = max(1, (end_day - start_date).days + 1)
         
         # Preparar datos para el informe
         report_data = {
             'rango_fechas': {
                 'inicio': start_date.isoformat(),
                 'fin': end_date.isoformat(),
-                'dias': (end_date - start_date).days + 1
+                'dias': days
             },
             'resumen': {
                 'intentos_fallidos_totales': total_attempts,
                 'cuentas_bloqueadas': total_locked,
                 'ips_sospechosas': total_suspicious,
-                'promedio_diario': total_attempts / ((end_date - start_date).days + 1) if (end_date - start_date).days > 0 else total_attempts
+                'promedio_diario': total_attempts / days
             },
-            'intentos_por_dia': [
-                {
-                    'fecha': str(day['fecha']),
-                    'intentos': day['intentos'],
-                    'ips_unicas': day['ips_unicas'],
-                    'usuarios_unicos': day['usuarios_unicos']
-                } for day in failed_stats
-            ],
-            'cuentas_bloqueadas': [
-                {
-                    'usuario': acc['username'],
-                    'email': acc['email'],
-                    'bloqueado_hasta': acc['bloqueado_hasta'].isoformat() if acc['bloqueado_hasta'] else None,
-                    'intentos_fallidos': acc['intentos_fallidos'],
-                    'ultimo_intento': acc['ultimo_intento_fallido'].isoformat() if acc['ultimo_intento_fallido'] else None,
-                    'ultima_ip': acc['ultima_ip']
-                } for acc in locked_accounts
-            ],
-            'ips_sospechosas': [
-                {
-                    'ip': ip['ip_address'],
-                    'intentos': ip['intentos'],
-                    'usuarios_unicos': ip['usuarios_unicos'],
-                    'primer_intento': ip['primer_intento'].isoformat(),
-                    'ultimo_intento': ip['ultimo_intento'].isoformat(),
-                    'minutos_entre_intentos': float(ip['minutos_entre_intentos']) if ip['minutos_entre_intentos'] else 0
-                } for ip in suspicious_ips
-            ],
-            'intentos_por_hora': [
-                {
-                    'hora': int(hour['hora']),
-                    'intentos': hour['intentos']
-                } for hour in hourly_stats
-            ]
+            'intentos_por_dia': failed_stats,
+            'cuentas_bloqueadas': locked_accounts,
+            # Las fechas de las IPs llegan del JSON ya en formato ISO 8601
+            'ips_sospechosas': suspicious_ips,
+            'intentos_por_hora': hourly_stats
         }
+        return report_data
+    
+    def _emit_json(self, report_data, start_date, end_date, out):
+        """Serializa el informe completo como JSON."""
+        out.write(orjson.dumps(report_data, option=orjson.OPT_INDENT_2).decode())
+    
+    def _emit_csv(self, report_data, start_date, end_date, out):
+        """Genera el informe en CSV: un resumen y luego secciones separadas."""
+        resumen = report_data['resumen']
+        writer = csv.writer(out)
         
-        # Generar el informe en el formato solicitado
-        if output_format == 'json':
-            return json.dumps(report_data, indent=2, ensure_ascii=False)
+        # Resumen
+        writer.writerow(['Informe de Seguridad', f"{start_date} al {end_date}"])
+        writer.writerow([])
+        writer.writerow(['RESUMEN'])
+        writer.writerow(['Total de intentos fallidos', resumen['intentos_fallidos_totales']])
+        writer.writerow(['Cuentas bloqueadas', resumen['cuentas_bloqueadas']])
+        writer.writerow(['IPs sospechosas', resumen['ips_sospechosas']])
+        writer.writerow(['Promedio diario', f"{resumen['promedio_diario']:.1f}"])
         
-        elif output_format == 'csv':
-            # Para CSV, creamos un resumen y luego secciones separadas
-            import io
-            import csv
-            
-            output = io.StringIO()
-            writer = csv.writer(output)
-            
-            # Resumen
-            writer.writerow(['Informe de Seguridad', f"{start_date} al {end_date}"])
-            writer.writerow([])
-            writer.writerow(['RESUMEN'])
-            writer.writerow(['Total de intentos fallidos', total_attempts])
-            writer.writerow(['Cuentas bloqueadas', total_locked])
-            writer.writerow(['IPs sospechosas', total_suspicious])
-            writer.writerow(['Promedio diario', f"{report_data['resumen']['promedio_diario']:.1f}"])
-            
-            # Intentos por día
+        # Intentos por día
+        writer.writerow([])
+        writer.writerow(['INTENTOS POR DÍA'])
+        writer.writerow(['Fecha', 'Intentos', 'IPs únicas', 'Usuarios únicos'])
+        # writerows() recorre las filas en C, sin una llamada a writerow() por fila
+        writer.writerows(
+            (day['fecha'], day['intentos'], day['ips_unicas'], day['usuarios_unicos'])
+            for day in report_data['intentos_por_dia']
+        )
+        
+        # Cuentas bloqueadas
+        if report_data['cuentas_bloqueadas']:
             writer.writerow([])
-            writer.writerow(['INTENTOS POR DÍA'])
-            writer.writerow(['Fecha', 'Intentos', 'IPs únicas', 'Usuarios únicos'])
-            for day in report_data['intentos_por_dia']:
-                writer.writerow([day['fecha'], day['intentos'], day['ips_unicas'], day['usuarios_unicos']])
-            
-            # Cuentas bloqueadas
-            if report_data['cuentas_bloqueadas']:
-                writer.writerow([])
-                writer.writerow(['CUENTAS BLOQUEADAS'])
-                writer.writerow(['Usuario', 'Email', 'Bloqueado hasta', 'Intentos fallidos', 'Última IP'])
-                for acc in report_data['cuentas_bloqueadas']:
-                    writer.writerow([
-                        acc['usuario'],
-                        acc['email'],
-                        acc['bloqueado_hasta'],
-                        acc['intentos_fallidos'],
-                        acc['ultima_ip']
-                    ])
-            
-            # IPs sospechosas
-            if report_data['ips_sospechosas']:
-                writer.writerow([])
-                writer.writerow(['IPS SOSPECHOSAS'])
-                writer.writerow(['IP', 'Intentos', 'Usuarios', 'Primer intento', 'Último intento', 'Minutos entre intentos'])
-                for ip in report_data['ips_sospechosas']:
-                    writer.writerow([
-                        ip['ip'],
-                        ip['intentos'],
-                        ip['usuarios_unicos'],
-                        ip['primer_intento'],
-                        ip['ultimo_intento'],
-                        f"{ip['minutos_entre_intentos']:.1f}"
-                    ])
-            
-            # Intentos por hora
+            writer.writerow(['CUENTAS BLOQUEADAS'])
+            writer.writerow(['Usuario', 'Email', 'Bloqueado hasta', 'Intentos fallidos', 'Última IP'])
+            writer.writerows(
+                (acc['usuario'], acc['email'], acc['bloqueado_hasta'], acc['intentos_fallidos'], acc['ultima_ip'])
+                for acc in report_data['cuentas_bloqueadas']
+            )
+        
+        # IPs sospechosas
+        if report_data['ips_sospechosas']:
             writer.writerow([])
-            writer.writerow(['INTENTOS POR HORA'])
-            writer.writerow(['Hora', 'Intentos'])
-            for hour in report_data['intentos_por_hora']:
-                writer.writerow([f"{int(hour['hora']):02d}:00", hour['intentos']])
-            
-            return output.getvalue()
+            writer.writerow(['IPS SOSPECHOSAS'])
+            writer.writerow(['IP', 'Intentos', 'Usuarios', 'Primer intento', 'Último intento', 'Minutos entre intentos'])
+            writer.writerows(
+                (ip['ip'], ip['intentos'], ip['usuarios_unicos'], ip['primer_intento'], ip['ultimo_intento'],
+                 f"{ip['minutos_entre_intentos']:.1f}")
+                for ip in report_data['ips_sospechosas']
+            )
         
-        else:  # Formato de texto
-            # Crear informe en formato de texto
-            report = []
-            
-            # Encabezado
-            report.append("=" * 80)
-            report.append("INFORME DE SEGURIDAD".center(80))
-            report.append("{} al {}".format(start_date, end_date).center(80))
-            report.append("=" * 80)
-            
-            report.append("""
+        # Intentos por hora
+        writer.writerow([])
+        writer.writerow(['INTENTOS POR HORA'])
+        writer.writerow(['Hora', 'Intentos'])
+        writer.writerows((f"{hour['hora']:02d}:00", hour['intentos']) for hour in report_data['intentos_por_hora'])
+    
+    def _emit_text(self, report_data, start_date, end_date, out):
+        """Genera el informe en texto con tablas alineadas y un histograma por hora."""
+        resumen = report_data['resumen']
+        write = out.write
+        
+        # Encabezado
+        write("=" * 80 + "\n")
+        write("INFORME DE SEGURIDAD".center(80) + "\n")
+        write(f"{start_date} al {end_date}".center(80) + "\n")
+        write("=" * 80 + "\n")
+        
+        write(f"""
             
             RESUMEN:
             ---------
-            • Intentos fallidos totales: {0}
-            • Cuentas bloqueadas: {1}
-            • IPs sospechosas: {2}
-            • Promedio diario: {3:.1f} intentos/día
+            • Intentos fallidos totales: {resumen['intentos_fallidos_totales']}
+            • Cuentas bloqueadas: {resumen['cuentas_bloqueadas']}
+            • IPs sospechosas: {resumen['ips_sospechosas']}
+            • Promedio diario: {resumen['promedio_diario']:.1f} intentos/día
             
             INTENTOS POR DÍA:
-            -----------------""".format(total_attempts, total_locked, total_suspicious, report_data['resumen']['promedio_diario']))
-            
-            # Intentos por día
-            report.append("Fecha       Intentos  IPs únicas  Usuarios únicos")
-            report.append("----------  --------  ----------  ----------------")
-            for day in report_data['intentos_por_dia']:
-                report.append("{0}  {1:8d}  {2:10d}  {3:15d}".format(
-                    day['fecha'], day['intentos'], day['ips_unicas'], day['usuarios_unicos']
-                ))
-            
-            # Cuentas bloqueadas
-            if report_data['cuentas_bloqueadas']:
-                report.append("""
+            -----------------
+""")
+        
+        # Intentos por día
+        write("Fecha       Intentos  IPs únicas  Usuarios únicos\n")
+        write("----------  --------  ----------  ----------------\n")
+        for day in report_data['intentos_por_dia']:
+            write(f"{day['fecha']}  {day['intentos']:8d}  {day['ips_unicas']:10d}  {day['usuarios_unicos']:15d}\n")
+        
+        # Cuentas bloqueadas
+        if report_data['cuentas_bloqueadas']:
+            write("""
             
             CUENTAS BLOQUEADAS:
-            -------------------""")
-                report.append("Usuario            Email                     Bloqueado hasta       Intentos  Última IP")
-                report.append("-----------------  ------------------------  -------------------  ---------  ----------------")
-                for acc in report_data['cuentas_bloqueadas']:
-                    bloqueado_hasta = acc['bloqueado_hasta'].split('T')[0] if acc['bloqueado_hasta'] else 'N/A'
-                    report.append("{0:17s}  {1:24s}  {2:19s}  {3:8d}  {4}".format(
-                        acc['usuario'], acc['email'] or 'N/A', bloqueado_hasta, 
-                        acc['intentos_fallidos'], acc['ultima_ip'] or 'N/A'
-                    ))
-            
-            # IPs sospechosas
-            if report_data['ips_sospechosas']:
-                report.append("""
+            -------------------
+""")
+            write("Usuario            Email                     Bloqueado hasta       Intentos  Última IP\n")
+            write("-----------------  ------------------------  -------------------  ---------  ----------------\n")
+            for acc in report_data['cuentas_bloqueadas']:
+                bloqueado_hasta = acc['bloqueado_hasta'].split('T')[0] if acc['bloqueado_hasta'] else 'N/A'
+                write(f"{acc['usuario']:17s}  {acc['email'] or 'N/A':24s}  {bloqueado_hasta:19s}  "
+                      f"{acc['intentos_fallidos']:8d}  {acc['ultima_ip'] or 'N/A'}\n")
+        
+        # IPs sospechosas
+        if report_data['ips_sospechosas']:
+            write("""
             
             IPS SOSPECHOSAS:
-                ----------------""")
-                report.append("IP               Intentos  Usuarios  Primer intento       Último intento        Min. entre intentos")
-                report.append("---------------  --------  --------  -------------------  -------------------  --------------------")
-                for ip in report_data['ips_sospechosas']:
-                    primer_intento = ip['primer_intento'].split('.')[0].replace('T', ' ')
-                    ultimo_intento = ip['ultimo_intento'].split('.')[0].replace('T', ' ')
-                    report.append("{0:15s}  {1:8d}  {2:8d}  {3:19s}  {4:19s}  {5:19.1f}".format(
-                        ip['ip'], ip['intentos'], ip['usuarios_unicos'], 
-                        primer_intento, ultimo_intento, float(ip['minutos_entre_intentos'])
-                    ))
-            
-            # Intentos por hora
-            report.append("""
+                ----------------
+""")
+            write("IP               Intentos  Usuarios  Primer intento       Último intento        Min. entre intentos\n")
+            write("---------------  --------  --------  -------------------  -------------------  --------------------\n")
+            for ip in report_data['ips_sospechosas']:
+                primer_intento = ip['primer_intento'].split('.')[0].replace('T', ' ')
+                ultimo_intento = ip['ultimo_intento'].split('.')[0].replace('T', ' ')
+                write(f"{ip['ip']:15s}  {ip['intentos']:8d}  {ip['usuarios_unicos']:8d}  {primer_intento:19s}  "
+                      f"{ultimo_intento:19s}  {ip['minutos_entre_intentos']:19.1f}\n")
+        
+        # Intentos por hora
+        write("""
             
             INTENTOS POR HORA DEL DÍA:
-            ------------------------""")
-            
-            report.append("Hora    Intentos  Gráfico")
-            report.append("------  --------  ----------------------------------------")
-            
-            max_attempts = max(hour['intentos'] for hour in report_data['intentos_por_hora']) if report_data['intentos_por_hora'] else 1
-            scale = 50.0 / max_attempts if max_attempts > 0 else 1
-            
-            for hour in sorted(report_data['intentos_por_hora'], key=lambda x: x['hora']):
-                bar = '■' * int(hour['intentos'] * scale)
-                report.append("{0:02d}:00   {1:7d}  {2}".format(
-                    int(hour['hora']), hour['intentos'], bar
-                ))
-            
-            report.append("""
+            ------------------------
+""")
+        
+        write("Hora    Intentos  Gráfico\n")
+        write("------  --------  ----------------------------------------\n")
+        
+        max_attempts = max(hour['intentos'] for hour in report_data['intentos_por_hora']) if report_data['intentos_por_hora'] else 1
+        scale = len(MAX_BAR) / max_attempts if max_attempts > 0 else 1
+        
+        # Las horas ya llegan ordenadas por la consulta (json_agg ... ORDER BY hora)
+        for hour in report_data['intentos_por_hora']:
+            write(f"{hour['hora']:02d}:00   {hour['intentos']:7d}  {MAX_BAR[:int(hour['intentos'] * scale)]}\n")
+        
+        write("""
             
             FIN DEL INFORME
             ===============""")
-            
-            return "\n".join(report)
 
 def parse_date(date_str):
     """Parsea una cadena de fecha en formato YYYY-MM-DD."""
@@ -451,12 +412,15 @@ def main():
     # Ajustar la fecha de fin para incluir todo el día
     end_date = datetime.combine(args.end, datetime.max.time())
     
-    # Generar el informe
-    reporter = SecurityReporter(DB_CONFIG)
-    report = reporter.generate_report(args.start, end_date, args.output)
+    # Salida con búfer completo: el informe se escribe en bloques y no línea a línea
+    sys.stdout.reconfigure(line_buffering=False, write_through=False)
     
-    # Imprimir el informe
-    print(report)
+    reporter = SecurityReporter(DB_CONFIG)
+    try:
+        # El informe se escribe directamente en stdout
+        reporter.generate_report(args.start, end_date, args.output)
+    finally:
+        reporter.close()
 
 if __name__ == "__main__":
     main()
@@ -13,24 +13,29 @@ Opciones:
     --interval SECONDS  Intervalo de actualización en segundos (por defecto: 5)
     --threshold COUNT   Umbral para resaltar IPs con muchos intentos (por defecto: 3)
 """
-import time
 import argparse
+import contextlib
+import os
+import select
+import shutil
 import signal
 import sys
-from datetime import datetime
-from collections import defaultdict
+import threading
+import time
+from collections import Counter, deque
+from datetime import datetime, timedelta
 
+import orjson
 import psycopg2
+from psycopg2.extensions import make_dsn
+from psycopg2.extras import register_default_json
 
-from psycopg2.extras import RealDictCursor
+# Ejecutado como script, el directorio raíz no está en el path; importado como
+# módulo del paquete scripts.security ya lo está
+if not __package__:
+    sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
 
-import os
-from pathlib import Path
-import sys
-
-# Añadir el directorio raíz al path para importaciones absolutas
-PROJECT_ROOT = Path(__file__).parent.parent.parent.absolute()
-sys.path.append(str(PROJECT_ROOT))
+from scripts.security.ensure_report_indexes import ensure_report_indexes
 
 # Configuración de la base de datos desde variables de entorno
 DEFAULT_DB_CONFIG = {
@@ -41,6 +46,75 @@ DEFAULT_DB_CONFIG = {
     'port': '5432'
 }
 
+# Ventana en segundos para contar los intentos fallidos de cada IP
+SUSPICIOUS_WINDOW = 15 * 60
+
+# Canal en el que el trigger de login_attempts avisa de cada inserción
+# (scripts/db_maintenance_scripts/login_attempts_notify_migration.py)
+NOTIFY_CHANNEL = "login_attempts"
+
+# Tope de IPs en las estadísticas acumuladas y cuántas se conservan al superarlo
+MAX_TRACKED_IPS = 10_000
+TRACKED_IPS_KEPT = 1000
+
+# Consulta de cada ciclo del monitor. Se prepara una vez por conexión (PREPARE) para
+# que PostgreSQL no la vuelva a analizar y planificar en cada actualización.
+# $1: último id de login_attempts ya mostrado (NULL en el primer ciclo, que solo toma
+# la referencia)
+SNAPSHOT_QUERY = """
+    WITH ultimo AS (
+        SELECT max(id) AS id FROM login_attempts
+    )
+    SELECT
+        -- Filas como arrays en vez de objetos: sin repetir los nombres de columna, y en
+        -- Python se desempaquetan por posición
+        (SELECT COALESCE(json_agg(json_build_array(
+                    username,
+                    ip_address,
+                    -- Solo viaja lo que se muestra del navegador
+                    CASE WHEN length(user_agent) > 40
+                         THEN left(user_agent, 40) || '...'
+                         ELSE user_agent END,
+                    -- Microsegundos fijos para que datetime.fromisoformat lo lea
+                    to_char(created_at, 'YYYY-MM-DD"T"HH24:MI:SS.US'),
+                    success
+                ) ORDER BY id DESC), '[]')
+         FROM (
+             -- Solo los intentos nuevos, por rango sobre la clave primaria
+             SELECT id, username, ip_address, user_agent, created_at, success
+             FROM login_attempts
+             WHERE id > COALESCE($1, (SELECT id FROM ultimo))
+             ORDER BY id DESC
+             LIMIT 200
+         ) nuevos),
+        (SELECT COALESCE(json_agg(json_build_array(
+                    username,
+                    email,
+                    EXTRACT(EPOCH FROM (bloqueado_hasta - NOW()))/60
+                ) ORDER BY bloqueado_hasta), '[]')
+         FROM usuarios
+         WHERE bloqueado_hasta IS NOT NULL
+         AND bloqueado_hasta > NOW()),
+        -- Intentos fallidos nuevos por IP, sin el límite de filas de arriba; en el primer
+        -- ciclo, los de los últimos 15 minutos para llenar la ventana de actividad sospechosa.
+        -- Cada IP lleva también la antigüedad en segundos de su último fallo, para fechar
+        -- en la ventana los que llegan de ese relleno inicial
+        (SELECT COALESCE(json_object_agg(ip_address, json_build_array(intentos, antiguedad)),
+                         '{}')
+         FROM (
+             SELECT ip_address, COUNT(*) AS intentos,
+                    EXTRACT(EPOCH FROM NOW() - max(created_at)) AS antiguedad
+             FROM login_attempts
+             WHERE id > COALESCE($1, (SELECT min(id) - 1 FROM login_attempts
+                                      WHERE created_at > NOW() - INTERVAL '15 minutes'
+                                      AND success = false))
+             AND success = false
+             AND ip_address IS NOT NULL
+             GROUP BY ip_address
+         ) nuevos_fallidos),
+        (SELECT id FROM ultimo)
+"""
+
 # Colores para la salida en consola
 class Colors:
     HEADER = '\033[95m'
@@ -53,26 +127,70 @@ class Colors:
     BOLD = '\033[1m'
     UNDERLINE = '\033[4m'
 
+# Códigos que se aplican por fila, resueltos una vez fuera de los bucles de render
+WARN_START = Colors.WARNING
+FAIL_START = Colors.FAIL
+COLOR_END = Colors.ENDC
+
 class LoginMonitor:
-    def __init__(self, db_config, update_interval=5, threshold=3):
+    def __init__(self, db_config, update_interval=5, threshold=3, min_refresh=0.5):
         """Inicializa el monitor de inicios de sesión.
         
         Args:
             db_config: Configuración de la base de datos
             update_interval: Intervalo de actualización en segundos
             threshold: Umbral para resaltar IPs con muchos intentos
+            min_refresh: Segundos mínimos entre dos consultas provocadas por avisos
         """
-        self.db_config = db_config
+        # La cadena de conexión se arma una vez; las reconexiones la reutilizan
+        self.dsn = make_dsn(**db_config)
         self.update_interval = update_interval
         self.threshold = threshold
-        self.running = True
+        # Con una ráfaga de inicios de sesión llega un aviso por cada INSERT confirmado;
+        # entre dos consultas pasa al menos este tiempo, nunca más que el intervalo
+        self.min_refresh = min(update_interval, min_refresh)
+        # Momento (time.monotonic) de la última consulta
+        self.last_refresh = 0.0
+        # Se activa al recibir SIGINT/SIGTERM; la espera entre ciclos vuelve en el acto
+        self.stop_event = threading.Event()
+        # El manejador de señales escribe en esta tubería para despertar el select de
+        # wait_for_activity, que de otro modo se reanudaría hasta agotar el intervalo
+        self.wake_r, self.wake_w = os.pipe()
+        os.set_blocking(self.wake_w, False)
         self.stats = {
             'total_attempts': 0,
             'failed_attempts': 0,
             'locked_accounts': 0,
-            'suspicious_ips': defaultdict(int)
+            'suspicious_ips': Counter()
         }
-        self.last_check = datetime.now()
+        # Último id de login_attempts ya mostrado; los ids crecen con cada intento, así
+        # que no depende del reloj local ni pierde filas insertadas durante la consulta
+        self.last_id = None
+        # Intentos fallidos por IP de cada ciclo dentro de la ventana, con su total acumulado
+        self.suspicious_window = deque()
+        self.suspicious_counts = Counter()
+        # Conexión persistente: se abre en la primera consulta y se reutiliza en cada ciclo
+        self.conn = None
+        # Líneas del último cuadro dibujado, para reescribir solo las que cambian
+        # (None obliga a redibujar la pantalla completa)
+        self.last_frame = None
+        # Líneas fijas del encabezado; entre ambas va la hora de actualización
+        self.header_top = [
+            "",
+            f"{Colors.HEADER}{'='*80}{Colors.ENDC}",
+            f"{Colors.HEADER}{'MONITOR DE INICIOS DE SESIÓN'.center(80)}{Colors.ENDC}",
+            f"{Colors.HEADER}{'='*80}{Colors.ENDC}",
+        ]
+        self.header_bottom = [
+            f"  {Colors.OKBLUE}•{Colors.ENDC} Intervalo de actualización: {self.update_interval} segundos",
+            f"  {Colors.OKBLUE}•{Colors.ENDC} Umbral de IPs sospechosas: {self.threshold} intentos",
+            f"  {Colors.OKBLUE}•{Colors.ENDC} {Colors.WARNING}Ctrl+C para salir{Colors.ENDC}",
+            f"{Colors.HEADER}{'-'*80}{Colors.ENDC}",
+        ]
+        # Errores del ciclo en curso, que se muestran en el cuadro bajo el encabezado
+        self.errors = []
+        # Los arrays JSON de fetch_snapshot se decodifican con orjson
+        register_default_json(globally=True, loads=orjson.loads)
         
         # Configurar el manejador de señales para salir limpiamente
         signal.signal(signal.SIGINT, self.signal_handler)
@@ -81,149 +199,224 @@ class LoginMonitor:
     def signal_handler(self, signum, frame):
         """Maneja las señales de interrupción."""
         print("\n\nDeteniendo el monitor...")
-        self.running = False
+        self.stop_event.set()
+        # Si la tubería ya tiene un aviso pendiente, basta con ese
+        with contextlib.suppress(BlockingIOError):
+            os.write(self.wake_w, b"\0")
     
     def get_db_connection(self):
-        """Establece una conexión a la base de datos."""
+        """Devuelve la conexión a la base de datos, abriéndola solo si no existe o se cerró."""
+        if self.conn is not None and not self.conn.closed:
+            return self.conn
+        conn = None
         try:
-            conn = psycopg2.connect(**self.db_config)
+            conn = psycopg2.connect(self.dsn)
             conn.autocommit = True
-            return conn
+            # Las sentencias preparadas viven en la sesión: se preparan en cada conexión nueva
+            with conn.cursor() as cur:
+                cur.execute(f"PREPARE monitor_snapshot(bigint) AS {SNAPSHOT_QUERY}")
+                cur.execute(f"LISTEN {NOTIFY_CHANNEL}")
         except Exception as e:
-            print(f"{Colors.FAIL}Error al conectar a la base de datos: {e}{Colors.ENDC}")
-            return None
+            self.errors.append(f"{Colors.FAIL}Error al conectar a la base de datos: {e}{Colors.ENDC}")
+            if conn is not None:
+                conn.close()
+            conn = None
+        self.conn = conn
+        return conn
     
-    def get_failed_logins(self):
-        """Obtiene los inicios de sesión fallidos desde la última verificación."""
+    def ensure_indexes(self):
+        """Crea los índices parciales sobre login_attempts si faltan.
+        
+        Los ciclos normales recorren login_attempts por clave primaria; el primero
+        busca los intentos fallidos de los últimos 15 minutos, que sin el índice
+        parcial de intentos fallidos por fecha recorrería la tabla entera.
+        """
         conn = self.get_db_connection()
         if not conn:
-            return []
-        
+            return
         try:
-            with conn.cursor(cursor_factory=RealDictCursor) as cur:
-                query = """
-                    SELECT id, username, ip_address, user_agent, created_at, success
-                    FROM login_attempts
-                    WHERE created_at > %s
-                    ORDER BY created_at DESC
-                """
-                cur.execute(query, (self.last_check,))
-                attempts = cur.fetchall()
-                
-                # Actualizar la hora de la última verificación
-                self.last_check = datetime.now()
-                
-                return attempts
-        except Exception as e:
-            print(f"{Colors.FAIL}Error al obtener inicios de sesión fallidos: {e}{Colors.ENDC}")
-            return []
-        finally:
-            conn.close()
+            created = ensure_report_indexes(conn)
+        except psycopg2.Error as e:
+            self.errors.append(f"{Colors.FAIL}Error al crear los índices: {e}{Colors.ENDC}")
+            return
+        if created:
+            print(f"Índices creados: {', '.join(created)}")
     
-    def get_locked_accounts(self):
-        """Obtiene las cuentas actualmente bloqueadas."""
-        conn = self.get_db_connection()
-        if not conn:
-            return []
+    def wait_for_activity(self, timeout):
+        """Espera a que se inserte un intento de inicio de sesión, como mucho ``timeout`` segundos.
+        
+        La conexión escucha NOTIFY_CHANNEL, así que el monitor se actualiza en cuanto
+        llega un intento y, sin actividad, solo consulta una vez por intervalo. Si el
+        trigger no está instalado nunca llegan avisos y equivale a un sondeo periódico.
         
+        Tras un aviso no se vuelve antes de ``min_refresh`` segundos desde la última
+        consulta; los avisos que llegan mientras tanto se descartan, porque la siguiente
+        consulta ya los incluye.
+        """
+        conn = self.conn
+        if conn is None or conn.closed:
+            self.stop_event.wait(timeout)
+            return
         try:
-            with conn.cursor(cursor_factory=RealDictCursor) as cur:
-                query = """
-                    SELECT id, username, email, bloqueado_hasta, 
-                           EXTRACT(EPOCH FROM (bloqueado_hasta - NOW()))/60 as minutos_restantes
-                    FROM usuarios
-                    WHERE bloqueado_hasta IS NOT NULL 
-                    AND bloqueado_hasta > NOW()
-                    ORDER BY bloqueado_hasta
-                """
-                cur.execute(query)
-                return cur.fetchall()
-        except Exception as e:
-            print(f"{Colors.FAIL}Error al obtener cuentas bloqueadas: {e}{Colors.ENDC}")
-            return []
-        finally:
-            conn.close()
+            # Un aviso que llegó durante la consulta anterior ya está en conn.notifies y
+            # no deja nada por leer en el socket: select esperaría el intervalo completo
+            if conn.notifies or conn in select.select([conn, self.wake_r], [], [], timeout)[0]:
+                remaining = self.last_refresh + self.min_refresh - time.monotonic()
+                if remaining > 0:
+                    # Solo la señal de salida interrumpe esta espera
+                    select.select([self.wake_r], [], [], remaining)
+                conn.poll()
+                # Varios avisos acumulados se atienden con una sola consulta
+                conn.notifies.clear()
+        except (psycopg2.OperationalError, psycopg2.InterfaceError):
+            # La conexión se cortó: fetch_snapshot la reabrirá en el siguiente ciclo
+            self.close()
     
-    def get_suspicious_activity(self):
-        """Identifica actividad sospechosa (múltiples intentos desde la misma IP)."""
-        conn = self.get_db_connection()
-        if not conn:
-            return []
+    def close(self):
+        """Cierra la conexión persistente."""
+        if self.conn is not None:
+            self.conn.close()
+            self.conn = None
+    
+    def _fetch_one(self, query, params=None):
+        """Ejecuta una consulta en la conexión persistente y devuelve su primera fila.
+        
+        Si la conexión se cortó (reinicio del servidor, corte de red) se reabre y la
+        consulta se reintenta una vez.
+        """
+        for retry in (True, False):
+            conn = self.get_db_connection()
+            if not conn:
+                return None
+            try:
+                with conn.cursor() as cur:
+                    cur.execute(query, params)
+                    return cur.fetchone()
+            except (psycopg2.OperationalError, psycopg2.InterfaceError):
+                self.close()
+                if not retry:
+                    raise
+    
+    def fetch_snapshot(self):
+        """Obtiene en una sola consulta los datos de un ciclo del monitor.
         
+        Los intentos nuevos desde el ciclo anterior (como mucho 200), las cuentas
+        bloqueadas y los intentos fallidos nuevos por IP llegan como JSON en la misma
+        fila, de modo que cada actualización cuesta un único viaje de ida y vuelta al
+        servidor. Las IPs sospechosas se calculan en memoria a partir de estos últimos.
+        
+        Returns:
+            Tupla (intentos, cuentas_bloqueadas, ips_sospechosas); cada una es una lista de
+            filas (username, ip_address, user_agent, created_at, success),
+            (username, email, minutos_restantes) e (ip, intentos) respectivamente
+        """
         try:
-            with conn.cursor(cursor_factory=RealDictCursor) as cur:
-                # Buscar IPs con múltiples intentos fallidos en los últimos 15 minutos
-                query = """
-                    SELECT ip_address, COUNT(*) as intentos
-                    FROM login_attempts
-                    WHERE created_at > NOW() - INTERVAL '15 minutes'
-                    AND success = false
-                    GROUP BY ip_address
-                    HAVING COUNT(*) >= %s
-                    ORDER BY COUNT(*) DESC
-                """
-                cur.execute(query, (self.threshold,))
-                return cur.fetchall()
+            row = self._fetch_one(
+                "EXECUTE monitor_snapshot(%s)", (self.last_id,)
+            )
         except Exception as e:
-            print(f"{Colors.FAIL}Error al obtener actividad sospechosa: {e}{Colors.ENDC}")
-            return []
-        finally:
-            conn.close()
+            self.errors.append(f"{Colors.FAIL}Error al obtener los datos del monitor: {e}{Colors.ENDC}")
+            return [], [], []
+        if row is None:
+            return [], [], []
+        
+        failed_logins, locked_accounts, new_failures, last_id = row
+        if last_id is not None:
+            self.last_id = last_id
+        return failed_logins, locked_accounts, self._update_suspicious(new_failures)
     
-    def print_header(self):
-        """Imprime el encabezado del monitor."""
-        print(f"\n{Colors.HEADER}{'='*80}{Colors.ENDC}")
-        print(f"{Colors.HEADER}{'MONITOR DE INICIOS DE SESIÓN'.center(80)}{Colors.ENDC}")
-        print(f"{Colors.HEADER}{'='*80}{Colors.ENDC}")
-        print(f"  {Colors.OKBLUE}•{Colors.ENDC} Actualizado: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
-        print(f"  {Colors.OKBLUE}•{Colors.ENDC} Intervalo de actualización: {self.update_interval} segundos")
-        print(f"  {Colors.OKBLUE}•{Colors.ENDC} Umbral de IPs sospechosas: {self.threshold} intentos")
-        print(f"  {Colors.OKBLUE}•{Colors.ENDC} {Colors.WARNING}Ctrl+C para salir{Colors.ENDC}")
-        print(f"{Colors.HEADER}{'-'*80}{Colors.ENDC}")
+    def _update_suspicious(self, new_failures):
+        """Actualiza la ventana de intentos fallidos por IP y devuelve las IPs sospechosas.
+        
+        Cada IP entra en la ventana con la hora de su último fallo y no con la del ciclo:
+        los del relleno inicial, de hasta 15 minutos atrás, salen de ella a su tiempo.
+        
+        Args:
+            new_failures: Diccionario IP -> [intentos fallidos nuevos de este ciclo,
+                segundos desde el último de ellos]
+        
+        Returns:
+            Lista de tuplas (ip, intentos) de las IPs que alcanzan el umbral en la
+            ventana, de más a menos intentos
+        """
+        now = time.monotonic()
+        entries = sorted(
+            (now - max(float(age), 0.0), ip, count)
+            for ip, (count, age) in new_failures.items()
+        )
+        for stamp, ip, count in entries:
+            # La ventana se descuenta por la izquierda y debe quedar ordenada
+            if self.suspicious_window:
+                stamp = max(stamp, self.suspicious_window[-1][0])
+            self.suspicious_window.append((stamp, {ip: count}))
+            self.suspicious_counts[ip] += count
+        # Descontar los ciclos que salieron de la ventana
+        while self.suspicious_window and self.suspicious_window[0][0] <= now - SUSPICIOUS_WINDOW:
+            self.suspicious_counts -= Counter(self.suspicious_window.popleft()[1])
+        
+        return [
+            (ip, count)
+            for ip, count in self.suspicious_counts.most_common()
+            if count >= self.threshold
+        ]
+    
+    def render_header(self, lines):
+        """Agrega al cuadro el encabezado del monitor."""
+        lines += self.header_top
+        lines.append(f"  {Colors.OKBLUE}•{Colors.ENDC} Actualizado: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
+        lines += self.header_bottom
     
-    def print_failed_logins(self, logins):
-        """Imprime los inicios de sesión fallidos."""
+    def render_failed_logins(self, lines, logins):
+        """Agrega al cuadro los inicios de sesión fallidos."""
+        add = lines.append
         if not logins:
             return
         
-        print(f"\n{Colors.FAIL}ÚLTIMOS INTENTOS FALLIDOS:{Colors.ENDC}")
-        print(f"{'Hora':<20} {'Usuario':<20} {'IP':<15} {'Navegador'}")
-        print("-" * 80)
+        add("")
+        add(f"{Colors.FAIL}ÚLTIMOS INTENTOS FALLIDOS:{Colors.ENDC}")
+        add(f"{'Hora':<20} {'Usuario':<20} {'IP':<15} {'Navegador'}")
+        add("-" * 80)
         
-        for attempt in logins:
-            timestamp = attempt['created_at'].strftime('%H:%M:%S')
-            username = attempt['username'] or 'Desconocido'
-            ip = attempt['ip_address'] or '0.0.0.0'
-            user_agent = (attempt['user_agent'] or 'Desconocido')[:40] + '...' \
-                        if attempt['user_agent'] and len(attempt['user_agent']) > 40 \
-                        else (attempt['user_agent'] or 'Desconocido')
+        # Se resaltan los intentos recientes (últimos 30 segundos)
+        hot_cutoff = datetime.now() - timedelta(seconds=30)
+        for username, ip, user_agent, created_at, success in logins:
+            created_at = datetime.fromisoformat(created_at)
+            timestamp = created_at.strftime('%H:%M:%S')
+            username = username or 'Desconocido'
+            ip = ip or '0.0.0.0'
+            user_agent = user_agent or 'Desconocido'
             
-            # Resaltar si es un intento reciente (últimos 30 segundos)
-            time_ago = (datetime.now() - attempt['created_at']).total_seconds()
-            time_str = f"{Colors.WARNING}{timestamp}{Colors.ENDC}" if time_ago < 30 else timestamp
+            time_str = WARN_START + timestamp + COLOR_END if created_at > hot_cutoff else timestamp
             
-            print(f"{time_str:<20} {username:<20} {ip:<15} {user_agent}")
+            add(f"{time_str:<20} {username:<20} {ip:<15} {user_agent}")
             
             # Actualizar estadísticas
             self.stats['total_attempts'] += 1
-            if not attempt['success']:
+            if not success:
                 self.stats['failed_attempts'] += 1
                 if ip:
                     self.stats['suspicious_ips'][ip] += 1
+        
+        # Acotar la memoria de un monitor de larga duración: se conservan las IPs más activas
+        if len(self.stats['suspicious_ips']) > MAX_TRACKED_IPS:
+            self.stats['suspicious_ips'] = Counter(
+                dict(self.stats['suspicious_ips'].most_common(TRACKED_IPS_KEPT))
+            )
     
-    def print_locked_accounts(self, accounts):
-        """Imprime las cuentas actualmente bloqueadas."""
+    def render_locked_accounts(self, lines, accounts):
+        """Agrega al cuadro las cuentas actualmente bloqueadas."""
+        add = lines.append
         if not accounts:
             return
         
-        print(f"\n{Colors.WARNING}CUENTAS BLOQUEADAS:{Colors.ENDC}")
-        print(f"{'Usuario':<20} {'Email':<30} {'Desbloqueo en'}")
-        print("-" * 80)
+        add("")
+        add(f"{Colors.WARNING}CUENTAS BLOQUEADAS:{Colors.ENDC}")
+        add(f"{'Usuario':<20} {'Email':<30} {'Desbloqueo en'}")
+        add("-" * 80)
         
-        for account in accounts:
-            username = account['username']
-            email = account['email'] or 'Sin email'
-            minutos = int(account['minutos_restantes'])
+        for username, email, minutos_restantes in accounts:
+            email = email or 'Sin email'
+            minutos = int(minutos_restantes)
             
             if minutos <= 0:
                 tiempo = "Inmediato"
@@ -234,52 +427,77 @@ class LoginMonitor:
                 mins = minutos % 60
                 tiempo = f"{horas}h {mins}m"
             
-            print(f"{username:<20} {email[:28]:<30} {tiempo}")
+            add(f"{username:<20} {email[:28]:<30} {tiempo}")
             
             # Actualizar estadísticas
             self.stats['locked_accounts'] = len(accounts)
     
-    def print_suspicious_ips(self, suspicious):
-        """Imprime las IPs con actividad sospechosa."""
+    def render_suspicious_ips(self, lines, suspicious):
+        """Agrega al cuadro las IPs con actividad sospechosa."""
+        add = lines.append
         if not suspicious:
             return
         
-        print(f"\n{Colors.FAIL}ACTIVIDAD SOSPECHOSA:{Colors.ENDC}")
-        print(f"{'IP':<15} {'Intentos'}")
-        print("-" * 25)
+        add("")
+        add(f"{Colors.FAIL}ACTIVIDAD SOSPECHOSA:{Colors.ENDC}")
+        add(f"{'IP':<15} {'Intentos'}")
+        add("-" * 25)
         
-        for item in suspicious:
-            ip = item['ip_address']
-            count = item['intentos']
+        for ip, count in suspicious:
             
             # Resaltar si supera el umbral
             if count >= self.threshold * 2:
-                count_str = f"{Colors.FAIL}{count}{Colors.ENDC}"
+                count_str = f"{FAIL_START}{count}{COLOR_END}"
             elif count >= self.threshold:
-                count_str = f"{Colors.WARNING}{count}{Colors.ENDC}"
+                count_str = f"{WARN_START}{count}{COLOR_END}"
             else:
                 count_str = str(count)
             
-            print(f"{ip:<15} {count_str}")
+            add(f"{ip:<15} {count_str}")
     
-    def print_stats(self):
-        """Imprime las estadísticas de monitoreo."""
-        print(f"\n{Colors.HEADER}ESTADÍSTICAS:{Colors.ENDC}")
-        print(f"  • Intentos totales: {self.stats['total_attempts']}")
-        print(f"  • Intentos fallidos: {self.stats['failed_attempts']}")
-        print(f"  • Cuentas bloqueadas: {self.stats['locked_accounts']}")
+    def render_stats(self, lines):
+        """Agrega al cuadro las estadísticas de monitoreo."""
+        add = lines.append
+        add("")
+        add(f"{Colors.HEADER}ESTADÍSTICAS:{Colors.ENDC}")
+        add(f"  • Intentos totales: {self.stats['total_attempts']}")
+        add(f"  • Intentos fallidos: {self.stats['failed_attempts']}")
+        add(f"  • Cuentas bloqueadas: {self.stats['locked_accounts']}")
         
         # Mostrar IPs más problemáticas
         if self.stats['suspicious_ips']:
-            top_ips = sorted(
-                self.stats['suspicious_ips'].items(), 
-                key=lambda x: x[1], 
-                reverse=True
-            )[:3]  # Top 3 IPs
-            
-            print("  • IPs más activas:")
-            for ip, count in top_ips:
-                print(f"    - {ip}: {count} intentos")
+            add("  • IPs más activas:")
+            for ip, count in self.stats['suspicious_ips'].most_common(3):
+                add(f"    - {ip}: {count} intentos")
+    
+    def draw(self, lines):
+        """Dibuja un cuadro en la terminal reescribiendo solo las líneas que cambiaron.
+        
+        Cada línea distinta del cuadro anterior se reescribe en su sitio con
+        direccionamiento de cursor ANSI, así que entre ciclos casi iguales se envían
+        unos pocos bytes y la pantalla no parpadea. Si el cuadro no cabe en la terminal
+        (líneas que se desplazan o se parten) se limpia y se redibuja completo.
+        """
+        size = shutil.get_terminal_size()
+        fits = len(lines) < size.lines and all(len(line) <= size.columns for line in lines)
+        previous = self.last_frame
+        
+        if previous is None or not fits:
+            out = ["\033[H\033[J", "\n".join(lines), "\n"]
+        else:
+            out = [
+                f"\033[{row};1H{line}\033[K"
+                for row, line in enumerate(lines, 1)
+                if row > len(previous) or previous[row - 1] != line
+            ]
+            # Borrar lo que sobra del cuadro anterior y dejar el cursor debajo del nuevo
+            out.append(f"\033[{len(lines) + 1};1H")
+            if len(lines) < len(previous):
+                out.append("\033[J")
+        
+        self.last_frame = lines if fits else None
+        sys.stdout.write("".join(out))
+        sys.stdout.flush()
     
     def run(self):
         """Ejecuta el bucle principal del monitor."""
@@ -287,32 +505,34 @@ class LoginMonitor:
         print(f"Presiona {Colors.WARNING}Ctrl+C{Colors.ENDC} para salir\n")
         
         try:
-            while self.running:
-                # Limpiar la pantalla (funciona en la mayoría de terminales Unix/Linux)
-                print("\033[H\033[J", end="")
-                
-                # Obtener y mostrar datos
-                self.print_header()
-                
+            self.ensure_indexes()
+            while not self.stop_event.is_set():
                 # Obtener datos
-                failed_logins = self.get_failed_logins()
-                locked_accounts = self.get_locked_accounts()
-                suspicious_ips = self.get_suspicious_activity()
+                failed_logins, locked_accounts, suspicious_ips = self.fetch_snapshot()
+                self.last_refresh = time.monotonic()
                 
-                # Mostrar datos
-                self.print_failed_logins(failed_logins)
-                self.print_locked_accounts(locked_accounts)
-                self.print_suspicious_ips(suspicious_ips)
-                self.print_stats()
+                # El cuadro se arma como lista de líneas y se vuelca a la terminal de una vez
+                lines = []
+                self.render_header(lines)
+                lines.extend(self.errors)
+                self.errors.clear()
+                self.render_failed_logins(lines, failed_logins)
+                self.render_locked_accounts(lines, locked_accounts)
+                self.render_suspicious_ips(lines, suspicious_ips)
+                self.render_stats(lines)
+                self.draw(lines)
                 
-                # Esperar antes de la siguiente actualización
-                time.sleep(self.update_interval)
+                # Esperar un intento nuevo o, como mucho, el intervalo de actualización
+                self.wait_for_activity(self.update_interval)
                 
         except KeyboardInterrupt:
             print("\nDeteniendo el monitor...")
         except Exception as e:
             print(f"\n{Colors.FAIL}Error en el monitor: {e}{Colors.ENDC}")
         finally:
+            self.close()
+            os.close(self.wake_r)
+            os.close(self.wake_w)
             print(f"{Colors.OKGREEN}Monitor detenido.{Colors.ENDC}")
 
 def parse_args():
@@ -322,6 +542,9 @@ def parse_args():
                        help='Intervalo de actualización en segundos (por defecto: 5)')
     parser.add_argument('--threshold', type=int, default=3,
                        help='Umbral para resaltar IPs con muchos intentos (por defecto: 3)')
+    parser.add_argument('--min-refresh', type=float, default=0.5,
+                       help='Segundos mínimos entre actualizaciones por nuevos intentos '
+                            '(por defecto: 0.5)')
     return parser.parse_args()
 
 def main():
@@ -335,7 +558,8 @@ def main():
     monitor = LoginMonitor(
         db_config=db_config,
         update_interval=args.interval,
-        threshold=args.threshold
+        threshold=args.threshold,
+        min_refresh=args.min_refresh
     )
     
     try:
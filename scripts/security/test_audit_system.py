@@ -9,6 +9,11 @@ import sys
 import random
 import string
 import logging
+import threading
+import weakref
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+import bcrypt
 from faker import Faker
 
 # Configuración de logging
@@ -39,14 +44,51 @@ DB_CONFIG = {
     'port': os.getenv('POSTGRES_PORT', '5432')
 }
 
+# Sentencias que las operaciones aleatorias repiten en cada llamada. Se preparan una vez
+# por conexión del pool y después se invocan con EXECUTE, sin que el servidor las vuelva
+# a analizar y planificar
+PREPARED_STATEMENTS = {
+    'upd_user': """
+        UPDATE usuarios
+        SET email = $1, nombre = $2, apellido = $3, activo = $4, updated_at = NOW()
+        WHERE id = $5
+        RETURNING id, username""",
+    'del_user': "DELETE FROM usuarios WHERE id = $1 RETURNING username",
+    'upd_role': """
+        UPDATE roles
+        SET descripcion = $1, activo = $2, updated_at = NOW()
+        WHERE id = $3
+        RETURNING id, nombre""",
+    'del_role': "DELETE FROM roles WHERE id = $1 RETURNING nombre",
+}
+
 class AuditTester:
     """Clase para probar el sistema de auditoría."""
     
-    def __init__(self, db_config):
-        """Inicializa el probador de auditoría."""
+    def __init__(self, db_config, workers=8):
+        """Inicializa el probador de auditoría.
+        
+        Args:
+            db_config: Configuración de la base de datos
+            workers: Hilos (y conexiones del pool) para las operaciones aleatorias
+        """
         self.db_config = db_config
-        self.conn = None
+        self.workers = workers
+        self.pool = None
+        # Conexiones del pool que ya tienen las PREPARED_STATEMENTS
+        self.prepared = weakref.WeakSet()
         self.fake = Faker('es_ES')  # Usamos datos en español
+        # Un único hash bcrypt de costo mínimo para todos los usuarios de prueba: nadie
+        # inicia sesión con ellos, y crypt(gen_salt('bf')) costaba decenas de ms de CPU
+        # del servidor por cada INSERT
+        self.password_hash = bcrypt.hashpw(
+            self.generate_random_password().encode(), bcrypt.gensalt(rounds=4)
+        ).decode()
+        # Datos falsos pregenerados por prepare_fake_data
+        self.fake_users = []
+        self.fake_roles = []
+        # Protege los contadores y las listas de IDs compartidas entre hilos
+        self.lock = threading.Lock()
         
         # Contadores para estadísticas
         self.stats = {
@@ -62,12 +104,16 @@ class AuditTester:
     def connect(self):
         """Establece conexión a la base de datos."""
         try:
-            import psycopg2
             from psycopg2.extras import DictCursor
+            from psycopg2.pool import ThreadedConnectionPool
             
-            self.conn = psycopg2.connect(**self.db_config)
-            self.conn.autocommit = True
-            self.cursor = self.conn.cursor(cursor_factory=DictCursor)
+            # Una conexión por hilo de trabajo; se abren a medida que se necesitan.
+            # Cada operación sigue siendo su propia transacción (un fallo no arrastra a
+            # las demás), pero sin synchronous_commit el COMMIT no espera al fsync del WAL
+            self.pool = ThreadedConnectionPool(
+                1, self.workers, options='-c synchronous_commit=off', **self.db_config
+            )
+            self.cursor_factory = DictCursor
             logger.info("Conexión establecida con la base de datos")
             return True
         except ImportError:
@@ -78,25 +124,79 @@ class AuditTester:
             return False
     
     def close(self):
-        """Cierra la conexión a la base de datos."""
-        if hasattr(self, 'cursor') and self.cursor:
-            self.cursor.close()
-        if self.conn:
-            self.conn.close()
+        """Cierra las conexiones a la base de datos."""
+        if self.pool:
+            self.pool.closeall()
             logger.info("Conexión cerrada")
     
+    @contextmanager
+    def _cursor(self):
+        """Presta una conexión del pool (en autocommit) y entrega un cursor sobre ella."""
+        conn = self.pool.getconn()
+        try:
+            conn.autocommit = True
+            with conn.cursor(cursor_factory=self.cursor_factory) as cur:
+                if conn not in self.prepared:
+                    # Todas en un solo envío; cada conexión solo la usa un hilo a la vez
+                    cur.execute("; ".join(
+                        f"PREPARE {name} AS {sql}" for name, sql in PREPARED_STATEMENTS.items()
+                    ))
+                    self.prepared.add(conn)
+                yield cur
+        finally:
+            self.pool.putconn(conn)
+    
+    def _count(self, key, n=1):
+        """Suma ``n`` al contador ``key`` de las estadísticas."""
+        with self.lock:
+            self.stats[key] += n
+    
     def execute_query(self, query, params=None, fetchone=False):
         """Ejecuta una consulta y devuelve el resultado."""
         try:
-            self.cursor.execute(query, params or ())
-            if fetchone:
-                return self.cursor.fetchone()
-            return self.cursor.fetchall()
+            with self._cursor() as cur:
+                cur.execute(query, params or ())
+                if fetchone:
+                    return cur.fetchone()
+                return cur.fetchall()
         except Exception as e:
             logger.error(f"Error al ejecutar consulta: {e}")
             logger.debug(f"Consulta fallida: {query}")
             raise
     
+    def prepare_fake_data(self, users, roles):
+        """Genera de una vez los datos falsos que consumirán las operaciones.
+        
+        Cada llamada a un proveedor de Faker tiene su costo fijo; generarlos antes de
+        lanzar los hilos lo saca de la fase concurrente.
+        
+        Args:
+            users: Cantidad de usuarios (username, email, nombre, apellido)
+            roles: Cantidad de roles (nombre, descripción)
+        """
+        fake = self.fake
+        self.fake_users = [
+            (fake.user_name(), fake.email(), fake.first_name(), fake.last_name())
+            for _ in range(users)
+        ]
+        self.fake_roles = [(f"rol_{fake.word().lower()}", fake.sentence()) for _ in range(roles)]
+    
+    def _fake_user(self):
+        """Devuelve (username, email, nombre, apellido) pregenerados, o nuevos si se agotaron."""
+        try:
+            # list.pop es atómico, así que los hilos pueden consumir la lista sin bloqueo
+            return self.fake_users.pop()
+        except IndexError:
+            fake = self.fake
+            return fake.user_name(), fake.email(), fake.first_name(), fake.last_name()
+    
+    def _fake_role(self):
+        """Devuelve (nombre, descripción) de rol pregenerados, o nuevos si se agotaron."""
+        try:
+            return self.fake_roles.pop()
+        except IndexError:
+            return f"rol_{self.fake.word().lower()}", self.fake.sentence()
+    
     def generate_random_password(self, length=12):
         """Genera una contraseña aleatoria."""
         chars = string.ascii_letters + string.digits + '!@#$%^&*()'
@@ -104,91 +204,101 @@ class AuditTester:
     
     def create_test_user(self):
         """Crea un usuario de prueba."""
-        username = self.fake.user_name()
-        email = self.fake.email()
-        password = self.generate_random_password()
-        nombre = self.fake.first_name()
-        apellido = self.fake.last_name()
+        username, email, nombre, apellido = self._fake_user()
         activo = random.choice([True, False])
         
         query = """
         INSERT INTO usuarios (username, email, password_hash, nombre, apellido, activo, email_verificado)
-        VALUES (%s, %s, crypt(%s, gen_salt('bf')), %s, %s, %s, %s)
+        VALUES (%s, %s, %s, %s, %s, %s, %s)
         RETURNING id
         """
         
         try:
-            self.cursor.execute(query, (username, email, password, nombre, apellido, activo, activo))
-            user_id = self.cursor.fetchone()['id']
-            logger.info(f"Usuario de prueba creado: {username} (ID: {user_id})")
-            self.stats['users_created'] += 1
-            return user_id
+            with self._cursor() as cur:
+                cur.execute(query, (username, email, self.password_hash, nombre, apellido, activo, activo))
+                user_id = cur.fetchone()['id']
+                logger.info(f"Usuario de prueba creado: {username} (ID: {user_id})")
+                self._count('users_created')
+                return user_id
         except Exception as e:
             logger.error(f"Error al crear usuario de prueba: {e}")
             return None
     
-    def update_test_user(self, user_id):
-        """Actualiza un usuario de prueba."""
-        # Obtener el usuario actual
-        query = "SELECT id, username FROM usuarios WHERE id = %s"
-        user = self.execute_query(query, (user_id,), fetchone=True)
+    def create_test_users_bulk(self, n):
+        """Crea ``n`` usuarios de prueba con un único INSERT de varias filas.
         
-        if not user:
-            logger.warning(f"Usuario con ID {user_id} no encontrado")
-            return False
+        Returns:
+            Lista con los IDs de los usuarios creados; los que chocan con un usuario
+            existente (username o email repetidos) se omiten, como en create_test_user
+        """
+        from psycopg2.extras import execute_values
         
-        # Actualizar algunos campos
-        new_email = self.fake.email()
-        new_nombre = self.fake.first_name()
-        new_apellido = self.fake.last_name()
-        new_activo = not bool(random.getrandbits(1))  # 50% de probabilidad de cambiar el estado
+        rows = []
+        for _ in range(n):
+            username, email, nombre, apellido = self._fake_user()
+            activo = random.choice([True, False])
+            rows.append((username, email, self.password_hash, nombre, apellido, activo, activo))
         
-        update_query = """
-        UPDATE usuarios
-        SET email = %s, nombre = %s, apellido = %s, activo = %s, updated_at = NOW()
-        WHERE id = %s
+        query = """
+        INSERT INTO usuarios (username, email, password_hash, nombre, apellido, activo, email_verificado)
+        VALUES %s
+        ON CONFLICT DO NOTHING
         RETURNING id, username
         """
         
         try:
-            self.cursor.execute(update_query, (new_email, new_nombre, new_apellido, new_activo, user_id))
-            updated_user = self.cursor.fetchone()
-            if updated_user:
+            with self._cursor() as cur:
+                created = execute_values(cur, query, rows, page_size=500, fetch=True)
+        except Exception as e:
+            logger.error(f"Error al crear usuarios de prueba: {e}")
+            return []
+        
+        for user in created:
+            logger.info(f"Usuario de prueba creado: {user['username']} (ID: {user['id']})")
+        self._count('users_created', len(created))
+        return [user['id'] for user in created]
+    
+    def update_test_user(self, user_id):
+        """Actualiza un usuario de prueba."""
+        # Actualizar algunos campos
+        _, new_email, new_nombre, new_apellido = self._fake_user()
+        new_activo = not bool(random.getrandbits(1))  # 50% de probabilidad de cambiar el estado
+        
+        try:
+            with self._cursor() as cur:
+                cur.execute("EXECUTE upd_user(%s, %s, %s, %s, %s)", (new_email, new_nombre, new_apellido, new_activo, user_id))
+                updated_user = cur.fetchone()
+                # Sin fila devuelta el usuario ya no existe; no hace falta consultarlo antes
+                if not updated_user:
+                    logger.warning(f"Usuario con ID {user_id} no encontrado")
+                    return False
                 logger.info(f"Usuario actualizado: {updated_user['username']} (ID: {updated_user['id']})")
-                self.stats['users_updated'] += 1
+                self._count('users_updated')
                 return True
-            return False
         except Exception as e:
             logger.error(f"Error al actualizar usuario: {e}")
             return False
     
     def delete_test_user(self, user_id):
         """Elimina un usuario de prueba."""
-        # Obtener el usuario antes de eliminarlo para registrarlo
-        query = "SELECT id, username FROM usuarios WHERE id = %s"
-        user = self.execute_query(query, (user_id,), fetchone=True)
-        
-        if not user:
-            logger.warning(f"Usuario con ID {user_id} no encontrado")
-            return False
-        
-        delete_query = "DELETE FROM usuarios WHERE id = %s"
-        
         try:
-            self.cursor.execute(delete_query, (user_id,))
-            if self.cursor.rowcount > 0:
+            with self._cursor() as cur:
+                # RETURNING entrega el nombre para el registro sin un SELECT previo
+                cur.execute("EXECUTE del_user(%s)", (user_id,))
+                user = cur.fetchone()
+                if not user:
+                    logger.warning(f"Usuario con ID {user_id} no encontrado")
+                    return False
                 logger.info(f"Usuario eliminado: {user['username']} (ID: {user_id})")
-                self.stats['users_deleted'] += 1
+                self._count('users_deleted')
                 return True
-            return False
         except Exception as e:
             logger.error(f"Error al eliminar usuario: {e}")
             return False
     
     def create_test_role(self):
         """Crea un rol de prueba."""
-        role_name = f"rol_{self.fake.word().lower()}"
-        descripcion = self.fake.sentence()
+        role_name, descripcion = self._fake_role()
         
         query = """
         INSERT INTO roles (nombre, descripcion, activo)
@@ -197,86 +307,107 @@ class AuditTester:
         """
         
         try:
-            self.cursor.execute(query, (role_name, descripcion, True))
-            role_id = self.cursor.fetchone()['id']
-            logger.info(f"Rol de prueba creado: {role_name} (ID: {role_id})")
-            self.stats['roles_created'] += 1
-            return role_id
+            with self._cursor() as cur:
+                cur.execute(query, (role_name, descripcion, True))
+                role_id = cur.fetchone()['id']
+                logger.info(f"Rol de prueba creado: {role_name} (ID: {role_id})")
+                self._count('roles_created')
+                return role_id
         except Exception as e:
             logger.error(f"Error al crear rol de prueba: {e}")
             return None
     
-    def update_test_role(self, role_id):
-        """Actualiza un rol de prueba."""
-        # Obtener el rol actual
-        query = "SELECT id, nombre FROM roles WHERE id = %s"
-        role = self.execute_query(query, (role_id,), fetchone=True)
+    def create_test_roles_bulk(self, n):
+        """Crea ``n`` roles de prueba con un único INSERT de varias filas.
         
-        if not role:
-            logger.warning(f"Rol con ID {role_id} no encontrado")
-            return False
+        Returns:
+            Lista con los IDs de los roles creados; los nombres repetidos se omiten
+        """
+        from psycopg2.extras import execute_values
         
-        # Actualizar algunos campos
-        new_descripcion = self.fake.sentence()
-        new_activo = not bool(random.getrandbits(1))  # 50% de probabilidad de cambiar el estado
+        rows = [(*self._fake_role(), True) for _ in range(n)]
         
-        update_query = """
-        UPDATE roles
-        SET descripcion = %s, activo = %s, updated_at = NOW()
-        WHERE id = %s
+        query = """
+        INSERT INTO roles (nombre, descripcion, activo)
+        VALUES %s
+        ON CONFLICT DO NOTHING
         RETURNING id, nombre
         """
         
         try:
-            self.cursor.execute(update_query, (new_descripcion, new_activo, role_id))
-            updated_role = self.cursor.fetchone()
-            if updated_role:
+            with self._cursor() as cur:
+                created = execute_values(cur, query, rows, page_size=500, fetch=True)
+        except Exception as e:
+            logger.error(f"Error al crear roles de prueba: {e}")
+            return []
+        
+        for role in created:
+            logger.info(f"Rol de prueba creado: {role['nombre']} (ID: {role['id']})")
+        self._count('roles_created', len(created))
+        return [role['id'] for role in created]
+    
+    def update_test_role(self, role_id):
+        """Actualiza un rol de prueba."""
+        # Actualizar algunos campos
+        _, new_descripcion = self._fake_role()
+        new_activo = not bool(random.getrandbits(1))  # 50% de probabilidad de cambiar el estado
+        
+        try:
+            with self._cursor() as cur:
+                cur.execute("EXECUTE upd_role(%s, %s, %s)", (new_descripcion, new_activo, role_id))
+                updated_role = cur.fetchone()
+                if not updated_role:
+                    logger.warning(f"Rol con ID {role_id} no encontrado")
+                    return False
                 logger.info(f"Rol actualizado: {updated_role['nombre']} (ID: {updated_role['id']})")
-                self.stats['roles_updated'] += 1
+                self._count('roles_updated')
                 return True
-            return False
         except Exception as e:
             logger.error(f"Error al actualizar rol: {e}")
             return False
     
     def delete_test_role(self, role_id):
         """Elimina un rol de prueba."""
-        # Obtener el rol antes de eliminarlo para registrarlo
-        query = "SELECT id, nombre FROM roles WHERE id = %s"
-        role = self.execute_query(query, (role_id,), fetchone=True)
-        
-        if not role:
-            logger.warning(f"Rol con ID {role_id} no encontrado")
-            return False
-        
-        delete_query = "DELETE FROM roles WHERE id = %s"
-        
         try:
-            self.cursor.execute(delete_query, (role_id,))
-            if self.cursor.rowcount > 0:
+            with self._cursor() as cur:
+                cur.execute("EXECUTE del_role(%s)", (role_id,))
+                role = cur.fetchone()
+                if not role:
+                    logger.warning(f"Rol con ID {role_id} no encontrado")
+                    return False
                 logger.info(f"Rol eliminado: {role['nombre']} (ID: {role_id})")
-                self.stats['roles_deleted'] += 1
+                self._count('roles_deleted')
                 return True
-            return False
         except Exception as e:
             logger.error(f"Error al eliminar rol: {e}")
             return False
     
-    def check_audit_entries(self):
-        """Verifica las entradas de auditoría generadas."""
+    def check_audit_entries(self, since):
+        """Verifica las entradas de auditoría generadas.
+        
+        Args:
+            since: Marca de tiempo del servidor tomada al comenzar la prueba; solo se
+                cuentan los eventos posteriores, que la poda de particiones y el índice
+                BRIN sobre action_tstamp localizan sin recorrer toda la tabla
+        """
+        # Con la tabla de ingreso (setup --staging) los eventos esperan en
+        # logged_actions_hot hasta el siguiente audit.flush_hot(), así que también se cuentan allí
         query = """
         SELECT 
             COUNT(*) as total,
             action,
             table_name
-        FROM audit.logged_actions
-        WHERE action_tstamp > NOW() - INTERVAL '1 hour'
+        FROM (
+            SELECT action, table_name FROM audit.logged_actions WHERE action_tstamp >= %(since)s
+            UNION ALL
+            SELECT action, table_name FROM audit.logged_actions_hot WHERE action_tstamp >= %(since)s
+        ) AS events
         GROUP BY action, table_name
         ORDER BY table_name, action
         """
         
         try:
-            results = self.execute_query(query)
+            results = self.execute_query(query, {'since': since})
             if not results:
                 logger.warning("No se encontraron entradas de auditoría recientes")
                 return False
@@ -302,25 +433,44 @@ class AuditTester:
             logger.error(f"Error al verificar entradas de auditoría: {e}")
             return False
     
+    def _run_operation(self, selected_op, user_ids, role_ids):
+        """Ejecuta una operación aleatoria con un ID aleatorio si es necesario.
+        
+        Las listas de IDs se comparten entre hilos y solo se tocan bajo ``self.lock``.
+        El ID a eliminar se retira de la lista antes de la operación, para que otro hilo
+        no lo elija mientras tanto, y se devuelve si la eliminación falla.
+        """
+        if selected_op == self.create_test_user or selected_op == self.create_test_role:
+            ids = user_ids if selected_op == self.create_test_user else role_ids
+            new_id = selected_op()
+            if new_id:
+                with self.lock:
+                    ids.append(new_id)
+        
+        else:
+            ids = user_ids if selected_op in (self.update_test_user, self.delete_test_user) else role_ids
+            deleting = selected_op in (self.delete_test_user, self.delete_test_role)
+            with self.lock:
+                target_id = random.choice(ids) if ids else None
+                if target_id is not None and deleting:
+                    ids.remove(target_id)
+            if target_id is not None and not selected_op(target_id) and deleting:
+                with self.lock:
+                    ids.append(target_id)
+    
     def run_tests(self, num_operations=10):
         """Ejecuta una serie de pruebas de auditoría."""
         logger.info(f"Iniciando pruebas de auditoría ({num_operations} operaciones)")
         
-        # Crear algunos usuarios y roles iniciales
-        user_ids = []
-        role_ids = []
+        # Hora del servidor, con la que se comparará action_tstamp (evita desfases de reloj)
+        test_start = self.execute_query("SELECT now() AS ahora", fetchone=True)['ahora']
         
-        # Crear 5 usuarios iniciales
-        for _ in range(5):
-            user_id = self.create_test_user()
-            if user_id:
-                user_ids.append(user_id)
+        # Cada operación consume como mucho un usuario o un rol, más los iniciales
+        self.prepare_fake_data(users=5 + num_operations, roles=3 + num_operations)
         
-        # Crear 3 roles iniciales
-        for _ in range(3):
-            role_id = self.create_test_role()
-            if role_id:
-                role_ids.append(role_id)
+        # Crear algunos usuarios y roles iniciales, cada grupo en un solo INSERT
+        user_ids = self.create_test_users_bulk(5)
+        role_ids = self.create_test_roles_bulk(3)
         
         # Realizar operaciones aleatorias
         operations = [
@@ -332,47 +482,17 @@ class AuditTester:
             (self.delete_test_role, 0.1)          # 10% de probabilidad
         ]
         
-        for _ in range(num_operations):
-            # Seleccionar una operación aleatoria según las probabilidades
-            op_weights = [op[1] for op in operations]
-            selected_op = random.choices(operations, weights=op_weights, k=1)[0][0]
-            
-            # Ejecutar la operación seleccionada con un ID aleatorio si es necesario
-            if selected_op == self.create_test_user:
-                user_id = selected_op()
-                if user_id:
-                    user_ids.append(user_id)
-            
-            elif selected_op == self.update_test_user and user_ids:
-                user_id = random.choice(user_ids)
-                selected_op(user_id)
-            
-            elif selected_op == self.delete_test_user and user_ids:
-                user_id = random.choice(user_ids)
-                if selected_op(user_id):
-                    user_ids.remove(user_id)
-            
-            elif selected_op == self.create_test_role:
-                role_id = selected_op()
-                if role_id:
-                    role_ids.append(role_id)
-            
-            elif selected_op == self.update_test_role and role_ids:
-                role_id = random.choice(role_ids)
-                selected_op(role_id)
-            
-            elif selected_op == self.delete_test_role and role_ids:
-                role_id = random.choice(role_ids)
-                if selected_op(role_id):
-                    role_ids.remove(role_id)
-            
-            # Pequeña pausa entre operaciones
-            import time
-            time.sleep(0.1)
+        # Las operaciones se eligen de antemano y se reparten entre los hilos, cada uno
+        # con su propia conexión del pool
+        op_weights = [op[1] for op in operations]
+        selected_ops = [op[0] for op in random.choices(operations, weights=op_weights, k=num_operations)]
+        with ThreadPoolExecutor(max_workers=self.workers) as executor:
+            # list() consume los resultados para que se propague cualquier excepción
+            list(executor.map(lambda op: self._run_operation(op, user_ids, role_ids), selected_ops))
         
         # Verificar las entradas de auditoría
         logger.info("\nVerificando entradas de auditoría...")
-        audit_ok = self.check_audit_entries()
+        audit_ok = self.check_audit_entries(test_start)
         
         # Mostrar resumen
         logger.info("\n" + "="*60)
@@ -418,6 +538,8 @@ def parse_args():
     # Número de operaciones a realizar
     parser.add_argument('-n', '--num-operations', type=int, default=20,
                        help='Número de operaciones a realizar (por defecto: 20)')
+    parser.add_argument('-w', '--workers', type=int, default=8,
+                       help='Hilos y conexiones para las operaciones aleatorias (por defecto: 8)')
     
     return parser.parse_args()
 
@@ -435,7 +557,7 @@ def main():
     }
     
     # Crear y ejecutar el probador de auditoría
-    tester = AuditTester(db_config)
+    tester = AuditTester(db_config, workers=args.workers)
     
     try:
         # Conectar a la base de datos
@@ -6,11 +6,20 @@ Este script verifica que todas las dependencias necesarias estén instaladas
 correctamente y que la configuración del sistema sea la adecuada.
 """
 import sys
+import re
 import json
+import time
+import shutil
+import argparse
+import functools
 import subprocess
+import tempfile
+import threading
 import os
+from concurrent.futures import ThreadPoolExecutor
+from importlib.metadata import distributions
 from pathlib import Path
-from typing import Dict, List, Tuple
+from typing import Callable, Dict, List, Tuple
 
 # Versiones mínimas requeridas
 MIN_PYTHON = (3, 10)
@@ -23,6 +32,11 @@ PROJECT_ROOT = Path(__file__).parent.parent.parent.absolute()
 REQUIREMENTS_TXT = PROJECT_ROOT / "requirements.txt"
 PYPROJECT_TOML = PROJECT_ROOT / "pyproject.toml"
 
+# Caché en disco de las comprobaciones que lanzan un subproceso
+CACHE_FILE = Path(tempfile.gettempdir()) / "check_system.json"
+CACHE_TTL = 300  # segundos
+_cache_lock = threading.Lock()
+
 # Añadir el directorio raíz al path para importaciones absolutas
 sys.path.append(str(PROJECT_ROOT))
 
@@ -79,6 +93,71 @@ def run_command(cmd: List[str]) -> Tuple[bool, str]:
     except (subprocess.CalledProcessError, FileNotFoundError) as e:
         return False, str(e.stderr if hasattr(e, 'stderr') else str(e))
 
+def cached_probe(binary: str, minimum: str) -> Callable:
+    """Guarda en CACHE_FILE el resultado de una comprobación durante CACHE_TTL segundos.
+    
+    La clave incluye la ruta y la fecha de modificación del ejecutable y la versión
+    mínima exigida, así que reinstalar o actualizar la herramienta invalida la entrada.
+    La función decorada acepta ``use_cache=False`` para forzar la comprobación.
+    
+    Args:
+        binary: Ejecutable que invoca la comprobación
+        minimum: Versión mínima con la que se evalúa el resultado
+    """
+    def decorator(func: Callable[[], Tuple[bool, str]]) -> Callable[..., Tuple[bool, str]]:
+        @functools.wraps(func)
+        def wrapper(use_cache: bool = True) -> Tuple[bool, str]:
+            path = shutil.which(binary)
+            # Si no está instalado, fallar cuesta poco y no hay nada que guardar
+            if not use_cache or path is None:
+                return func()
+            
+            key = f"{func.__name__}|{path}|{os.path.getmtime(path)}|{minimum}"
+            entry = load_cache().get(key)
+            if entry and time.time() - entry["time"] < CACHE_TTL:
+                return tuple(entry["result"])
+            
+            result = func()
+            # Las comprobaciones corren en paralelo: se relee y se fusiona bajo el lock, y
+            # el archivo se reemplaza de forma atómica
+            with _cache_lock:
+                now = time.time()
+                cache = {k: v for k, v in load_cache().items() if now - v["time"] < CACHE_TTL}
+                cache[key] = {"time": now, "result": list(result)}
+                try:
+                    tmp_file = CACHE_FILE.with_suffix(f".{os.getpid()}.tmp")
+                    tmp_file.write_text(json.dumps(cache))
+                    os.replace(tmp_file, CACHE_FILE)
+                except OSError:
+                    pass
+            return result
+        return wrapper
+    return decorator
+
+def load_cache() -> Dict[str, dict]:
+    """Lee CACHE_FILE; un archivo ausente o corrupto equivale a una caché vacía."""
+    try:
+        return json.loads(CACHE_FILE.read_text())
+    except (OSError, ValueError):
+        return {}
+
+def extract_version(output: str) -> str:
+    """Extrae el primer número de versión (p. ej. 24.0.5) de la salida de ``--version``.
+    
+    Cubre formatos como "Poetry (version 1.8.2)", "Docker version 24.0.5, build ced0996"
+    o "Docker Compose version v2.20.2".
+    """
+    match = re.search(r"\d+(?:\.\d+)+", output)
+    return match.group(0) if match else output.strip()
+
+def version_tuple(version: str) -> Tuple[int, ...]:
+    """Convierte una versión en tupla de enteros para compararla numéricamente.
+    
+    Comparar las cadenas directamente falla: "1.3.10" < "1.3.9" y "10.0.0" < "9.0.0".
+    """
+    return tuple(int(part) for part in re.findall(r"\d+", version))
+
+@cached_probe("poetry", MIN_POETRY)
 def check_poetry() -> Tuple[bool, str]:
     """Verifica si Poetry está instalado y su versión."""
     success, output = run_command(["poetry", "--version"])
@@ -86,12 +165,13 @@ def check_poetry() -> Tuple[bool, str]:
         return False, "Poetry no está instalado"
     
     # Extraer la versión de la salida
-    version = output.split()[-1]
-    if version >= MIN_POETRY:
+    version = extract_version(output)
+    if version_tuple(version) >= version_tuple(MIN_POETRY):
         return True, f"Poetry {version} (>= {MIN_POETRY})"
     else:
         return False, f"Poetry {version} (se requiere >= {MIN_POETRY})"
 
+@cached_probe("docker", MIN_DOCKER)
 def check_docker() -> Tuple[bool, str]:
     """Verifica si Docker está instalado y su versión."""
     success, output = run_command(["docker", "--version"])
@@ -99,12 +179,13 @@ def check_docker() -> Tuple[bool, str]:
         return False, "Docker no está instalado"
     
     # Extraer la versión de la salida
-    version = output.split()[2].rstrip(',')
-    if version >= MIN_DOCKER:
+    version = extract_version(output)
+    if version_tuple(version) >= version_tuple(MIN_DOCKER):
         return True, f"Docker {version} (>= {MIN_DOCKER})"
     else:
         return False, f"Docker {version} (se requiere >= {MIN_DOCKER})"
 
+@cached_probe("docker-compose", MIN_DOCKER_COMPOSE)
 def check_docker_compose() -> Tuple[bool, str]:
     """Verifica si Docker Compose está instalado y su versión."""
     success, output = run_command(["docker-compose", "--version"])
@@ -112,8 +193,8 @@ def check_docker_compose() -> Tuple[bool, str]:
         return False, "Docker Compose no está instalado"
     
     # Extraer la versión de la salida
-    version = output.split()[2].rstrip(',')
-    if version >= MIN_DOCKER_COMPOSE:
+    version = extract_version(output)
+    if version_tuple(version) >= version_tuple(MIN_DOCKER_COMPOSE):
         return True, f"Docker Compose {version} (>= {MIN_DOCKER_COMPOSE})"
     else:
         return False, f"Docker Compose {version} (se requiere >= {MIN_DOCKER_COMPOSE})"
@@ -137,29 +218,14 @@ def check_requirements() -> Dict[str, Tuple[bool, str]]:
         "email-validator": "email-validator (Validación de correos)",
     }
     
-    # Ejecutar pip list para obtener los paquetes instalados
-    success, output = run_command([sys.executable, "-m", "pip", "list", "--format=json"])
-    
-    if not success:
-        return {"error": (False, "No se pudo obtener la lista de paquetes instalados")}
-    
-    # Procesar la salida de pip
-    installed_packages = {}
-    try:
-        # Intentar con el formato JSON primero
-        packages = json.loads(output)
-        installed_packages = {pkg["name"].lower(): pkg["version"] for pkg in packages}
-    except json.JSONDecodeError:
-        # Fallback a formato legado
-        for line in output.split('\n'):
-            if not line.strip() or '---' in line:
-                continue
-                
-            parts = line.split()
-            if len(parts) >= 2:
-                pkg_name = parts[0].lower()
-                pkg_version = parts[1]
-                installed_packages[pkg_name] = pkg_version
+    # Leer los metadatos de los paquetes instalados en el propio intérprete, sin lanzar
+    # "pip list" en otro proceso. Los nombres se normalizan como en PEP 503
+    # (psycopg2_binary y psycopg2-binary son el mismo paquete)
+    installed_packages = {
+        re.sub(r"[-_.]+", "-", dist.metadata["Name"]).lower(): dist.version
+        for dist in distributions()
+        if dist.metadata["Name"]
+    }
     
     # Verificar paquetes requeridos
     results: Dict[str, Tuple[bool, str]] = {}
@@ -212,8 +278,26 @@ def check_environment_variables() -> Dict[str, Tuple[bool, str]]:
 
 def main():
     """Función principal."""
+    parser = argparse.ArgumentParser(description="Verifica la configuración del sistema y dependencias")
+    parser.add_argument("--no-cache", action="store_true",
+                        help=f"Ignorar los resultados guardados en {CACHE_FILE}")
+    args = parser.parse_args()
+    use_cache = not args.no_cache
+    
     print_header("VERIFICACIÓN DEL SISTEMA")
     
+    # Las comprobaciones lentas (subprocesos y conexión a la base de datos) son
+    # independientes: se lanzan todas a la vez y se muestran en el orden de siempre
+    executor = ThreadPoolExecutor(max_workers=5)
+    probes = {
+        "poetry": executor.submit(check_poetry, use_cache),
+        "docker": executor.submit(check_docker, use_cache),
+        "compose": executor.submit(check_docker_compose, use_cache),
+        "deps": executor.submit(check_requirements),
+        "db": executor.submit(check_database_connection),
+    }
+    executor.shutdown(wait=False)
+    
     # Verificar versión de Python
     print("\n1. Verificando versión de Python...")
     py_success, py_msg = check_python_version()
@@ -224,7 +308,7 @@ def main():
     
     # Verificar Poetry
     print("\n2. Verificando Poetry...")
-    poetry_success, poetry_msg = check_poetry()
+    poetry_success, poetry_msg = probes["poetry"].result()
     if poetry_success:
         print_success(poetry_msg)
     else:
@@ -232,7 +316,7 @@ def main():
     
     # Verificar Docker
     print("\n3. Verificando Docker...")
-    docker_success, docker_msg = check_docker()
+    docker_success, docker_msg = probes["docker"].result()
     if docker_success:
         print_success(docker_msg)
     else:
@@ -240,7 +324,7 @@ def main():
     
     # Verificar Docker Compose
     print("\n4. Verificando Docker Compose...")
-    compose_success, compose_msg = check_docker_compose()
+    compose_success, compose_msg = probes["compose"].result()
     if compose_success:
         print_success(compose_msg)
     else:
@@ -248,7 +332,7 @@ def main():
     
     # Verificar dependencias
     print("\n5. Verificando dependencias...")
-    deps = check_requirements()
+    deps = probes["deps"].result()
     
     if deps.get('error'):
         print_error(f"Error al verificar dependencias: {deps['error']}")
@@ -270,7 +354,7 @@ def main():
     
     # Verificar conexión a la base de datos
     print("\n7. Verificando conexión a la base de datos...")
-    db_success, db_msg = check_database_connection()
+    db_success, db_msg = probes["db"].result()
     if db_success:
         print_success(db_msg)
     else:
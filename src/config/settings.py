@@ -11,6 +11,8 @@ class Settings(BaseSettings):
     # Configuración de la API
     API_V1_STR: str = "/api/v1"
     PROJECT_NAME: str = "API Seguros"
+    # Features cuyos routers se registran, separadas por comas (p. ej. "clientes,polizas"); vacío = todas
+    ENABLED_FEATURES: str = os.getenv("ENABLED_FEATURES", "")
     
     # Configuración de seguridad
     SECRET_KEY: str = os.getenv("SECRET_KEY", "insecure_key_for_dev")
@@ -29,6 +31,12 @@ class Settings(BaseSettings):
     POSTGRES_DB: str = os.getenv("POSTGRES_DB", "api_seguros")
     POSTGRES_PORT: str = os.getenv("POSTGRES_PORT", "5432")
     SQLALCHEMY_DATABASE_URI: PostgresDsn | None = None
+    # Crear las tablas con Base.metadata.create_all al iniciar (solo desarrollo; en producción usar Alembic)
+    AUTO_CREATE_SCHEMA: bool = os.getenv("AUTO_CREATE_SCHEMA", "0") == "1"
+    # Conexiones a abrir por adelantado al iniciar (0 desactiva el precalentamiento del pool)
+    POOL_WARM_SIZE: int = int(os.getenv("POOL_WARM_SIZE", "5"))
+    # Log de SQLAlchemy: "1" registra las sentencias, "debug" también las filas (solo desarrollo)
+    DB_ECHO: str = os.getenv("DB_ECHO", "0")
     
     # Configuración de email
     SMTP_TLS: bool = True
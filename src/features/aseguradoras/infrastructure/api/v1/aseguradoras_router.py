@@ -23,10 +23,11 @@ from src.features.aseguradoras.domain.exceptions import (
 )
 from src.features.aseguradoras.infrastructure.repositories import SQLAlchemyAseguradoraRepository
 from src.infrastructure.database import get_db
+from src.infrastructure.routing import ETagRoute
 from src.infrastructure.security.dependencies import get_current_user, get_admin_user
 from src.features.usuarios.application.dtos import UsuarioDto
 
-router = APIRouter(prefix="/aseguradoras", tags=["aseguradoras"])
+router = APIRouter(prefix="/aseguradoras", tags=["aseguradoras"], route_class=ETagRoute)
 
 
 @router.post("/", response_model=AseguradoraResponse, status_code=status.HTTP_201_CREATED)
@@ -1,4 +1,3 @@
-import uuid
 from datetime import datetime
 
 from sqlalchemy import (
@@ -18,6 +17,7 @@ from sqlalchemy.orm import relationship
 # from src.features.tipos_documento.infrastructure.models import TipoDocumento as TipoDocumentoModel
 from src.infrastructure.database import Base
 from src.infrastructure.utils.datetime import get_utc_now
+from src.infrastructure.utils.identifiers import generate_uuid7
 
 
 class Cliente(Base):
@@ -29,7 +29,9 @@ class Cliente(Base):
     cliente_seq = Sequence("cliente_numero_seq")
 
     # Campos de identificación
-    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4, index=True)
+    # UUID v7 (ordenado por tiempo): evita divisiones de página aleatorias en los índices
+    # de clientes y clientes_corredores; la clave primaria ya indexa la columna
+    id = Column(UUID(as_uuid=True), primary_key=True, default=generate_uuid7)
     numero_cliente = Column(
         Integer,  # Cambiado de BigInteger a Integer
         Sequence("cliente_numero_seq"),
@@ -1,7 +1,7 @@
 from uuid import UUID
 
 from sqlalchemy import or_
-from sqlalchemy.orm import Session
+from sqlalchemy.orm import Session, lazyload
 
 from ..application.interfaces.repositories import IClienteRepository
 from ..domain.entities import Cliente as ClienteDomain
@@ -97,7 +97,8 @@ class SQLAlchemyClienteRepository(IClienteRepository):
         return self._map_to_domain(db_cliente) if db_cliente else None
 
     def get_all(self) -> list[ClienteDomain]:
-        db_clientes = self.session.query(ClienteModel).all()
+        # El mapeo a dominio solo usa columnas: evitamos cargar las relaciones "selectin" del modelo
+        db_clientes = self.session.query(ClienteModel).options(lazyload("*")).all()
         return [self._map_to_domain(db_cliente) for db_cliente in db_clientes]
 
     def update(self, cliente: ClienteDomain) -> ClienteDomain:
@@ -142,7 +143,7 @@ class SQLAlchemyClienteRepository(IClienteRepository):
             localidad: Filtrar por localidad
         """
         # Construir la consulta base
-        db_query = self.session.query(ClienteModel)
+        db_query = self.session.query(ClienteModel).options(lazyload("*"))
         
         # Aplicar filtros si se proporcionan
         if query:
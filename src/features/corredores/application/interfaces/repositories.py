@@ -141,6 +141,32 @@ class IClienteCorredorRepository(abc.ABC):
         """
         raise NotImplementedError
     
+    @abc.abstractmethod
+    def get_by_clientes(self, cliente_ids: list[UUID]) -> dict[UUID, list[ClienteCorredor]]:
+        """
+        Obtiene en una sola consulta las asignaciones de varios clientes.
+        
+        Args:
+            cliente_ids: IDs de los clientes
+            
+        Returns:
+            Diccionario cliente_id -> asignaciones; los clientes sin asignaciones no aparecen
+        """
+        raise NotImplementedError
+    
+    @abc.abstractmethod
+    def get_by_corredores(self, corredor_numeros: list[int]) -> dict[int, list[ClienteCorredor]]:
+        """
+        Obtiene en una sola consulta las asignaciones de varios corredores.
+        
+        Args:
+            corredor_numeros: Números de los corredores
+            
+        Returns:
+            Diccionario corredor_numero -> asignaciones; los corredores sin asignaciones no aparecen
+        """
+        raise NotImplementedError
+    
     @abc.abstractmethod
     def add(self, cliente_id: UUID, corredor_numero: int, fecha_asignacion: date) -> ClienteCorredor:
         """
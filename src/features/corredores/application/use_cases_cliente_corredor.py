@@ -208,6 +208,32 @@ class ListarClientesPorCorredorUseCase:
             )
             for asignacion in asignaciones
         ]
+    
+    def execute_many(self, corredor_numeros: list[int]) -> dict[int, list[ClienteCorredorDto]]:
+        """
+        Lista en una sola consulta los clientes asignados a varios corredores.
+        
+        Args:
+            corredor_numeros: Números de los corredores
+            
+        Returns:
+            Dict[int, List[ClienteCorredorDto]]: Asignaciones agrupadas por corredor_numero
+            
+        Note:
+            Las claves sin asignaciones no aparecen en el diccionario
+        """
+        asignaciones = self.cliente_corredor_repository.get_by_corredores(corredor_numeros)
+        return {
+            clave: [
+                ClienteCorredorDto(
+                    cliente_id=asignacion.cliente_id,
+                    corredor_numero=asignacion.corredor_numero,
+                    fecha_asignacion=asignacion.fecha_asignacion
+                )
+                for asignacion in lista
+            ]
+            for clave, lista in asignaciones.items()
+        }
 
 
 class ListarCorredoresPorClienteUseCase:
@@ -238,3 +264,29 @@ class ListarCorredoresPorClienteUseCase:
             )
             for asignacion in asignaciones
         ]
+    
+    def execute_many(self, cliente_ids: list[UUID]) -> dict[UUID, list[ClienteCorredorDto]]:
+        """
+        Lista en una sola consulta los corredores asignados a varios clientes.
+        
+        Args:
+            cliente_ids: IDs de los clientes
+            
+        Returns:
+            Dict[UUID, List[ClienteCorredorDto]]: Asignaciones agrupadas por cliente_id
+            
+        Note:
+            Las claves sin asignaciones no aparecen en el diccionario
+        """
+        asignaciones = self.cliente_corredor_repository.get_by_clientes(cliente_ids)
+        return {
+            clave: [
+                ClienteCorredorDto(
+                    cliente_id=asignacion.cliente_id,
+                    corredor_numero=asignacion.corredor_numero,
+                    fecha_asignacion=asignacion.fecha_asignacion
+                )
+                for asignacion in lista
+            ]
+            for clave, lista in asignaciones.items()
+        }
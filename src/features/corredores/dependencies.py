@@ -1,11 +1,13 @@
 """Módulo de dependencias para el módulo de corredores."""
 from collections.abc import Generator
+from uuid import UUID
 
 from fastapi import Depends
 from sqlalchemy.orm import Session
 
 from src.features.clientes.application.interfaces.repositories import IClienteRepository
 from src.features.clientes.infrastructure.repositories import SQLAlchemyClienteRepository
+from src.features.corredores.application.dtos_cliente_corredor import ClienteCorredorDto
 from src.features.corredores.application.interfaces import (
     IClienteCorredorRepository,
     ICorredorRepository,
@@ -14,6 +16,11 @@ from src.features.corredores.infrastructure.repositories import SQLAlchemyCorred
 from src.features.corredores.infrastructure.repositories_cliente_corredor import (
     SQLAlchemyClienteCorredorRepository,
 )
+from src.features.corredores.application.use_cases_cliente_corredor import (
+    ListarClientesPorCorredorUseCase,
+    ListarCorredoresPorClienteUseCase,
+)
+from src.infrastructure.batching import BatchLoader
 from src.infrastructure.database import SessionLocal
 
 
@@ -66,3 +73,40 @@ def get_cliente_corredor_repository(
         IClienteCorredorRepository: Implementación del repositorio de relaciones cliente-corredor
     """
     return SQLAlchemyClienteCorredorRepository(db)
+
+
+def _listar_clientes_por_corredores(corredor_numeros: list[int]) -> dict[int, list[ClienteCorredorDto]]:
+    """Resuelve un lote de corredores con una sesión propia y una sola consulta."""
+    with SessionLocal() as db:
+        use_case = ListarClientesPorCorredorUseCase(SQLAlchemyClienteCorredorRepository(db))
+        return use_case.execute_many(corredor_numeros)
+
+
+def _listar_corredores_por_clientes(cliente_ids: list[UUID]) -> dict[UUID, list[ClienteCorredorDto]]:
+    """Resuelve un lote de clientes con una sesión propia y una sola consulta."""
+    with SessionLocal() as db:
+        use_case = ListarCorredoresPorClienteUseCase(SQLAlchemyClienteCorredorRepository(db))
+        return use_case.execute_many(cliente_ids)
+
+
+# Compartidos entre peticiones para que las concurrentes caigan en el mismo lote
+_clientes_por_corredor_loader = BatchLoader(_listar_clientes_por_corredores, default_factory=list)
+_corredores_por_cliente_loader = BatchLoader(_listar_corredores_por_clientes, default_factory=list)
+
+
+def get_clientes_por_corredor_loader() -> BatchLoader[int, list[ClienteCorredorDto]]:
+    """Obtiene el cargador por lotes de clientes asignados a un corredor.
+    
+    Returns:
+        BatchLoader: Cargador compartido indexado por número de corredor
+    """
+    return _clientes_por_corredor_loader
+
+
+def get_corredores_por_cliente_loader() -> BatchLoader[UUID, list[ClienteCorredorDto]]:
+    """Obtiene el cargador por lotes de corredores asignados a un cliente.
+    
+    Returns:
+        BatchLoader: Cargador compartido indexado por ID de cliente
+    """
+    return _corredores_por_cliente_loader
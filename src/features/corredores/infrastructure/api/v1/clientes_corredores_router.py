@@ -10,14 +10,14 @@ from src.features.corredores.application.dtos_cliente_corredor import (
 from src.features.corredores.application.use_cases_cliente_corredor import (
     AsignarClienteCorredorUseCase,
     EliminarAsignacionClienteCorredorUseCase,
-    ListarClientesPorCorredorUseCase,
-    ListarCorredoresPorClienteUseCase,
     ReasignarClienteUseCase,
 )
 from src.features.corredores.dependencies import (
     get_cliente_corredor_repository,
     get_cliente_repository,
+    get_clientes_por_corredor_loader,
     get_corredor_repository,
+    get_corredores_por_cliente_loader,
 )
 from src.features.corredores.domain.exceptions import (
     ClienteCorredorAsignacionDuplicadaException,
@@ -27,6 +27,7 @@ from src.features.corredores.domain.exceptions import (
     FechaAsignacionInvalidaException,
 )
 from src.features.usuarios.application.dtos import UsuarioDto
+from src.infrastructure.batching import BatchLoader
 from src.infrastructure.security.dependencies import get_admin_user, get_current_user
 
 router = APIRouter(
@@ -210,25 +211,23 @@ async def eliminar_asignacion_cliente_corredor(
 )
 async def listar_clientes_por_corredor(
     corredor_numero: int,
-    cliente_corredor_repository=Depends(get_cliente_corredor_repository),
+    loader: BatchLoader[int, list[ClienteCorredorDto]] = Depends(get_clientes_por_corredor_loader),
     current_user: UsuarioDto = Depends(get_current_user)
 ) -> list[ClienteCorredorDto]:
     """Lista todos los clientes asignados a un corredor.
     
+    Las peticiones concurrentes se agrupan en una sola consulta ``IN (...)``.
+    
     Args:
         corredor_numero: Número del corredor
-        cliente_corredor_repository: Repositorio de relaciones cliente-corredor inyectado por dependencia
+        loader: Cargador por lotes de asignaciones inyectado por dependencia
         current_user: Usuario autenticado
         
     Returns:
         List[ClienteCorredorDto]: Lista de asignaciones de clientes al corredor
     """
-    use_case = ListarClientesPorCorredorUseCase(
-        cliente_corredor_repository=cliente_corredor_repository
-    )
-    
     try:
-        return use_case.execute(corredor_numero)
+        return await loader.load(corredor_numero)
     except Exception as e:
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
@@ -245,25 +244,23 @@ async def listar_clientes_por_corredor(
 )
 async def listar_corredores_por_cliente(
     cliente_id: UUID,
-    cliente_corredor_repository=Depends(get_cliente_corredor_repository),
+    loader: BatchLoader[UUID, list[ClienteCorredorDto]] = Depends(get_corredores_por_cliente_loader),
     current_user: UsuarioDto = Depends(get_current_user)
 ) -> list[ClienteCorredorDto]:
     """Lista todos los corredores asignados a un cliente.
     
+    Las peticiones concurrentes se agrupan en una sola consulta ``IN (...)``.
+    
     Args:
         cliente_id: ID del cliente
-        cliente_corredor_repository: Repositorio de relaciones cliente-corredor inyectado por dependencia
+        loader: Cargador por lotes de asignaciones inyectado por dependencia
         current_user: Usuario autenticado
         
     Returns:
         List[ClienteCorredorDto]: Lista de asignaciones de corredores al cliente
     """
-    use_case = ListarCorredoresPorClienteUseCase(
-        cliente_corredor_repository=cliente_corredor_repository
-    )
-    
     try:
-        return use_case.execute(cliente_id)
+        return await loader.load(cliente_id)
     except Exception as e:
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
@@ -1,9 +1,13 @@
+import logging
 from datetime import date
 
+from sqlalchemy.dialects.postgresql import insert
 from sqlalchemy.orm import Session
 
 from src.features.corredores.infrastructure.models import Corredor
 
+logger = logging.getLogger(__name__)
+
 
 def init_corredores(db: Session):
     """Inicializa los corredores predeterminados en la base de datos."""
@@ -21,7 +25,8 @@ def init_corredores(db: Session):
             "movil": "11-9876-5432",
             "mail": "juan.perez@ejemplo.com",
             "fecha_alta": date.today(),
-            "matricula": "MAT-001"
+            "matricula": "MAT-001",
+            "especializacion": None
         },
         {
             "numero": 2,
@@ -43,13 +48,14 @@ def init_corredores(db: Session):
     # Verificar si ya existen corredores
     existing_count = db.query(Corredor).count()
     if existing_count > 0:
-        print(f"Ya existen {existing_count} corredores en la base de datos. Omitiendo inicialización.")
+        logger.info(f"Ya existen {existing_count} corredores en la base de datos. Omitiendo inicialización.")
         return
     
-    # Crear los corredores
-    for corredor_data in corredores_default:
-        db_corredor = Corredor(**corredor_data)
-        db.add(db_corredor)
-    
+    # Crear los corredores con un único INSERT (todas las filas deben tener las mismas claves)
+    db.execute(
+        insert(Corredor)
+        .values(corredores_default)
+        .on_conflict_do_nothing(index_elements=["numero"])
+    )
     db.commit()
-    print(f"Se han inicializado {len(corredores_default)} corredores predeterminados.")
+    logger.info(f"Se han inicializado {len(corredores_default)} corredores predeterminados.")
@@ -4,6 +4,7 @@ from sqlalchemy import (
     Column,
     Date,
     ForeignKey,
+    Index,
     Integer,
     String,
     Text,  # Importar para constraint unico compuesto
@@ -27,6 +28,11 @@ class ClienteCorredor(Base):
     """Modelo SQLAlchemy para la tabla intermedia clientes_corredores."""
 
     __tablename__ = "clientes_corredores"
+    # Índices definidos en las migraciones de Alembic (ver migrations/versions)
+    __table_args__ = (
+        Index("ix_cc_cli_cor", "cliente_id", "corredor_numero", postgresql_include=["fecha_asignacion"]),
+        Index("ix_clientes_corredores_corredor_numero", "corredor_numero"),
+    )
 
     # Definimos la clave primaria compuesta usando los FKs
     cliente_id = Column(SQLAlchemyUUID(as_uuid=True), ForeignKey("clientes.id"), primary_key=True)
@@ -1,6 +1,6 @@
 
 from sqlalchemy import or_, desc, func
-from sqlalchemy.orm import Session
+from sqlalchemy.orm import Session, lazyload
 
 from ..application.interfaces.repositories import ICorredorRepository
 from ..domain.entities import Corredor as CorredorDomain, Corredor
@@ -169,7 +169,8 @@ class SQLAlchemyCorredorRepository(ICorredorRepository):
         Returns:
             Lista de tuplas con la entidad de dominio y el ID técnico
         """
-        db_corredores = self.session.query(CorredorModel).all()
+        # El mapeo a dominio solo usa columnas: evitamos cargar las relaciones "selectin" del modelo
+        db_corredores = self.session.query(CorredorModel).options(lazyload("*")).all()
         return [self._get_domain_with_id(db_corredor) for db_corredor in db_corredores]
 
     def update(self, corredor: CorredorDomain) -> tuple[CorredorDomain, int]:
@@ -202,7 +203,7 @@ class SQLAlchemyCorredorRepository(ICorredorRepository):
         Returns:
             Lista de tuplas con la entidad de dominio y el ID técnico
         """
-        db_query = self.session.query(CorredorModel)
+        db_query = self.session.query(CorredorModel).options(lazyload("*"))
         
         # Filtrar por estado activo/inactivo si se especifica
         if esta_activo is not None:
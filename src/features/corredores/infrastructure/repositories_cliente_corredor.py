@@ -129,6 +129,44 @@ class SQLAlchemyClienteCorredorRepository(IClienteCorredorRepository):
         
         return [self._to_entity(model) for model in models]
     
+    def get_by_clientes(self, cliente_ids: list[UUID]) -> dict[UUID, list[ClienteCorredorEntity]]:
+        """
+        Obtiene las asignaciones de varios clientes con un único ``WHERE cliente_id IN (...)``.
+        
+        Args:
+            cliente_ids: IDs de los clientes
+            
+        Returns:
+            Diccionario cliente_id -> lista de entidades ClienteCorredor
+        """
+        models = self.session.query(ClienteCorredorModel).filter(
+            ClienteCorredorModel.cliente_id.in_(cliente_ids)
+        ).all()
+        
+        asignaciones: dict[UUID, list[ClienteCorredorEntity]] = {}
+        for model in models:
+            asignaciones.setdefault(model.cliente_id, []).append(self._to_entity(model))
+        return asignaciones
+    
+    def get_by_corredores(self, corredor_numeros: list[int]) -> dict[int, list[ClienteCorredorEntity]]:
+        """
+        Obtiene las asignaciones de varios corredores con un único ``WHERE corredor_numero IN (...)``.
+        
+        Args:
+            corredor_numeros: Números de los corredores
+            
+        Returns:
+            Diccionario corredor_numero -> lista de entidades ClienteCorredor
+        """
+        models = self.session.query(ClienteCorredorModel).filter(
+            ClienteCorredorModel.corredor_numero.in_(corredor_numeros)
+        ).all()
+        
+        asignaciones: dict[int, list[ClienteCorredorEntity]] = {}
+        for model in models:
+            asignaciones.setdefault(model.corredor_numero, []).append(self._to_entity(model))
+        return asignaciones
+    
     def add(self, cliente_id: UUID, corredor_numero: int, fecha_asignacion: date) -> ClienteCorredorEntity:
         """
         Agrega una nueva asignación entre un cliente y un corredor.
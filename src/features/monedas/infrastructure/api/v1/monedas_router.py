@@ -11,11 +11,12 @@ from src.features.monedas.domain.exceptions import MonedaNotFoundException, Mone
 from src.features.monedas.infrastructure.repositories import SQLAlchemyMonedaRepository
 from src.domain.shared.exceptions import ValidationError
 from src.infrastructure.database import get_db
+from src.infrastructure.routing import ETagRoute
 from src.infrastructure.security.dependencies import get_current_user, get_admin_user
 from src.features.usuarios.application.dtos import UsuarioDto
 
 
-router = APIRouter(prefix="/monedas", tags=["Monedas"])
+router = APIRouter(prefix="/monedas", tags=["Monedas"], route_class=ETagRoute)
 
 
 # Dependencias para inyección
@@ -1,47 +1,34 @@
+import logging
+
+from sqlalchemy.dialects.postgresql import insert
 from sqlalchemy.orm import Session
 
-from src.features.monedas.domain.entities import Moneda
-from src.features.monedas.infrastructure.repositories import SQLAlchemyMonedaRepository
+from src.features.monedas.infrastructure.models import Moneda
+
+logger = logging.getLogger(__name__)
 
 
 def init_monedas(db: Session):
     """Inicializa las monedas por defecto si no existen."""
-    repository = SQLAlchemyMonedaRepository(db)
-    
     # Verificar si ya existen monedas
-    monedas = repository.get_all()
-    if monedas:
-        print("Ya existen monedas en la base de datos.")
+    if db.query(Moneda.id).first() is not None:
+        logger.info("Ya existen monedas en la base de datos.")
         return
     
-    # Crear monedas por defecto
+    # Monedas por defecto
     monedas_default = [
-        Moneda(
-            codigo="USD",
-            nombre="Dólar Estadounidense",
-            simbolo="$"
-        ),
-        Moneda(
-            codigo="EUR",
-            nombre="Euro",
-            simbolo="€"
-        ),
-        Moneda(
-            codigo="CLP",
-            nombre="Peso Chileno",
-            simbolo="$"
-        ),
-        Moneda(
-            codigo="ARS",
-            nombre="Peso Argentino",
-            simbolo="$"
-        )
+        {"codigo": "USD", "nombre": "Dólar Estadounidense", "simbolo": "$"},
+        {"codigo": "EUR", "nombre": "Euro", "simbolo": "€"},
+        {"codigo": "CLP", "nombre": "Peso Chileno", "simbolo": "$"},
+        {"codigo": "ARS", "nombre": "Peso Argentino", "simbolo": "$"}
     ]
     
-    # Guardar las monedas
-    for moneda in monedas_default:
-        try:
-            repository.add(moneda)
-            print(f"Moneda '{moneda.codigo}' creada correctamente.")
-        except Exception as e:
-            print(f"Error al crear moneda '{moneda.codigo}': {e}")
+    # Guardar todas las monedas con un único INSERT; ON CONFLICT evita
+    # errores si otro worker las insertó concurrentemente
+    db.execute(
+        insert(Moneda)
+        .values(monedas_default)
+        .on_conflict_do_nothing(index_elements=["codigo"])
+    )
+    db.commit()
+    logger.info(f"Se han inicializado {len(monedas_default)} monedas por defecto.")
@@ -11,6 +11,10 @@ from src.features.polizas.application.interfaces.repositories import AbstractPol
 from src.features.polizas.domain.entities import Poliza as PolizaEntity
 # Importamos el Modelo SQLAlchemy MovimientoVigencia
 from .models import MovimientoVigencia as MovimientoVigenciaModel
+from src.features.corredores.infrastructure.models import (
+    ClienteCorredor as ClienteCorredorModel,
+    Corredor as CorredorModel,
+)
 
 
 class SQLAlchemyPolizaRepository(AbstractPolizaRepository):
@@ -23,7 +27,11 @@ class SQLAlchemyPolizaRepository(AbstractPolizaRepository):
     def _get_base_query(self):
         return self.session.query(MovimientoVigenciaModel).options(
             joinedload(MovimientoVigenciaModel.cliente_rel),
-            joinedload(MovimientoVigenciaModel.corredor_rel),
+            # Corredor.to_entity recorre clientes_asociados -> cliente_rel; sin selectinload
+            # cada asociación dispararía su propia consulta (N+1)
+            joinedload(MovimientoVigenciaModel.corredor_rel)
+            .selectinload(CorredorModel.clientes_asociados)
+            .selectinload(ClienteCorredorModel.cliente_rel),
             joinedload(MovimientoVigenciaModel.tipo_seguro_rel),
             # joinedload(MovimientoVigenciaModel.moneda_rel)  # Comentado hasta que se implemente el modelo Moneda
         )
@@ -11,11 +11,12 @@ from src.features.tipos_documento.application.use_cases import (
 )
 from src.features.tipos_documento.infrastructure.repositories import SQLAlchemyTipoDocumentoRepository
 from src.infrastructure.database import get_db
+from src.infrastructure.routing import ETagRoute
 from src.infrastructure.security.dependencies import get_current_user, get_admin_user
 from src.features.usuarios.application.dtos import UsuarioDto
 
 
-router = APIRouter(prefix="/tipos-documento", tags=["Tipos de Documento"])
+router = APIRouter(prefix="/tipos-documento", tags=["Tipos de Documento"], route_class=ETagRoute)
 
 
 # Dependencias para inyección
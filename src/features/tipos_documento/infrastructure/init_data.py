@@ -1,48 +1,51 @@
+import logging
+
+from sqlalchemy.dialects.postgresql import insert
 from sqlalchemy.orm import Session
 
-from src.features.tipos_documento.domain.entities import TipoDocumento
-from src.features.tipos_documento.infrastructure.repositories import SQLAlchemyTipoDocumentoRepository
+from src.features.tipos_documento.infrastructure.models import TipoDocumento
+
+logger = logging.getLogger(__name__)
 
 
 def init_tipos_documento(db: Session):
     """Inicializa los tipos de documento por defecto si no existen."""
-    repository = SQLAlchemyTipoDocumentoRepository(db)
-    
     # Verificar si ya existe algún tipo de documento
-    tipos = repository.get_all()
-    if tipos:
-        print("Ya existen tipos de documento en la base de datos.")
+    if db.query(TipoDocumento.id).first() is not None:
+        logger.info("Ya existen tipos de documento en la base de datos.")
         return
     
-    # Crear tipos de documento por defecto
+    # Tipos de documento por defecto
     tipos_default = [
-        TipoDocumento(
-            codigo="DNI",
-            nombre="Documento Nacional de Identidad",
-            descripcion="Documento de identidad para ciudadanos",
-            es_default=True,
-            esta_activo=True
-        ),
-        TipoDocumento(
-            codigo="RUT",
-            nombre="Rol Único Tributario",
-            descripcion="Documento de identidad fiscal",
-            es_default=False,
-            esta_activo=True
-        ),
-        TipoDocumento(
-            codigo="PASAPORTE",
-            nombre="Pasaporte",
-            descripcion="Documento de viaje internacional",
-            es_default=False,
-            esta_activo=True
-        )
+        {
+            "codigo": "DNI",
+            "nombre": "Documento Nacional de Identidad",
+            "descripcion": "Documento de identidad para ciudadanos",
+            "es_default": True,
+            "esta_activo": True
+        },
+        {
+            "codigo": "RUT",
+            "nombre": "Rol Único Tributario",
+            "descripcion": "Documento de identidad fiscal",
+            "es_default": False,
+            "esta_activo": True
+        },
+        {
+            "codigo": "PASAPORTE",
+            "nombre": "Pasaporte",
+            "descripcion": "Documento de viaje internacional",
+            "es_default": False,
+            "esta_activo": True
+        }
     ]
     
-    # Guardar los tipos de documento
-    for tipo in tipos_default:
-        try:
-            repository.add(tipo)
-            print(f"Tipo de documento '{tipo.codigo}' creado correctamente.")
-        except Exception as e:
-            print(f"Error al crear tipo de documento '{tipo.codigo}': {e}")
+    # Guardar todos los tipos de documento con un único INSERT; ON CONFLICT evita
+    # errores si otro worker los insertó concurrentemente
+    db.execute(
+        insert(TipoDocumento)
+        .values(tipos_default)
+        .on_conflict_do_nothing(index_elements=["codigo"])
+    )
+    db.commit()
+    logger.info(f"Se han inicializado {len(tipos_default)} tipos de documento por defecto.")
@@ -5,6 +5,7 @@ from sqlalchemy.orm import Session
 
 # Importamos la dependencia de base de datos
 from src.infrastructure.database import get_db
+from src.infrastructure.routing import ETagRoute
 
 # Importamos los DTOs
 from src.features.tipos_seguros.application.dtos import (
@@ -34,7 +35,7 @@ from src.infrastructure.security.dependencies import get_current_user, get_admin
 from src.features.usuarios.application.dtos import UsuarioDto
 
 # Creamos el router
-router = APIRouter(prefix="/tipos-seguro", tags=["Tipos de Seguro"])
+router = APIRouter(prefix="/tipos-seguro", tags=["Tipos de Seguro"], route_class=ETagRoute)
 
 
 @router.post("/", response_model=TipoSeguroDto, status_code=status.HTTP_201_CREATED)
@@ -3,7 +3,7 @@ from datetime import datetime
 from typing import List, Optional
 
 # Importamos la Entidad de Dominio Usuario
-from features.usuarios.domain.entities import Usuario as UsuarioEntity
+from src.features.usuarios.domain.entities import Usuario as UsuarioEntity
 
 
 class AbstractUsuarioRepository(abc.ABC):
@@ -0,0 +1,73 @@
+import asyncio
+from collections.abc import Callable, Hashable
+from typing import Generic, TypeVar
+
+K = TypeVar("K", bound=Hashable)
+V = TypeVar("V")
+
+
+class BatchLoader(Generic[K, V]):
+    """Agrupa en una sola consulta las búsquedas por clave concurrentes (patrón dataloader).
+
+    Cada ``load(key)`` deja un futuro pendiente; al final de la iteración actual del
+    event loop las claves acumuladas se resuelven con una única llamada a
+    ``batch_fn`` ejecutada en un hilo, para no bloquear el loop con la sesión síncrona.
+    Mientras un lote está en curso, las nuevas claves esperan y salen juntas en el
+    siguiente, de modo que el tamaño del lote crece con la carga.
+
+    Args:
+        batch_fn: Función síncrona que recibe las claves y devuelve un diccionario clave -> valor
+        default_factory: Genera el valor para las claves ausentes en el resultado
+    """
+
+    def __init__(
+        self,
+        batch_fn: Callable[[list[K]], dict[K, V]],
+        default_factory: Callable[[], V],
+    ) -> None:
+        self._batch_fn = batch_fn
+        self._default_factory = default_factory
+        self._pending: dict[K, list[asyncio.Future[V]]] = {}
+        self._busy = False
+        self._loop: asyncio.AbstractEventLoop | None = None
+        # Referencia a la tarea en curso para que no la recolecte el GC
+        self._task: asyncio.Task[None] | None = None
+
+    async def load(self, key: K) -> V:
+        """Devuelve el valor de ``key`` resolviéndolo junto con las demás claves del lote."""
+        loop = asyncio.get_running_loop()
+        if loop is not self._loop:
+            # Un loop nuevo (p. ej. otro worker o cliente de pruebas) empieza sin estado
+            self._loop, self._pending, self._busy = loop, {}, False
+        future: asyncio.Future[V] = loop.create_future()
+        self._pending.setdefault(key, []).append(future)
+        if not self._busy:
+            self._busy = True
+            loop.call_soon(self._dispatch)
+        return await future
+
+    def _dispatch(self) -> None:
+        """Toma las claves pendientes y lanza su resolución en segundo plano."""
+        pending, self._pending = self._pending, {}
+        self._task = asyncio.get_running_loop().create_task(self._run(pending))
+
+    async def _run(self, pending: dict[K, list[asyncio.Future[V]]]) -> None:
+        try:
+            results = await asyncio.to_thread(self._batch_fn, list(pending))
+        except Exception as exc:
+            for futures in pending.values():
+                for future in futures:
+                    if not future.done():
+                        future.set_exception(exc)
+        else:
+            for key, futures in pending.items():
+                value = results[key] if key in results else self._default_factory()
+                for future in futures:
+                    if not future.done():
+                        future.set_result(value)
+        finally:
+            # Las claves que llegaron durante la consulta forman el siguiente lote
+            if self._pending:
+                self._dispatch()
+            else:
+                self._busy = False
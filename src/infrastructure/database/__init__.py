@@ -1,14 +1,31 @@
+from concurrent.futures import ThreadPoolExecutor
+
 from sqlalchemy import create_engine
 from sqlalchemy.orm import sessionmaker
 
 from src.config.settings import settings
 from src.infrastructure.database.base import Base  # Re-exportar Base para que otros módulos puedan importarlo desde aquí
 
-__all__ = ['Base', 'get_db', 'SessionLocal', 'engine']
+__all__ = ['Base', 'get_db', 'SessionLocal', 'engine', 'warm_up_pool']
 
 # Crear el motor de SQLAlchemy
+# query_cache_size: caché de sentencias SQL compiladas (por defecto 500); con DB_ECHO=debug
+# los logs muestran "[cached since ...]" o "[no key]" para verificar que la caché se usa.
+# Sin pool_pre_ping: en lugar de un "SELECT 1" por checkout, las conexiones muertas se
+# detectan con keepalives TCP de libpq (~60 s: 30 s inactiva + 3 sondas cada 10 s) y
+# pool_recycle las renueva cada 30 minutos, antes de que un firewall/NAT las corte.
 engine = create_engine(
-    f"postgresql://{settings.POSTGRES_USER}:{settings.POSTGRES_PASSWORD}@{settings.POSTGRES_SERVER}:{settings.POSTGRES_PORT}/{settings.POSTGRES_DB}"
+    f"postgresql://{settings.POSTGRES_USER}:{settings.POSTGRES_PASSWORD}@{settings.POSTGRES_SERVER}:{settings.POSTGRES_PORT}/{settings.POSTGRES_DB}",
+    query_cache_size=1200,
+    pool_pre_ping=False,
+    pool_recycle=1800,
+    connect_args={
+        "keepalives": 1,
+        "keepalives_idle": 30,
+        "keepalives_interval": 10,
+        "keepalives_count": 3,
+    },
+    echo="debug" if settings.DB_ECHO == "debug" else settings.DB_ECHO == "1",
 )
 
 # Crear una clase de sesión local
@@ -22,3 +39,24 @@ def get_db():
         yield db
     finally:
         db.close()
+
+
+def warm_up_pool(size: int) -> None:
+    """Abre `size` conexiones en paralelo y las devuelve al pool.
+
+    Así las primeras peticiones HTTP no pagan el handshake TCP/autenticación
+    con PostgreSQL al obtener una conexión.
+    """
+    if size <= 0:
+        return
+
+    with ThreadPoolExecutor(max_workers=size) as executor:
+        futures = [executor.submit(engine.connect) for _ in range(size)]
+
+    # Devolver al pool las conexiones abiertas aunque alguna haya fallado
+    errors = [f.exception() for f in futures if f.exception() is not None]
+    for future in futures:
+        if future.exception() is None:
+            future.result().close()
+    if errors:
+        raise errors[0]
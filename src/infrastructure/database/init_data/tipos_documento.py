@@ -1,7 +1,12 @@
+import logging
+
+from sqlalchemy.dialects.postgresql import insert
 from sqlalchemy.orm import Session
 
 from src.features.tipos_documento.infrastructure.models import TipoDocumento
 
+logger = logging.getLogger(__name__)
+
 
 def init_tipos_documento(db: Session):
     """Inicializa los tipos de documento predeterminados en la base de datos."""
@@ -17,13 +22,14 @@ def init_tipos_documento(db: Session):
     # Verificar si ya existen tipos de documento
     existing_count = db.query(TipoDocumento).count()
     if existing_count > 0:
-        print(f"Ya existen {existing_count} tipos de documento en la base de datos. Omitiendo inicialización.")
+        logger.info(f"Ya existen {existing_count} tipos de documento en la base de datos. Omitiendo inicialización.")
         return
     
-    # Crear los tipos de documento
-    for tipo_doc in tipos_documento_default:
-        db_tipo_doc = TipoDocumento(**tipo_doc)
-        db.add(db_tipo_doc)
-    
+    # Crear los tipos de documento con un único INSERT
+    db.execute(
+        insert(TipoDocumento)
+        .values([{"es_default": False, **tipo_doc} for tipo_doc in tipos_documento_default])
+        .on_conflict_do_nothing(index_elements=["codigo"])
+    )
     db.commit()
-    print(f"Se han inicializado {len(tipos_documento_default)} tipos de documento predeterminados.")
+    logger.info(f"Se han inicializado {len(tipos_documento_default)} tipos de documento predeterminados.")
@@ -1,8 +1,12 @@
+import logging
+
 from sqlalchemy.orm import Session
 
 from src.features.usuarios.infrastructure.models import Usuario as UsuarioModel
 from src.infrastructure.security.password import Argon2PasswordHelper
 
+logger = logging.getLogger(__name__)
+
 
 def init_usuarios(db: Session) -> None:
     """Inicializa usuarios por defecto si no existen."""
@@ -10,10 +14,10 @@ def init_usuarios(db: Session) -> None:
         # Verificar si el usuario administrador ya existe
         admin = db.query(UsuarioModel).filter(UsuarioModel.username == "rponce").first()
         if admin:
-            print("El usuario administrador ya existe en la base de datos.")
+            logger.info("El usuario administrador ya existe en la base de datos.")
             return
 
-        print("Creando usuario administrador...")
+        logger.info("Creando usuario administrador...")
         # Crear el usuario administrador
         password_helper = Argon2PasswordHelper()
         hashed_password = password_helper.hash_password("Gallinal2218**")
@@ -36,9 +40,9 @@ def init_usuarios(db: Session) -> None:
         # Guardar en la base de datos
         db.add(db_admin)
         db.commit()
-        print("Usuario administrador creado con éxito.")
+        logger.info("Usuario administrador creado con éxito.")
         
     except Exception as e:
         db.rollback()
-        print(f"Error al crear usuario administrador: {str(e)}")
+        logger.error(f"Error al crear usuario administrador: {str(e)}")
         raise
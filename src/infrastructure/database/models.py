@@ -0,0 +1,16 @@
+"""Registro de todos los modelos SQLAlchemy de la aplicación.
+
+Las relaciones se declaran por nombre de clase (``relationship("Cliente")``) y SQLAlchemy
+las resuelve al configurar los mappers, así que todos los modelos deben estar importados
+antes de la primera consulta o de ``Base.metadata.create_all``. Los routers se cargan
+según ``ENABLED_FEATURES`` y no garantizan que eso ocurra; importar este módulo sí.
+"""
+import src.features.aseguradoras.infrastructure.models  # noqa: F401
+import src.features.clientes.infrastructure.models  # noqa: F401
+import src.features.corredores.infrastructure.models  # noqa: F401
+import src.features.monedas.infrastructure.models  # noqa: F401
+import src.features.polizas.infrastructure.models  # noqa: F401
+import src.features.sustituciones_corredores.infrastructure.models  # noqa: F401
+import src.features.tipos_documento.infrastructure.models  # noqa: F401
+import src.features.tipos_seguros.infrastructure.models  # noqa: F401
+import src.features.usuarios.infrastructure.models  # noqa: F401
@@ -0,0 +1,28 @@
+import logging
+import queue
+from logging.handlers import QueueHandler, QueueListener
+
+from src.config.settings import settings
+
+
+def setup_logging() -> QueueListener:
+    """Configura el logger raíz para escribir a través de una cola.
+    
+    El handler del logger raíz solo encola los registros, de modo que el event loop
+    nunca espera a que se escriba en stdout; un hilo del QueueListener se encarga
+    de formatearlos y escribirlos.
+    
+    Returns:
+        QueueListener: Listener sin iniciar; debe iniciarse con start() y detenerse
+        con stop() para vaciar la cola al cerrar la aplicación.
+    """
+    log_queue: queue.Queue = queue.Queue(-1)
+    
+    stream_handler = logging.StreamHandler()
+    stream_handler.setFormatter(logging.Formatter(settings.LOG_FORMAT, settings.LOG_DATEFORMAT))
+    
+    root_logger = logging.getLogger()
+    root_logger.handlers = [QueueHandler(log_queue)]
+    root_logger.setLevel(settings.LOG_LEVEL)
+    
+    return QueueListener(log_queue, stream_handler, respect_handler_level=True)
@@ -0,0 +1,138 @@
+import logging
+from collections.abc import Sequence
+
+import orjson
+from fastapi import status
+from fastapi.exceptions import RequestValidationError
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from src.domain.shared.exceptions import APIError
+
+logger = logging.getLogger(__name__)
+
+ALL_METHODS = ("DELETE", "GET", "HEAD", "OPTIONS", "PATCH", "POST", "PUT")
+_ALL_METHODS_BYTES = frozenset(method.encode() for method in ALL_METHODS)
+_JSON_HEADERS = [(b"content-type", b"application/json")]
+
+
+class CORSExceptionMiddleware:
+    """Middleware ASGI puro que aplica CORS y convierte excepciones en respuestas JSON.
+
+    Reúne en una sola capa lo que hacían ``CORSMiddleware`` y el manejador de
+    excepciones, evitando un salto de middleware por petición. Equivale a
+    ``CORSMiddleware`` con ``allow_methods=["*"]``, ``allow_headers=["*"]`` y
+    ``allow_credentials=True``. Sin ``allow_origins`` solo maneja excepciones.
+
+    Los orígenes y las cabeceras fijas se codifican a bytes una sola vez, de modo
+    que por petición solo se compara el Origin crudo contra un ``frozenset``.
+    """
+
+    def __init__(self, app: ASGIApp, allow_origins: Sequence[str] = (), max_age: int = 600) -> None:
+        self.app = app
+        self.allow_origins = frozenset(origin.encode("latin-1") for origin in allow_origins)
+        self.preflight_headers = [
+            (b"vary", b"Origin"),
+            (b"access-control-allow-methods", ", ".join(ALL_METHODS).encode()),
+            (b"access-control-max-age", str(max_age).encode()),
+            (b"access-control-allow-credentials", b"true"),
+            (b"content-type", b"text/plain; charset=utf-8"),
+        ]
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        origin = None
+        if self.allow_origins:
+            requested_method = requested_headers = None
+            for name, value in scope["headers"]:
+                if name == b"origin":
+                    origin = value
+                elif name == b"access-control-request-method":
+                    requested_method = value
+                elif name == b"access-control-request-headers":
+                    requested_headers = value
+            if origin is not None and requested_method is not None and scope["method"] == "OPTIONS":
+                await self._preflight_response(origin, requested_method, requested_headers, send)
+                return
+
+        response_started = False
+
+        async def send_wrapper(message: Message) -> None:
+            nonlocal response_started
+            if message["type"] == "http.response.start":
+                response_started = True
+                if origin is not None:
+                    self._add_cors_headers(message, origin)
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        except Exception as e:
+            # Si la respuesta ya comenzó a enviarse no podemos reemplazarla
+            if response_started:
+                raise
+            status_code, content = _build_error(e)
+            await send_wrapper(
+                {
+                    "type": "http.response.start",
+                    "status": status_code,
+                    "headers": list(_JSON_HEADERS),
+                }
+            )
+            await send_wrapper(
+                {"type": "http.response.body", "body": orjson.dumps(content, default=str)}
+            )
+
+    def _add_cors_headers(self, message: Message, origin: bytes) -> None:
+        """Agrega las cabeceras CORS a la respuesta de una petición con Origin."""
+        headers = message["headers"] = list(message.get("headers", ()))
+        headers.append((b"access-control-allow-credentials", b"true"))
+        if origin not in self.allow_origins:
+            return
+
+        headers.append((b"access-control-allow-origin", origin))
+        for index, (name, value) in enumerate(headers):
+            if name == b"vary":
+                headers[index] = (name, value + b", Origin")
+                break
+        else:
+            headers.append((b"vary", b"Origin"))
+
+    async def _preflight_response(
+        self, origin: bytes, requested_method: bytes, requested_headers: bytes | None, send: Send
+    ) -> None:
+        """Responde una petición preflight (OPTIONS) sin llegar a la aplicación."""
+        headers = self.preflight_headers.copy()
+        failures = []
+        if origin in self.allow_origins:
+            headers.append((b"access-control-allow-origin", origin))
+        else:
+            failures.append("origin")
+        if requested_method not in _ALL_METHODS_BYTES:
+            failures.append("method")
+        # Se permiten todas las cabeceras: se devuelven las solicitadas
+        if requested_headers is not None:
+            headers.append((b"access-control-allow-headers", requested_headers))
+
+        if failures:
+            status_code, body = 400, f"Disallowed CORS {', '.join(failures)}".encode()
+        else:
+            status_code, body = 200, b"OK"
+        headers.append((b"content-length", str(len(body)).encode()))
+        await send({"type": "http.response.start", "status": status_code, "headers": headers})
+        await send({"type": "http.response.body", "body": body})
+
+
+def _build_error(exc: Exception) -> tuple[int, dict]:
+    """Traduce una excepción al código de estado y cuerpo JSON de la respuesta."""
+    if isinstance(exc, APIError):
+        return exc.status_code, {"message": exc.message}
+    if isinstance(exc, RequestValidationError):
+        return status.HTTP_422_UNPROCESSABLE_ENTITY, {
+            "message": "Error de validación",
+            "errors": exc.errors(),
+        }
+    logger.exception("Error inesperado", exc_info=exc)
+    return status.HTTP_500_INTERNAL_SERVER_ERROR, {"message": "Error interno del servidor"}
@@ -0,0 +1,51 @@
+import hashlib
+from collections.abc import Callable, Coroutine
+from typing import Any
+
+from fastapi import Request, Response
+from fastapi.routing import APIRoute
+
+
+class ETagRoute(APIRoute):
+    """Ruta que agrega ETag a las respuestas GET y responde 304 si el cliente ya tiene esa versión.
+
+    Pensada para catálogos que cambian poco (monedas, tipos de documento, etc.): el
+    cliente revalida con If-None-Match y, si nada cambió, recibe un 304 sin cuerpo.
+    Se usa con ``APIRouter(route_class=ETagRoute)``.
+    """
+
+    def get_route_handler(self) -> Callable[[Request], Coroutine[Any, Any, Response]]:
+        route_handler = super().get_route_handler()
+
+        async def etag_route_handler(request: Request) -> Response:
+            response = await route_handler(request)
+            # Las respuestas en streaming no tienen body y no se pueden etiquetar
+            if (
+                request.method != "GET"
+                or response.status_code != 200
+                or not hasattr(response, "body")
+            ):
+                return response
+
+            etag = f'"{hashlib.blake2b(response.body, digest_size=16).hexdigest()}"'
+            # Las respuestas dependen del usuario autenticado: solo caché privada y con revalidación
+            cache_control = response.headers.get("cache-control", "private, no-cache")
+            if _etag_matches(request.headers.get("if-none-match"), etag):
+                return Response(
+                    status_code=304, headers={"ETag": etag, "Cache-Control": cache_control}
+                )
+
+            response.headers["ETag"] = etag
+            response.headers["Cache-Control"] = cache_control
+            return response
+
+        return etag_route_handler
+
+
+def _etag_matches(if_none_match: str | None, etag: str) -> bool:
+    """Indica si la cabecera If-None-Match incluye el ETag (comparación débil, RFC 9110)."""
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    return any(tag.strip().removeprefix("W/") == etag for tag in if_none_match.split(","))
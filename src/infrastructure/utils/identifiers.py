@@ -0,0 +1,20 @@
+import os
+import time
+from uuid import UUID
+
+
+def generate_uuid7() -> UUID:
+    """Genera un UUID versión 7 (RFC 9562), ordenado por tiempo.
+    
+    Los 48 bits más significativos son el timestamp Unix en milisegundos, por lo que
+    los identificadores nuevos se insertan al final de los índices B-tree en lugar de
+    en posiciones aleatorias como ocurre con uuid4.
+    
+    Returns:
+        UUID: Identificador único ordenado por tiempo de creación.
+    """
+    timestamp_ms = time.time_ns() // 1_000_000
+    value = (timestamp_ms & 0xFFFF_FFFF_FFFF) << 80 | int.from_bytes(os.urandom(10), "big")
+    value = (value & ~(0xF << 76)) | (0x7 << 76)  # Versión 7
+    value = (value & ~(0x3 << 62)) | (0x2 << 62)  # Variante RFC 4122
+    return UUID(int=value)
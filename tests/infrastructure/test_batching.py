@@ -0,0 +1,44 @@
+import asyncio
+
+from src.infrastructure.batching import BatchLoader
+
+
+class TestBatchLoader:
+    """Pruebas para el cargador por lotes."""
+
+    def test_agrupa_claves_concurrentes(self):
+        """Prueba que las cargas concurrentes se resuelvan con una sola llamada."""
+        llamadas = []
+
+        def batch_fn(claves):
+            llamadas.append(sorted(claves))
+            return {clave: [clave * 10] for clave in claves if clave != 3}
+
+        async def escenario():
+            loader = BatchLoader(batch_fn, default_factory=list)
+            return await asyncio.gather(*(loader.load(clave) for clave in (1, 2, 2, 3)))
+
+        resultados = asyncio.run(escenario())
+
+        assert llamadas == [[1, 2, 3]]
+        assert resultados == [[10], [20], [20], []]
+
+    def test_propaga_errores_a_todas_las_cargas(self):
+        """Prueba que un fallo del lote llegue a todas las peticiones que esperaban."""
+        def batch_fn(claves):
+            raise RuntimeError("sin conexión")
+
+        async def escenario():
+            loader = BatchLoader(batch_fn, default_factory=list)
+            return await asyncio.gather(loader.load(1), loader.load(2), return_exceptions=True)
+
+        resultados = asyncio.run(escenario())
+
+        assert all(isinstance(r, RuntimeError) for r in resultados)
+
+    def test_reutilizable_en_otro_loop(self):
+        """Prueba que el mismo cargador funcione al cambiar de event loop."""
+        loader = BatchLoader(lambda claves: {clave: clave for clave in claves}, default_factory=int)
+
+        assert asyncio.run(loader.load(5)) == 5
+        assert asyncio.run(loader.load(7)) == 7
@@ -0,0 +1,27 @@
+from sqlalchemy import create_engine
+from sqlalchemy.pool import QueuePool
+
+import src.infrastructure.database as database
+
+
+class TestWarmUpPool:
+    """Pruebas para el precalentamiento del pool de conexiones."""
+
+    def test_abre_y_devuelve_conexiones(self, tmp_path, monkeypatch):
+        """Prueba que las conexiones abiertas queden disponibles en el pool."""
+        engine = create_engine(f"sqlite:///{tmp_path / 'test.db'}", poolclass=QueuePool, pool_size=3)
+        monkeypatch.setattr(database, "engine", engine)
+
+        database.warm_up_pool(3)
+
+        assert engine.pool.checkedin() == 3
+        assert engine.pool.checkedout() == 0
+
+    def test_tamano_cero_no_abre_conexiones(self, tmp_path, monkeypatch):
+        """Prueba que un tamano 0 desactive el precalentamiento."""
+        engine = create_engine(f"sqlite:///{tmp_path / 'test.db'}", poolclass=QueuePool, pool_size=3)
+        monkeypatch.setattr(database, "engine", engine)
+
+        database.warm_up_pool(0)
+
+        assert engine.pool.checkedin() == 0
@@ -0,0 +1,37 @@
+import logging
+from logging.handlers import QueueHandler
+
+import pytest
+
+from src.infrastructure.logging_config import setup_logging
+
+
+@pytest.fixture
+def restore_root_logger():
+    """Fixture que restaura los handlers y el nivel del logger raiz tras la prueba."""
+    root_logger = logging.getLogger()
+    handlers, level = root_logger.handlers[:], root_logger.level
+    yield
+    root_logger.handlers, root_logger.level = handlers, level
+
+
+class TestSetupLogging:
+    """Pruebas para la configuracion del logging basado en cola."""
+
+    def test_logger_raiz_usa_queue_handler(self, restore_root_logger):
+        """Prueba que el logger raiz solo tenga un QueueHandler."""
+        setup_logging()
+
+        handlers = logging.getLogger().handlers
+        assert len(handlers) == 1
+        assert isinstance(handlers[0], QueueHandler)
+
+    def test_listener_escribe_los_registros(self, restore_root_logger, capsys):
+        """Prueba que el listener escriba los registros encolados al detenerse."""
+        listener = setup_logging()
+        listener.start()
+
+        logging.getLogger("test").warning("Mensaje de prueba")
+        listener.stop()
+
+        assert "Mensaje de prueba" in capsys.readouterr().err
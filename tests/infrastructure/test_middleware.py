@@ -0,0 +1,109 @@
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from src.domain.shared.exceptions import NotFoundError
+from src.infrastructure.middleware import CORSExceptionMiddleware
+
+ORIGEN_PERMITIDO = "http://localhost:5173"
+
+
+@pytest.fixture
+def client():
+    """Fixture que devuelve un cliente de prueba con el middleware de CORS y excepciones."""
+    app = FastAPI()
+    app.add_middleware(CORSExceptionMiddleware, allow_origins=[ORIGEN_PERMITIDO])
+
+    @app.get("/ok")
+    async def ok_endpoint():
+        return {"status": "ok"}
+
+    @app.get("/not-found")
+    async def not_found_endpoint():
+        raise NotFoundError(resource="Test")
+
+    @app.get("/unexpected-error")
+    async def unexpected_error_endpoint():
+        raise ValueError("Error inesperado")
+
+    return TestClient(app, raise_server_exceptions=False)
+
+
+class TestCORSExceptionMiddlewareErrores:
+    """Pruebas para el manejo de excepciones del middleware."""
+
+    def test_respuesta_normal(self, client):
+        """Prueba que las respuestas sin errores pasen sin modificaciones."""
+        response = client.get("/ok")
+
+        assert response.status_code == 200
+        assert response.json() == {"status": "ok"}
+        assert "access-control-allow-origin" not in response.headers
+
+    def test_api_error(self, client):
+        """Prueba que APIError se traduzca a su codigo de estado y mensaje."""
+        response = client.get("/not-found")
+
+        assert response.status_code == 404
+        assert response.headers["content-type"] == "application/json"
+        assert response.json() == {"message": "Test no encontrado"}
+
+    def test_unexpected_error(self, client):
+        """Prueba que las excepciones no controladas devuelvan un 500 generico."""
+        response = client.get("/unexpected-error")
+
+        assert response.status_code == 500
+        assert response.json() == {"message": "Error interno del servidor"}
+
+
+class TestCORSExceptionMiddlewareCORS:
+    """Pruebas para el manejo de CORS del middleware."""
+
+    def test_origen_permitido(self, client):
+        """Prueba que se devuelva el origen permitido junto con Vary: Origin."""
+        response = client.get("/ok", headers={"Origin": ORIGEN_PERMITIDO})
+
+        assert response.headers["access-control-allow-origin"] == ORIGEN_PERMITIDO
+        assert response.headers["access-control-allow-credentials"] == "true"
+        assert response.headers["vary"] == "Origin"
+
+    def test_origen_no_permitido(self, client):
+        """Prueba que un origen no permitido no reciba Access-Control-Allow-Origin."""
+        response = client.get("/ok", headers={"Origin": "http://malicioso.com"})
+
+        assert response.status_code == 200
+        assert "access-control-allow-origin" not in response.headers
+
+    def test_errores_con_cabeceras_cors(self, client):
+        """Prueba que las respuestas de error tambien incluyan las cabeceras CORS."""
+        response = client.get("/unexpected-error", headers={"Origin": ORIGEN_PERMITIDO})
+
+        assert response.status_code == 500
+        assert response.headers["access-control-allow-origin"] == ORIGEN_PERMITIDO
+
+    def test_preflight_permitido(self, client):
+        """Prueba que el preflight de un origen permitido responda 200 con las cabeceras CORS."""
+        response = client.options(
+            "/ok",
+            headers={
+                "Origin": ORIGEN_PERMITIDO,
+                "Access-Control-Request-Method": "POST",
+                "Access-Control-Request-Headers": "authorization, content-type",
+            },
+        )
+
+        assert response.status_code == 200
+        assert response.text == "OK"
+        assert response.headers["access-control-allow-origin"] == ORIGEN_PERMITIDO
+        assert response.headers["access-control-allow-headers"] == "authorization, content-type"
+        assert "POST" in response.headers["access-control-allow-methods"]
+
+    def test_preflight_origen_no_permitido(self, client):
+        """Prueba que el preflight de un origen no permitido responda 400."""
+        response = client.options(
+            "/ok",
+            headers={"Origin": "http://malicioso.com", "Access-Control-Request-Method": "GET"},
+        )
+
+        assert response.status_code == 400
+        assert response.text == "Disallowed CORS origin"
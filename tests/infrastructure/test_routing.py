@@ -0,0 +1,59 @@
+import pytest
+from fastapi import APIRouter, FastAPI
+from fastapi.testclient import TestClient
+
+from src.infrastructure.routing import ETagRoute
+
+
+@pytest.fixture
+def client():
+    """Fixture que devuelve un cliente de prueba con un router que usa ETagRoute."""
+    router = APIRouter(route_class=ETagRoute)
+
+    @router.get("/items")
+    async def listar_items():
+        return [{"id": 1, "nombre": "Peso"}]
+
+    @router.post("/items")
+    async def crear_item():
+        return {"id": 2}
+
+    app = FastAPI()
+    app.include_router(router)
+    return TestClient(app)
+
+
+class TestETagRoute:
+    """Pruebas para la ruta con ETag y revalidación condicional."""
+
+    def test_get_agrega_etag(self, client):
+        """Prueba que las respuestas GET lleven ETag y caché privada."""
+        response = client.get("/items")
+
+        assert response.status_code == 200
+        assert response.headers["etag"].startswith('"')
+        assert response.headers["cache-control"] == "private, no-cache"
+
+    def test_if_none_match_devuelve_304(self, client):
+        """Prueba que un ETag vigente produzca un 304 sin cuerpo."""
+        etag = client.get("/items").headers["etag"]
+
+        response = client.get("/items", headers={"If-None-Match": f"W/{etag}"})
+
+        assert response.status_code == 304
+        assert response.content == b""
+        assert response.headers["etag"] == etag
+
+    def test_etag_distinto_devuelve_cuerpo(self, client):
+        """Prueba que un ETag obsoleto reciba la respuesta completa."""
+        response = client.get("/items", headers={"If-None-Match": '"obsoleto"'})
+
+        assert response.status_code == 200
+        assert response.json() == [{"id": 1, "nombre": "Peso"}]
+
+    def test_post_no_se_modifica(self, client):
+        """Prueba que los métodos distintos de GET no reciban ETag."""
+        response = client.post("/items")
+
+        assert response.status_code == 200
+        assert "etag" not in response.headers
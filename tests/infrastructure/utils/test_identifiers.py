@@ -0,0 +1,30 @@
+import time
+
+from src.infrastructure.utils.identifiers import generate_uuid7
+
+
+class TestGenerateUuid7:
+    """Pruebas para la generacion de UUID version 7."""
+
+    def test_version_y_variante(self):
+        """Prueba que el UUID generado sea version 7 con variante RFC 4122."""
+        value = generate_uuid7()
+
+        assert value.version == 7
+        assert value.variant == "specified in RFC 4122"
+
+    def test_timestamp_actual(self):
+        """Prueba que los 48 bits mas significativos contengan el timestamp en milisegundos."""
+        antes = time.time_ns() // 1_000_000
+        value = generate_uuid7()
+        despues = time.time_ns() // 1_000_000
+
+        assert antes <= value.int >> 80 <= despues
+
+    def test_ordenados_por_tiempo(self):
+        """Prueba que los UUID generados en milisegundos distintos queden ordenados."""
+        primero = generate_uuid7()
+        time.sleep(0.002)
+        segundo = generate_uuid7()
+
+        assert primero < segundo
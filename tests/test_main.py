@@ -0,0 +1,61 @@
+import importlib
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+from fastapi import FastAPI
+
+
+@pytest.fixture
+def main_module():
+    """Importa main.py dentro de la prueba y no al recolectar el módulo."""
+    return importlib.import_module("main")
+
+
+class TestIncludeRouters:
+    """Pruebas de humo para el registro de routers al iniciar la aplicación."""
+
+    def test_routers_importables(self, main_module):
+        """Prueba que cada módulo de API_ROUTERS se importe y exponga un router."""
+        for module_path in main_module.API_ROUTERS:
+            module = importlib.import_module(module_path)
+
+            assert module.router.routes, module_path
+
+    def test_incluye_todos_los_routers(self, main_module):
+        """Prueba que include_routers registre las rutas bajo el prefijo de la API."""
+        app = FastAPI()
+
+        main_module.include_routers(app)
+
+        assert any(route.path.startswith(main_module.settings.API_V1_STR) for route in app.routes)
+
+
+class TestEnabledFeatures:
+    """Pruebas para la carga parcial de features con ENABLED_FEATURES."""
+
+    @pytest.mark.parametrize("features", ["clientes", "polizas", "monedas,usuarios"])
+    def test_configura_mappers_con_un_subconjunto(self, features):
+        """Prueba que los mappers se configuren aunque solo se carguen algunos routers.
+
+        Se ejecuta en otro proceso: en este los demás módulos de pruebas ya importaron
+        modelos y la configuración de los mappers es global.
+        """
+        script = (
+            "from fastapi import FastAPI\n"
+            "from sqlalchemy.orm import configure_mappers\n"
+            "import main\n"
+            "main.include_routers(FastAPI())\n"
+            "configure_mappers()\n"
+        )
+        result = subprocess.run(
+            [sys.executable, "-c", script],
+            cwd=Path(__file__).resolve().parent.parent,
+            env={**os.environ, "ENABLED_FEATURES": features},
+            capture_output=True,
+            text=True,
+        )
+
+        assert result.returncode == 0, result.stderr